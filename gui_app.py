@@ -3,6 +3,7 @@ from tkinter import ttk
 import threading
 import queue
 from tictactoe.presenter.game_presenter import GamePresenter
+from tictactoe.view.board_canvas import BoardCanvas
 try:
     import winsound
 except Exception:
@@ -28,16 +29,20 @@ class GameGUI:
         
         # Game state
         self.game_mode = None
-        self.board = None
+        self.session = None
         self.size = 8
         self.win_length = 4
         self.game_over = False
         self.current_player = 'X'
-        self.buttons = []
+        self.board_view = None
         # Queue used to schedule UI updates from worker threads
         self._ui_queue = queue.Queue()
-        # Start a periodic UI queue processor
-        self.root.after(100, self._process_ui_queue)
+        # Bumped whenever a game is abandoned; AI results carry the value they
+        # were started under, and stale ones are dropped
+        self._generation = 0
+        # Workers wake the Tk loop with this virtual event when a result is
+        # queued, so nothing polls while the AI thinks or the board is idle
+        self.root.bind('<<AIMoveReady>>', self._process_ui_queue)
 
         self.setup_main_menu()
         # Animation & sound settings
@@ -46,6 +51,8 @@ class GameGUI:
         self._win_blink_ms = 300
     
     def setup_main_menu(self):
+        # A background ponder search must not outlive its game
+        self._close_session()
         # Clear existing widgets
         for widget in self.root.winfo_children():
             widget.destroy()
@@ -106,9 +113,25 @@ class GameGUI:
         # Size selection
         ttk.Label(control_frame, text="Board Size:", background='#2c3e50', foreground='white').pack(side='left', padx=5)
         self.size_var = tk.StringVar(value="8")
-        size_combo = ttk.Combobox(control_frame, textvariable=self.size_var, values=["4", "5", "6", "7", "8", "9", "10"], width=5)
+        sizes = [str(n) for n in range(4, self.presenter.max_board_size + 1)]
+        size_combo = ttk.Combobox(control_frame, textvariable=self.size_var, values=sizes, width=5)
         size_combo.pack(side='left', padx=5)
         
+        # Stones in a row needed to win (5 on 15x15 or 19x19 plays like Gomoku)
+        ttk.Label(control_frame, text="In a row:", background='#2c3e50', foreground='white').pack(side='left', padx=5)
+        self.win_length_var = tk.StringVar(value="4")
+        win_combo = ttk.Combobox(control_frame, textvariable=self.win_length_var,
+                                 values=["3", "4", "5", "6"], width=3)
+        win_combo.pack(side='left', padx=5)
+        
+        # Pondering toggle (AI mode): keep searching while you think
+        self.ponder_var = tk.BooleanVar(value=self.presenter.pondering)
+        if self.game_mode == 'ai':
+            ponder_chk = tk.Checkbutton(control_frame, text="Ponder", variable=self.ponder_var,
+                                        command=self._toggle_pondering, bg='#2c3e50', fg='white',
+                                        selectcolor='#34495e', activebackground='#2c3e50')
+            ponder_chk.pack(side='left', padx=5)
+        
         # New game button
         new_game_btn = ttk.Button(control_frame, text="🆕 New Game", command=self.new_game, style='Control.TButton')
         new_game_btn.pack(side='left', padx=10)
@@ -121,32 +144,26 @@ class GameGUI:
         # Game board frame
         self.board_frame = tk.Frame(self.root, bg='#2c3e50')
         self.board_frame.pack(pady=20)
+        self.board_view = None
         
         # Initialize game
         self.new_game()
     
     def new_game(self):
         self.size = int(self.size_var.get())
-        self.win_length = min(4, self.size)
-        self.board = self.presenter.create_board(self.size)
+        self.win_length = min(int(self.win_length_var.get()), self.size)
+        self._close_session()
+        self.session = self.presenter.new_session(self.size, self.win_length,
+                                                  ai='O' if self.game_mode == 'ai' else None)
         self.game_over = False
         self.current_player = 'X'  # Reset to Player 1
         
-        # Clear and recreate board
-        for widget in self.board_frame.winfo_children():
-            widget.destroy()
-        
-        # Create buttons for each cell
-        self.buttons = []
-        for i in range(self.size):
-            row = []
-            for j in range(self.size):
-                btn = tk.Button(self.board_frame, text="", font=('Arial', 10, 'bold'), 
-                               width=3, height=2, command=lambda r=i, c=j: self.make_move(r, c),
-                               bg='#ecf0f1', fg='#2c3e50', relief='raised', bd=2)
-                btn.grid(row=i, column=j, padx=1, pady=1)
-                row.append(btn)
-            self.buttons.append(row)
+        # One canvas draws the whole board; a new game just redraws its grid
+        if self.board_view is None:
+            self.board_view = BoardCanvas(self.board_frame, self.size, self.make_move)
+            self.board_view.pack()
+        else:
+            self.board_view.reset(self.size)
         
         # Set initial status based on mode
         if self.game_mode == 'ai':
@@ -154,9 +171,23 @@ class GameGUI:
         else:
             self.status_label.config(text="Player 1's turn (X)", foreground='#e74c3c')
     
+    def _toggle_pondering(self):
+        self.presenter.set_pondering(self.ponder_var.get())
+        if self.session is not None:
+            self.session.set_pondering(self.ponder_var.get())
+
+    def _close_session(self):
+        # Stops the session's search and pondering at their next poll, so a
+        # quick New Game or Menu leaves no search running behind it
+        self._generation += 1
+        if self.session is not None:
+            self.session.close()
+
     def make_move(self, row, col):
-        if self.game_over or self.board[row][col] != '.':
+        if self.game_over or not self.session.is_legal(row, col):
             return
+        if self.game_mode == 'ai' and self.session.to_move != 'X':
+            return  # the AI is still thinking
         
         if self.game_mode == 'ai':
             self.make_ai_move(row, col)
@@ -166,8 +197,8 @@ class GameGUI:
     def make_ai_move(self, row, col):
         """Handle move in AI mode"""
         # Human move
-        self.board[row][col] = 'X'
-        self.buttons[row][col].config(text='X', fg='#e74c3c', state='disabled')
+        self.session.apply_move(row, col)
+        self.board_view.set_cell(row, col, 'X')
         # Play move sound and animate
         try:
             self._play_sound('move')
@@ -176,30 +207,39 @@ class GameGUI:
             pass
         
         # Check for human win
-        if self.presenter.check_win(self.board, 'X', self.win_length):
+        if self.session.winner == 'X':
             self.status_label.config(text="🎉 You Win! Congratulations!", foreground='#27ae60')
             self.game_over = True
+            self.session.stop_pondering()
             self.disable_all_buttons()
             return
         
         # Check for draw
-        if self.presenter.is_full(self.board):
+        if self.session.is_draw():
             self.status_label.config(text="🤝 It's a Draw!", foreground='#f39c12')
             self.game_over = True
+            self.session.stop_pondering()
             self.disable_all_buttons()
             return
         
         # AI move (non-blocking): run AI in a background thread and schedule UI update
         self.status_label.config(text="🤖 AI is thinking...", foreground='#3498db')
 
-        def ai_worker(board_snapshot, result_queue):
-            # Run AI on a copy to avoid partial state exposure
-            b_copy = [row[:] for row in board_snapshot]
-            self.presenter.ai_move(b_copy)
-            # Put the resulting board into the queue for the main thread to apply
-            result_queue.put(b_copy)
+        def ai_worker(session, generation, result_queue):
+            # The search works on a copy of the session's position. Only the
+            # chosen move comes back, with its win/draw result worked out
+            # from that move, to be applied on the main thread.
+            stats = session.best_move()
+            move = stats.move
+            winner, draw = session.outcome(*move) if move is not None else (None, False)
+            result_queue.put((generation, move, winner, draw))
+            try:
+                self.root.event_generate('<<AIMoveReady>>', when='tail')
+            except (tk.TclError, RuntimeError):
+                pass  # the window was closed while the AI was thinking
 
-        threading.Thread(target=ai_worker, args=(self.board, self._ui_queue), daemon=True).start()
+        threading.Thread(target=ai_worker, args=(self.session, self._generation, self._ui_queue),
+                         daemon=True).start()
 
         # UI will be updated by _process_ui_queue when the worker finishes
         return
@@ -207,16 +247,13 @@ class GameGUI:
     def make_pvp_move(self, row, col):
         """Handle move in Player vs Player mode"""
         # Make the move for current player
-        self.board[row][col] = self.current_player
+        self.session.apply_move(row, col)
         
-        # Update button appearance
-        if self.current_player == 'X':
-            self.buttons[row][col].config(text='X', fg='#e74c3c', state='disabled')
-        else:
-            self.buttons[row][col].config(text='O', fg='#3498db', state='disabled')
+        # Draw the mark
+        self.board_view.set_cell(row, col, self.current_player)
         
         # Check for win
-        if self.presenter.check_win(self.board, self.current_player, self.win_length):
+        if self.session.winner == self.current_player:
             player_name = "Player 1" if self.current_player == 'X' else "Player 2"
             self.status_label.config(text=f"🎉 {player_name} Wins! Congratulations!", foreground='#27ae60')
             self.game_over = True
@@ -224,7 +261,7 @@ class GameGUI:
             return
         
         # Check for draw
-        if self.presenter.is_full(self.board):
+        if self.session.is_draw():
             self.status_label.config(text="🤝 It's a Draw!", foreground='#f39c12')
             self.game_over = True
             self.disable_all_buttons()
@@ -240,9 +277,7 @@ class GameGUI:
             self.status_label.config(text="Player 2's turn (O)", foreground='#3498db')
     
     def disable_all_buttons(self):
-        for i in range(self.size):
-            for j in range(self.size):
-                self.buttons[i][j].config(state='disabled')
+        self.board_view.disable()
 
     # --- Sound & animation helpers ---
     def _play_sound(self, kind: str) -> None:
@@ -262,13 +297,15 @@ class GameGUI:
                 pass
 
     def _animate_move(self, r: int, c: int, player: str) -> None:
-        """Briefly flash the button background to emphasize the move."""
-        btn = self.buttons[r][c]
-        original_bg = btn.cget('bg')
+        """Briefly flash the cell background to emphasize the move."""
+        view = self.board_view
+        generation = self._generation
 
         def flash(on: bool, remaining: int):
+            if generation != self._generation:
+                return  # the board has been reset since
             try:
-                btn.config(bg='#f1c40f' if on else original_bg)
+                view.highlight(r, c, '#f1c40f' if on else None)
                 if remaining > 0:
                     self.root.after(self._move_flash_ms, flash, not on, remaining - 1)
             except Exception:
@@ -278,36 +315,24 @@ class GameGUI:
 
     def _find_winning_line(self, player: str):
         """Return list of coordinates for a winning line for player, or None."""
-        size = len(self.board)
-        wl = min(4, size)
-        # Horizontal & vertical
-        for r in range(size):
-            for c in range(size - wl + 1):
-                if all(self.board[r][c + i] == player for i in range(wl)):
-                    return [(r, c + i) for i in range(wl)]
-        for c in range(size):
-            for r in range(size - wl + 1):
-                if all(self.board[r + i][c] == player for i in range(wl)):
-                    return [(r + i, c) for i in range(wl)]
-        # Diagonals
-        for r in range(size - wl + 1):
-            for c in range(size - wl + 1):
-                if all(self.board[r + i][c + i] == player for i in range(wl)):
-                    return [(r + i, c + i) for i in range(wl)]
-                if all(self.board[r + wl - 1 - i][c + i] == player for i in range(wl)):
-                    return [(r + wl - 1 - i, c + i) for i in range(wl)]
-        return None
+        if self.session.winner != player:
+            return None
+        # Only the last move can have made the line, so only its lines are walked
+        return self.session.winning_line()
 
     def _highlight_winning_line(self, coords):
-        """Blink the winning buttons a few times."""
+        """Blink the winning cells a few times."""
         if not coords:
             return
+        view = self.board_view
+        generation = self._generation
 
         def blink(count: int):
+            if generation != self._generation:
+                return
             try:
                 for r, c in coords:
-                    btn = self.buttons[r][c]
-                    btn.config(bg='#2ecc71' if count % 2 == 0 else '#ecf0f1')
+                    view.highlight(r, c, '#2ecc71' if count % 2 == 0 else None)
                 if count < self._win_blink_count * 2:
                     self.root.after(self._win_blink_ms, blink, count + 1)
             except Exception:
@@ -315,26 +340,24 @@ class GameGUI:
 
         blink(0)
 
-    def _process_ui_queue(self):
-        """Process UI update tasks from worker threads."""
+    def _process_ui_queue(self, event=None):
+        """Apply the AI moves queued by worker threads."""
         try:
             while True:
-                b_copy = self._ui_queue.get_nowait()
-                # Apply differences from b_copy to self.board and buttons
-                for i in range(self.size):
-                    for j in range(self.size):
-                        if self.board[i][j] != b_copy[i][j]:
-                            self.board[i][j] = b_copy[i][j]
-                            if b_copy[i][j] == 'O':
-                                self.buttons[i][j].config(text='O', fg='#3498db', state='disabled')
-                                # Animate AI move and play sound
-                                try:
-                                    self._play_sound('move')
-                                    self._animate_move(i, j, player='O')
-                                except Exception:
-                                    pass
+                generation, move, winner, draw = self._ui_queue.get_nowait()
+                if generation != self._generation or move is None:
+                    continue  # the game it was for has been abandoned
+                i, j = move
+                self.session.apply_move(i, j)
+                self.board_view.set_cell(i, j, 'O')
+                # Animate AI move and play sound
+                try:
+                    self._play_sound('move')
+                    self._animate_move(i, j, player='O')
+                except Exception:
+                    pass
                 # Check for AI win
-                if self.presenter.check_win(self.board, 'O', self.win_length):
+                if winner == 'O':
                     self.status_label.config(text="🤖 AI Wins! Better luck next time!", foreground='#e74c3c')
                     self.game_over = True
                     self.disable_all_buttons()
@@ -346,7 +369,7 @@ class GameGUI:
                         self._play_sound('lose')
                     except Exception:
                         pass
-                elif self.presenter.is_full(self.board):
+                elif draw:
                     self.status_label.config(text="🤝 It's a Draw!", foreground='#f39c12')
                     self.game_over = True
                     self.disable_all_buttons()
@@ -354,15 +377,15 @@ class GameGUI:
                     self.status_label.config(text="Your turn! Click a cell to make your move", foreground='#f39c12')
         except queue.Empty:
             pass
-        finally:
-            # Schedule next check
-            self.root.after(100, self._process_ui_queue)
 
 
 def main():
     root = tk.Tk()
     app = GameGUI(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.presenter.close()
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,11 @@
-import L4 as l4
-from gui_app import main as gui_main
+import sys
+
+
+def gui_main():
+    """Start the GUI; tkinter and the presenter are only imported here."""
+    from gui_app import main
+    main()
+
 
 def console_menu():
     """Original console-based menu (kept for compatibility)"""
@@ -12,6 +18,7 @@ def console_menu():
 
         if choice == '1':
             print("\n--- Tic Tac Toe (Console) ---")
+            import L4 as l4
             l4.tic_tac_toe_game()
         elif choice == '2':
             print("Launching GUI...")
@@ -23,9 +30,11 @@ def console_menu():
             print("Invalid choice. Please select 0, 1, or 2.")
 
 if __name__ == "__main__":
-    # Launch GUI by default, but allow console mode
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == '--console':
+    # Launch GUI by default, but allow console mode and batch analysis
+    if len(sys.argv) > 1 and sys.argv[1] == '--analyze':
+        from tictactoe.analyze import main as analyze_main
+        sys.exit(analyze_main(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == '--console':
         console_menu()
     else:
         try:
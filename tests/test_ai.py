@@ -44,3 +44,35 @@ def test_ai_blocks_immediate_opponent_win():
     # AI should block at (0,3)
     l4.ai_move(b, time_limit=1.0)
     assert b[0][3] == 'O'
+
+
+def test_ai_plays_five_in_a_row_on_a_large_board():
+    b = l4.create_board(15)
+    # Four in a row is no win with win_length=5, so O must block X's open four
+    for c in range(5, 9):
+        b[7][c] = 'X'
+    b[6][6] = b[8][8] = b[6][8] = 'O'
+    start = time.time()
+    l4.ai_move(b, time_limit=0.5, win_length=5)
+    assert time.time() - start < 2.0
+    assert b[7][4] == 'O' or b[7][9] == 'O'
+    assert not l4.check_win(b, 'X', win_length=5)
+
+
+def test_long_win_lengths_keep_scores_below_a_win():
+    from tictactoe.model.bitboard import MAX_PATTERN_SCORE, geometry
+    from tictactoe.model.search import WIN_SCORE
+
+    for size, k in [(15, 13), (19, 13), (19, 19)]:
+        geo = geometry(size, k)
+        assert len(geo.windows) * max(geo.window_values) <= MAX_PATTERN_SCORE < WIN_SCORE
+    b = l4.create_board(19)
+    for c in range(3, 15):
+        b[9][c] = 'O'  # twelve in a row, one short of a win
+    assert 0 < l4.evaluate_patterns(b, 13) < WIN_SCORE
+    b[10][9] = 'X'
+    score = l4.minimax_alpha_beta(b, 2, True, win_length=13)
+    assert score >= WIN_SCORE  # O completes the line
+    b[9][2] = b[9][15] = 'X'
+    stats = l4.ai_move(b, time_limit=0.5, win_length=13)
+    assert abs(stats.score) < WIN_SCORE and stats.depth > 1
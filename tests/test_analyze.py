@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tictactoe import analyze
+
+
+def test_parse_line_infers_the_side_and_rejects_bad_input():
+    assert analyze.parse_line('X........') == ('X........', 3, 1, None)
+    assert analyze.parse_line('.' * 64 + ' X 5') == ('.' * 64, 8, 0, 5)
+    for line in ['X.......', 'X.......? O', 'X........ Z', '.' * 16 + ' X 6', 'XOXOXOOXO']:
+        with pytest.raises(analyze.PositionError):
+            analyze.parse_line(line)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_analyze_lines_reports_moves_and_errors(workers):
+    lines = ['# comment', 'XO.XO....', '', '................ X', 'XXX.OO...', 'oops']
+    records = list(analyze.analyze_lines(lines, time_limit=1.0, max_depth=2,
+                                         workers=workers, ordered=True))
+    assert [r['id'] for r in records] == [2, 4, 5, 6]
+    assert records[0]['move'] == [2, 0] and records[0]['source'] == 'tactics'
+    assert records[1]['depth'] <= 2 and 'nodes' in records[1]
+    assert 'error' in records[2] and 'error' in records[3]
+
+
+def test_cli_writes_json_lines_without_loading_the_engine_up_front(tmp_path):
+    src = tmp_path / 'positions.txt'
+    src.write_text('XO.XO....\n')
+    out = tmp_path / 'out.jsonl'
+    rc = analyze.main([str(src), '--output', str(out), '--depth', '1'])
+    assert rc == 0
+    assert json.loads(out.read_text())['move'] == [2, 0]
+
+    code = 'import sys, tictactoe.analyze; print("tictactoe.model.l4" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert result.stdout.strip() == 'False'
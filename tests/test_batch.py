@@ -0,0 +1,51 @@
+import os
+import sys
+import random
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+pytest.importorskip("numpy")
+
+import L4 as l4
+from tictactoe.model.batch import check_wins, evaluate_batch, pattern_scores, to_array
+from tictactoe.model.bitboard import Position
+
+
+def random_boards(size, count, rng):
+    return [[[rng.choice('..XO') for _ in range(size)] for _ in range(size)]
+            for _ in range(count)]
+
+
+@pytest.mark.parametrize("size", [3, 4, 6, 8])
+def test_batch_matches_single_board_functions(size):
+    rng = random.Random(size)
+    boards = random_boards(size, 200, rng)
+    array = to_array(boards)
+    assert array.shape == (200, size, size)
+    for player in 'XO':
+        assert list(check_wins(array, player)) == [l4.check_win(b, player) for b in boards]
+        assert list(check_wins(array, player, 3)) == [l4.check_win(b, player, 3) for b in boards]
+    assert list(evaluate_batch(array)) == [l4.evaluate(b) for b in boards]
+    assert list(pattern_scores(array)) == [l4.evaluate_patterns(b) for b in boards]
+
+
+def test_empty_boards_score_zero():
+    array = to_array([l4.create_board(5)] * 3)
+    assert not check_wins(array, 'X').any()
+    assert list(pattern_scores(array)) == [0, 0, 0]
+
+
+@pytest.mark.parametrize("size,win_length", [(12, 12), (19, 13)])
+def test_pattern_scores_on_long_win_lengths(size, win_length):
+    # Windows holding ten or more O's need window codes past the int8 range
+    rng = random.Random(win_length)
+    boards = [[[rng.choice('OOOO.X') for _ in range(size)] for _ in range(size)]
+              for _ in range(20)]
+    expected = [Position.from_board(b, win_length).score for b in boards]
+    assert list(pattern_scores(to_array(boards), win_length)) == expected
+    assert any(expected)
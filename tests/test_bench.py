@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tictactoe import bench
+
+
+def test_run_reports_every_engine_and_match():
+    report = bench.run(sizes=[4], engines=['ai_move', 'original'], games=2, max_depth=2)
+    json.dumps(report)  # machine-readable
+    match = report['matches'][0]
+    assert match['games'] == 2
+    assert sum(match['wins']) + match['draws'] == 2
+    ai = report['engines']['ai_move']
+    assert ai['moves'] > 0 and ai['max_depth'] <= 2
+    assert ai['latency_ms']['p50'] <= ai['latency_ms']['max']
+    rates = ai['win_rate'] + ai['draw_rate'] + ai['loss_rate']
+    assert abs(rates - 1) < 0.01
+
+
+def test_large_boards_skip_the_original_engine():
+    report = bench.run(sizes=[8], engines=['ai_move', 'original'], games=1, max_depth=1)
+    assert report['matches'] == []
+
+
+def test_compare_flags_regressions_only():
+    def report(nps, p50):
+        return {'engines': {'ai_move': {'moves': 10, 'nodes_per_sec': nps, 'mean_depth': 4,
+                                        'latency_ms': {'p50': p50}}}}
+    baseline = report(10000, 100)
+    assert bench.compare(report(9500, 105), baseline) == []
+    assert len(bench.compare(report(5000, 100), baseline)) == 1
+    assert len(bench.compare(report(10000, 200), baseline)) == 1
+
+
+def test_scaling_reports_each_size():
+    report = bench.scaling(sizes=[8, 15], win_length=5, plies=6, max_depth=1)
+    json.dumps(report)
+    assert [row['size'] for row in report['sizes']] == [8, 15]
+    assert all(row['moves'] > 0 and row['ms_per_move'] > 0 for row in report['sizes'])
@@ -0,0 +1,192 @@
+import os
+import sys
+import random
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import L4 as l4
+from tictactoe.model.bitboard import Position, iter_bits
+
+
+def random_board(size, stones, rng):
+    b = l4.create_board(size)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    for i, (r, c) in enumerate(rng.sample(cells, stones)):
+        b[r][c] = 'X' if i % 2 == 0 else 'O'
+    return b
+
+
+def test_round_trip_and_string():
+    rng = random.Random(1)
+    b = random_board(6, 14, rng)
+    pos = Position.from_board(b)
+    assert pos.to_board() == b
+    assert str(pos) == l4.board_to_string(b)
+    assert pos.count == 14
+
+
+def test_play_and_undo_restore_position():
+    pos = Position(5)
+    pos.play(pos.square(2, 2), 0)
+    pos.play(pos.square(0, 4), 1)
+    assert not pos.is_empty(pos.square(0, 4))
+    pos.undo()
+    pos.undo()
+    assert pos.bits == [0, 0]
+    assert pos.count == 0
+
+
+def test_has_won_matches_check_win():
+    rng = random.Random(7)
+    for size in (4, 5, 7, 10):
+        for _ in range(150):
+            b = random_board(size, rng.randint(0, size * size), rng)
+            pos = Position.from_board(b)
+            for side, player in enumerate('XO'):
+                assert pos.has_won(side) == l4.check_win(b, player, min(4, size))
+
+
+def test_lines_do_not_wrap_between_rows():
+    b = l4.create_board(5)
+    # Two stones at the end of row 0 and two at the start of row 1
+    b[0][3] = b[0][4] = b[1][0] = b[1][1] = 'X'
+    assert not Position.from_board(b).has_won(0)
+    # Anti-diagonal that would wrap through the left edge
+    b = l4.create_board(5)
+    b[0][1] = b[1][0] = b[1][4] = b[2][3] = 'O'
+    assert not Position.from_board(b).has_won(1)
+
+
+def test_last_move_win_matches_full_scan():
+    rng = random.Random(11)
+    for size in (4, 6, 9):
+        k = min(4, size)
+        for _ in range(100):
+            b = random_board(size, rng.randint(1, size * size), rng)
+            pos = Position.from_board(b)
+            for side, player in enumerate('XO'):
+                stones = [(r, c) for r in range(size) for c in range(size) if b[r][c] == player]
+                hits = [pos.is_win_at(pos.square(r, c), side) for r, c in stones]
+                assert hits == [l4.check_win_at(b, r, c, player, k) for r, c in stones]
+                # A full-board win always passes through one of the player's stones
+                assert any(hits) == l4.check_win(b, player, k)
+
+
+def test_zobrist_key_is_incremental_and_order_independent():
+    pos = Position(6)
+    empty_key = pos.key
+    moves = [(pos.square(1, 1), 0), (pos.square(2, 3), 1), (pos.square(5, 0), 0)]
+    for sq, side in moves:
+        pos.play(sq, side)
+    other = Position(6)
+    for sq, side in reversed(moves):
+        other.play(sq, side)
+    assert pos.key == other.key
+    assert pos.key == Position.from_board(pos.to_board()).key
+    for _ in moves:
+        pos.undo()
+    assert pos.key == empty_key
+    # Different geometries never share the empty-board key
+    assert Position(6).key != Position(7).key
+    assert Position(6).key != Position(6, win_length=3).key
+
+
+def test_symmetry_keys_are_incremental():
+    from tictactoe.model.symmetry import permutations, transformed_keys
+
+    pos = Position(5)
+    perms, inverse = permutations(5)
+    pos.set_symmetry([(perms[t], inverse[t]) for t in range(1, 8)])
+    rng = random.Random(4)
+    for i in range(8):
+        pos.play(rng.choice(list(iter_bits(pos.empty()))), i % 2)
+    pos.undo()
+    assert pos.sym_keys == transformed_keys(pos, range(1, 8))
+    key, i = pos.canonical()
+    assert key == min(transformed_keys(pos))
+    assert key == (pos.key if i < 0 else pos.sym_keys[i])
+
+
+def test_frontier_tracks_neighbourhood_through_make_unmake():
+    rng = random.Random(3)
+    pos = Position(9, radius=2)
+    for step in range(120):
+        if pos.count and rng.random() < 0.4:
+            pos.undo()
+        elif not pos.is_full():
+            empties = [sq for sq in range(9 * pos.stride) if pos.empty() >> sq & 1]
+            pos.play(rng.choice(empties), step % 2)
+        if step == 60:
+            pos.set_radius(1)
+        assert pos.frontier == pos.neighbourhood(pos.radius)
+
+
+def pattern_score_from_scratch(pos):
+    geo = pos.geo
+    total = 0
+    for squares in geo.windows:
+        x = sum(pos.bits[0] >> sq & 1 for sq in squares)
+        o = sum(pos.bits[1] >> sq & 1 for sq in squares)
+        total += geo.window_values[x + o * (pos.win_length + 1)]
+    return total
+
+
+def test_pattern_score_is_maintained_incrementally():
+    rng = random.Random(5)
+    for size in (5, 8):
+        b = random_board(size, size * 2, rng)
+        pos = Position.from_board(b)
+        assert pos.score == pattern_score_from_scratch(pos)
+        for _ in range(size):
+            pos.undo()
+        assert pos.score == pattern_score_from_scratch(pos)
+
+
+def test_open_three_outscores_closed_three():
+    open_three = l4.create_board(7)
+    closed_three = l4.create_board(7)
+    for c in (2, 3, 4):
+        open_three[3][c] = 'O'
+        closed_three[3][c] = 'O'
+    closed_three[3][1] = 'X'
+    closed_three[6][6] = 'X'
+    open_three[6][6] = 'X'
+    open_three[0][0] = 'X'
+    assert l4.evaluate_patterns(open_three) > l4.evaluate_patterns(closed_three) > 0
+    # Colours swapped, sign flips
+    swapped = [['XO.'['OX.'.index(cell)] for cell in row] for row in open_three]
+    assert l4.evaluate_patterns(swapped) == -l4.evaluate_patterns(open_three)
+
+
+def test_live_squares_match_a_scan_of_every_window_on_big_boards():
+    rng = random.Random(11)
+    for size, k in [(15, 5), (19, 5), (8, 4)]:
+        pos = Position(size, k)
+        for i in range(rng.randint(4, 30)):
+            squares = pos.neighbourhood(1) if pos.count else pos.empty()
+            pos.play(rng.choice(list(iter_bits(squares))), i % 2)
+        for side in (0, 1):
+            for count in range(1, k):
+                target = count * pos.geo.code_increment[side]
+                expected = 0
+                for w, code in enumerate(pos._codes):
+                    if code == target:
+                        expected |= pos.geo.window_masks[w]
+                assert pos.live_squares(side, count) == expected & pos.empty()
+
+
+def test_is_winning_move_matches_playing_the_move():
+    rng = random.Random(5)
+    for _ in range(30):
+        pos = Position(rng.choice([4, 5, 6]))
+        for i in range(rng.randint(3, 12)):
+            pos.play(rng.choice(list(iter_bits(pos.empty()))), i % 2)
+        for sq in iter_bits(pos.empty()):
+            for side in (0, 1):
+                pos.play(sq, side)
+                expected = pos.is_win_at(sq, side)
+                pos.undo()
+                assert pos.is_winning_move(sq, side) == expected
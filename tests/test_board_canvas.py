@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+tk = pytest.importorskip("tkinter")
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    yield root
+    root.destroy()
+
+
+def test_clicks_map_to_cells_and_stones_are_single_items(root):
+    from tictactoe.view.board_canvas import BoardCanvas
+
+    clicks = []
+    view = BoardCanvas(root, 19, lambda r, c: clicks.append((r, c)))
+    cell = view.cell
+    assert view.cell_at(cell * 3 + 1, cell * 18 + 1) == (18, 3)
+    assert view.cell_at(cell * 19 + 1, 0) is None
+    items = len(view.find_all())
+    view.set_cell(18, 3, 'X')
+    view.set_cell(18, 3, 'O')
+    assert len(view.find_all()) == items + 1
+    view.highlight(18, 3, '#2ecc71')
+    view.highlight(18, 3, None)
+    assert len(view.find_all()) == items + 1
+    view.reset(4)
+    assert len(view.find_all()) == 1 + 2 * 3
@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tictactoe.view.board_geometry import (MAX_CELL, MAX_PIXELS, MIN_CELL, cell_at, cell_box,
+                                           cell_center, cell_size)
+
+
+def test_cell_size_stays_within_bounds():
+    assert cell_size(3) == MAX_CELL
+    assert cell_size(19) == max(MIN_CELL, MAX_PIXELS // 19)
+    assert cell_size(100) == MIN_CELL
+
+
+def test_points_map_to_the_cells_that_contain_them():
+    size = 19
+    cell = cell_size(size)
+    assert cell_at(cell * 3 + 1, cell * 18 + 1, size, cell) == (18, 3)
+    assert cell_at(0, 0, size, cell) == (0, 0)
+    assert cell_at(cell - 0.5, cell, size, cell) == (1, 0)
+    assert cell_at(cell * 19 + 1, 0, size, cell) is None
+    assert cell_at(0, -1, size, cell) is None
+    for row, col in ((0, 0), (7, 12), (18, 18)):
+        assert cell_at(*cell_center(row, col, cell), size, cell) == (row, col)
+        x0, y0, x1, y1 = cell_box(row, col, cell)
+        assert cell_at(x0, y0, size, cell) == cell_at(x1, y1, size, cell) == (row, col)
@@ -0,0 +1,83 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+import L4 as l4
+from tictactoe.model import book as book_mod
+from tictactoe.model import l4 as model
+from tictactoe.model.bitboard import Position
+from tictactoe.model.symmetry import canonical_key, permutations
+
+
+@pytest.fixture(scope='module')
+def small_book(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('books') / 'book.bin')
+    records = book_mod.build_book(4, 4, plies=2, sides=(1,), time_limit=0.05)
+    book_mod.write_book(path, 4, 4, 2, records)
+    book = book_mod.OpeningBook(path)
+    yield book
+    book.close()
+
+
+def test_symmetric_positions_share_one_record():
+    perms, _ = permutations(5)
+    pos = Position(5)
+    pos.play(pos.square(0, 1), 0)
+    pos.play(pos.square(2, 3), 1)
+    keys = set()
+    for t in range(8):
+        image = Position(5)
+        image.play(perms[t][pos.square(0, 1)], 0)
+        image.play(perms[t][pos.square(2, 3)], 1)
+        keys.add(canonical_key(image, 0)[0])
+    assert len(keys) == 1
+
+
+def test_book_has_one_record_per_symmetry_class(small_book):
+    # X's first move on 4x4: corner, edge or centre
+    assert len(small_book) == 3
+    assert small_book.plies == 2
+
+
+def test_lookup_maps_the_move_back_into_each_orientation(small_book):
+    perms, _ = permutations(4)
+    # X on (0, 1) is fixed by no symmetry but the identity, so each image
+    # must get exactly the transformed book move
+    base = Position(4)
+    base.play(base.square(0, 1), 0)
+    move, score = small_book.lookup(base, 1)
+    for t in range(8):
+        image = Position(4)
+        image.play(perms[t][base.square(0, 1)], 0)
+        assert small_book.lookup(image, 1) == (perms[t][move], score)
+
+
+def test_lookup_misses_outside_the_book(small_book):
+    pos = Position(4)
+    for r, c, side in [(0, 0, 0), (1, 1, 1), (2, 2, 0)]:
+        pos.play(pos.square(r, c), side)
+    assert small_book.lookup(pos, 1) is None
+    assert small_book.lookup(Position(5), 1) is None
+
+
+def test_ai_move_plays_from_the_book(small_book, monkeypatch):
+    monkeypatch.setitem(model._books, (4, 4), small_book)
+    b = l4.create_board(4)
+    b[3][3] = 'X'
+    pos = Position.from_board(b)
+    expected, _ = small_book.lookup(pos, 1)
+    l4.ai_move(b, time_limit=5.0)
+    assert b[expected // 5][expected % 5] == 'O'
+
+
+def test_rejects_files_that_are_not_books(tmp_path):
+    path = tmp_path / 'bad.bin'
+    path.write_bytes(b'not a book at all')
+    with pytest.raises(ValueError):
+        book_mod.OpeningBook(str(path))
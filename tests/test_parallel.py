@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import L4 as l4
+from tictactoe.model.bitboard import Position, iter_bits
+from tictactoe.model.parallel import search_root_parallel
+from tictactoe.model.search import Searcher
+from tictactoe.model.ttable import TranspositionTable
+
+
+def test_parallel_score_matches_single_threaded():
+    b = l4.create_board(6)
+    b[2][2] = b[3][3] = 'X'
+    b[2][3] = b[1][1] = 'O'
+    pos = Position.from_board(b)
+    pos.set_radius(1)
+    moves = list(iter_bits(pos.frontier))
+    _, expected, _ = Searcher(pos, TranspositionTable(1 << 14)).search_root(1, 3, moves)
+    _, score, depth = search_root_parallel(pos, 1, moves, time.time() + 60, 2, 3)
+    assert depth == 3
+    assert score == expected
+
+
+def test_parallel_ai_move_is_legal():
+    b = l4.create_board(7)
+    b[3][3] = 'X'
+    before = [row[:] for row in b]
+    stats = l4.ai_move(b, time_limit=0.5, workers=2)
+    assert stats.source != 'parallel' or stats.nodes > 0  # the workers' nodes are counted
+    diff = [(r, c) for r in range(7) for c in range(7) if before[r][c] != b[r][c]]
+    assert len(diff) == 1
+    assert b[diff[0][0]][diff[0][1]] == 'O'
+
+
+def test_stopping_the_control_ends_a_parallel_search():
+    import threading
+    from tictactoe.model.search import SearchControl
+
+    b = l4.create_board(10)
+    b[4][4] = b[5][6] = 'X'
+    b[5][5] = b[4][6] = 'O'
+    pos = Position.from_board(b)
+    moves = list(iter_bits(pos.neighbourhood(2)))
+    control = SearchControl(time.time() + 60)
+    threading.Timer(0.3, control.stop).start()
+    start = time.time()
+    search_root_parallel(pos, 1, moves, control.deadline, 2, 20, control)
+    assert time.time() - start < 5
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import L4 as l4
+from tictactoe.model.bitboard import Position
+from tictactoe.model.ponder import Ponderer
+
+
+def start_game():
+    b = l4.create_board(8)
+    b[3][3] = 'X'
+    b[4][4] = 'O'
+    b[3][4] = 'X'
+    return b
+
+
+def predicted_reply(ponderer, board):
+    # The position the ponderer expects after the human's reply
+    for r in range(len(board)):
+        for c in range(len(board)):
+            if board[r][c] == '.':
+                board[r][c] = 'X'
+                if Position.from_board(board).key == ponderer._expected_key:
+                    return r, c
+                board[r][c] = '.'
+    return None
+
+
+def test_ponder_hit_answers_from_background_search():
+    p = Ponderer('O')
+    b = start_game()
+    p.move(b, time_limit=0.3)
+    assert p.active
+    assert predicted_reply(p, b) is not None
+    time.sleep(0.4)  # the human thinks longer than the budget
+    start = time.time()
+    before = [row[:] for row in b]
+    p.move(b, time_limit=0.3)
+    assert time.time() - start < 0.2
+    assert p.hits == 1 and p.misses == 0
+    assert sum(before[r][c] != b[r][c] for r in range(8) for c in range(8)) == 1
+    p.stop()
+    assert not p.active
+
+
+def test_ponder_miss_falls_back_to_a_normal_search():
+    p = Ponderer('O')
+    b = start_game()
+    p.move(b, time_limit=0.2)
+    reply = predicted_reply(p, b)
+    if reply is not None:
+        b[reply[0]][reply[1]] = '.'
+    # Play somewhere the engine did not expect
+    for r, c in [(0, 0), (7, 7), (0, 7)]:
+        b[r][c] = 'X'
+        if Position.from_board(b).key != p._expected_key:
+            break
+        b[r][c] = '.'
+    p.move(b, time_limit=0.2)
+    assert p.misses == 1 and p.hits == 0
+    p.stop()
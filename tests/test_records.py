@@ -0,0 +1,83 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from tictactoe import bench
+from tictactoe.model import records
+from tictactoe.model.session import EngineSession
+
+
+def test_games_round_trip_with_random_access(tmp_path):
+    path = str(tmp_path / 'games.rec')
+    big = [(r, c) for r in range(19) for c in range(19)][::7]
+    with records.RecordWriter(path) as writer:
+        writer.write(4, 4, [(0, 0), (1, 1), (0, 1)], 'X')
+        writer.write(19, 5, big, None)
+        writer.write(3, 3, [], 'draw')
+    # Cells on small boards take a byte each
+    assert os.path.getsize(path) < 8 + 3 * 4 + 3 + 2 * len(big) + 3 * 8 + 16 + 8
+    with records.GameRecords(path) as games:
+        assert len(games) == 3
+        assert games[1].coords() == big and games[1].size == 19 and games[1].result is None
+        assert [g.result for g in games] == ['X', None, 'draw']
+        assert games[0].coords() == [(0, 0), (1, 1), (0, 1)]
+
+
+def test_appending_keeps_earlier_games_and_survives_a_missing_index(tmp_path):
+    path = str(tmp_path / 'games.rec')
+    with records.RecordWriter(path) as writer:
+        writer.write(5, 4, [(2, 2)], 'O')
+    writer = records.RecordWriter(path)
+    writer.write(5, 4, [(1, 1), (2, 2)], 'X')
+    writer._file.flush()
+    # Not closed: no index yet, so the reader scans
+    with records.GameRecords(path) as games:
+        assert [g.result for g in games] == ['O', 'X'] and len(games) == 2
+    writer.write(5, 4, [(0, 0)], None)
+    writer.close()
+    games_end = os.path.getsize(path) - 3 * 8 - 16
+    with open(path, 'r+b') as f:
+        f.truncate(games_end + 20)  # a crash while writing the index
+    with records.GameRecords(path) as games:
+        assert len(games) == 3
+    with open(path, 'r+b') as f:
+        f.truncate(games_end - 1)  # and one while writing the last game
+    with records.GameRecords(path) as games:
+        assert len(games) == 2 and games[1].coords() == [(1, 1), (2, 2)]
+    with records.RecordWriter(path) as writer:
+        assert len(writer) == 2
+
+
+def test_replay_rebuilds_each_position():
+    game = records.GameRecord(4, 4, 'X', bytes([0, 5, 1, 6, 2, 7, 3]))
+    seen = [(pos.count, side, pos.coords(sq)) for pos, side, sq in game.replay()]
+    assert seen[0] == (0, 0, (0, 0)) and seen[-1] == (6, 0, (0, 3))
+    assert [side for _, side, _ in seen] == [0, 1, 0, 1, 0, 1, 0]
+
+
+def test_sessions_and_self_play_record_finished_games(tmp_path):
+    path = str(tmp_path / 'games.rec')
+    with records.RecordWriter(path) as writer:
+        session = EngineSession(4, recorder=writer)
+        for r, c in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)]:
+            session.apply_move(r, c)
+        assert len(writer) == 0
+        session.apply_move(0, 3)
+        bench.run(sizes=[4], engines=['ai_move'], games=2, max_depth=1, recorder=writer)
+    with records.GameRecords(path) as games:
+        assert len(games) == 3
+        assert games[0].result == 'X' and games[0].coords()[-1] == (0, 3)
+        assert all(g.result in ('X', 'O', 'draw') and g.size == 4 for g in games)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'TTTB' + bytes(12))
+    with pytest.raises(ValueError):
+        records.GameRecords(str(path))
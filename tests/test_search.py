@@ -0,0 +1,174 @@
+import os
+import sys
+import random
+import time
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import L4 as l4
+from tictactoe.model.bitboard import Position, iter_bits
+from tictactoe.model.search import INF, WIN_SCORE, Searcher
+from tictactoe.model.symmetry import stabilizer, unique_moves
+from tictactoe.model.ttable import TranspositionTable
+
+
+def plain_minimax(pos, side, depth):
+    """Reference negamax without pruning, ordering or hashing."""
+    if pos.is_full():
+        return 0
+    if depth <= 0:
+        return pos.score if side else -pos.score
+    best = -INF
+    for sq in iter_bits(pos.frontier or pos.empty()):
+        pos.play(sq, side)
+        if pos.is_win_at(sq, side):
+            score = WIN_SCORE + depth
+        else:
+            score = -plain_minimax(pos, 1 - side, depth - 1)
+        pos.undo()
+        best = max(best, score)
+    return best
+
+
+def random_position(rng):
+    pos = Position(rng.choice([4, 5, 6]))
+    for i in range(rng.randint(2, 6)):
+        sq = rng.choice(list(iter_bits(pos.empty())))
+        pos.play(sq, i % 2)
+        if pos.is_win_at(sq, i % 2):
+            pos.undo()
+    return pos
+
+
+def test_pvs_matches_plain_minimax():
+    rng = random.Random(2)
+    for _ in range(25):
+        pos = random_position(rng)
+        side = rng.randint(0, 1)
+        expected = plain_minimax(pos, side, 3)
+        searcher = Searcher(pos, TranspositionTable(1 << 12))
+        assert searcher.negamax(side, 3, -INF, INF) == expected
+        assert pos.count == len(pos.moves)
+
+
+def test_symmetric_search_matches_plain_minimax_with_fewer_entries():
+    b = l4.create_board(5)
+    b[2][2] = 'X'
+    pos = Position.from_board(b)
+    pos.set_radius(1)
+    expected = plain_minimax(pos, 1, 3)
+    plain_tt = TranspositionTable(1 << 12)
+    assert Searcher(pos, plain_tt).negamax(1, 3, -INF, INF) == expected
+    pos.set_symmetry(stabilizer(pos))
+    assert len(pos.symmetries) == 7
+    sym_tt = TranspositionTable(1 << 12)
+    assert Searcher(pos, sym_tt).negamax(1, 3, -INF, INF) == expected
+    assert len(sym_tt) < len(plain_tt)
+    # Eight neighbours of the centre fall into two classes: edge and corner
+    assert len(unique_moves(pos, list(iter_bits(pos.frontier)))) == 2
+
+
+def test_symmetry_is_off_for_asymmetric_positions():
+    b = l4.create_board(5)
+    b[2][2] = 'X'
+    b[1][2] = 'O'
+    pos = Position.from_board(b)
+    assert len(stabilizer(pos)) == 1  # only the left-right mirror
+    b[1][1] = 'X'
+    assert stabilizer(Position.from_board(b)) == []
+
+
+def test_minimax_alpha_beta_scores_from_o_point_of_view():
+    b = l4.create_board(5)
+    b[0][0] = b[0][1] = b[0][2] = 'O'
+    b[4][0] = b[4][1] = 'X'
+    # O to move wins at once; X to move must block and the game goes on
+    assert l4.minimax_alpha_beta(b, 2, True) > WIN_SCORE // 2
+    assert l4.minimax_alpha_beta(b, 2, False) < WIN_SCORE // 2
+
+
+def test_search_root_prefers_quickest_win():
+    b = l4.create_board(6)
+    for c in range(3):
+        b[2][c] = 'O'
+    b[5][5] = b[5][4] = b[0][5] = 'X'
+    pos = Position.from_board(b)
+    pos.set_radius(1)
+    searcher = Searcher(pos, TranspositionTable(1 << 12))
+    moves = list(iter_bits(pos.frontier))
+    best, score, _ = searcher.search_root(1, 3, moves)
+    assert pos.coords(best) == (2, 3)
+    assert score == WIN_SCORE + 3
+
+
+def test_iterative_deepening_respects_deadline_and_rewinds():
+    b = l4.create_board(10)
+    b[4][4] = b[5][5] = 'X'
+    b[4][5] = 'O'
+    pos = Position.from_board(b)
+    pos.set_radius(2)
+    key, moves_before = pos.key, list(pos.moves)
+    depths = []
+    searcher = Searcher(pos, TranspositionTable(1 << 14), deadline=time.time() + 0.3)
+    start = time.time()
+    result = searcher.iterate(1, list(iter_bits(pos.frontier)), 64,
+                              on_iteration=lambda r: depths.append(r.depth))
+    assert time.time() - start < 0.45
+    assert depths == list(range(1, len(depths) + 1)) and depths
+    assert result.depth == depths[-1]
+    assert pos.is_empty(result.move)
+    assert pos.key == key and pos.moves == moves_before
+
+
+def test_ai_move_stays_within_time_limit():
+    b = l4.create_board(8)
+    b[3][3] = 'X'
+    start = time.time()
+    l4.ai_move(b, time_limit=0.3)
+    assert time.time() - start < 0.45
+
+
+def test_ai_move_returns_search_stats():
+    b = l4.create_board(6)
+    b[2][2] = 'X'
+    b[3][3] = 'O'
+    b[2][3] = 'X'
+    seen = []
+    stats = l4.ai_move(b, time_limit=5.0, max_depth=4, on_iteration=seen.append)
+    assert stats.source == 'search'
+    assert [result.depth for result in seen] == [1, 2, 3, 4]
+    assert [info['depth'] for info in stats.iterations] == [1, 2, 3, 4]
+    assert stats.depth == 4 and stats.nodes > 0
+    r, c = stats.move
+    assert b[r][c] == 'O' and stats.pv[0] == stats.move
+    assert stats.tt_probes >= stats.tt_hits > 0
+    assert 0 < stats.first_move_cutoffs <= stats.cutoffs
+    assert 0 < stats.first_move_cutoff_rate <= 1
+    data = stats.as_dict()
+    assert data['move'] == [r, c]
+    assert data['iterations'][-1]['move'] == stats.move
+
+
+def test_presenter_keeps_the_last_search_stats():
+    from tictactoe.presenter.game_presenter import GamePresenter
+
+    presenter = GamePresenter()
+    assert presenter.search_stats() is None
+    b = l4.create_board(4)
+    b[1][0] = b[1][1] = b[1][2] = 'O'
+    presenter.ai_move(b, time_limit=0.5)
+    assert presenter.search_stats()['source'] == 'tactics'
+    assert presenter.last_stats.move == (1, 3)
+
+
+def test_child_control_stops_with_its_parent():
+    from tictactoe.model.search import SearchControl
+
+    parent = SearchControl(time.time() + 60)
+    child = parent.child(time.time() + 120)
+    assert child.deadline == parent.deadline and not child.expired()
+    parent.stop()
+    assert child.stopped and child.expired()
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import asyncio
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tictactoe.loadgen import run_load
+from tictactoe.server import MAX_LINE, GameServer
+
+
+def with_server(body, **options):
+    async def main():
+        server = GameServer(workers=1, **options)
+        host, port = await server.start()
+        try:
+            return await body(server, host, port)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+async def exchange(host, port, *requests):
+    reader, writer = await asyncio.open_connection(host, port)
+    responses = []
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b'\n')
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def test_load_generator_plays_concurrent_games():
+    async def body(server, host, port):
+        return await run_load(host, port, clients=3, games=1, size=4, time_limit=0.05)
+
+    report = with_server(body)
+    assert report['errors'] == 0
+    assert report['games'] == 3
+    assert sum(report['results'].values()) == 3
+    assert report['ai_moves'] > 0
+
+
+def test_move_gets_an_ai_reply_and_errors_are_reported():
+    async def body(server, host, port):
+        return await exchange(
+            host, port,
+            {'op': 'new', 'size': 5, 'id': 'a'},
+            {'op': 'move', 'game': 1, 'row': 2, 'col': 2, 'time_limit': 0.1},
+            {'op': 'move', 'game': 1, 'row': 2, 'col': 2},
+            {'op': 'move', 'game': 99, 'row': 0, 'col': 0},
+            {'op': 'fly'},
+        )
+
+    new, move, again, unknown, bad_op = with_server(body)
+    assert new['ok'] and new['id'] == 'a' and new['to_move'] == 'X'
+    assert move['ok'] and move['to_move'] == 'X'
+    r, c = move['ai_move']
+    assert move['board'][r][c] == 'O' and move['board'][2][2] == 'X'
+    assert move['stats']['source'] in ('search', 'threats', 'tactics', 'book')
+    assert again == {'ok': False, 'error': 'illegal move 2,2'}
+    assert unknown['error'] == 'unknown game'
+    assert not bad_op['ok']
+
+
+def test_full_queue_refuses_before_applying_the_move():
+    async def body(server, host, port):
+        return await exchange(
+            host, port,
+            {'op': 'new', 'size': 5},
+            {'op': 'move', 'game': 1, 'row': 0, 'col': 0},
+            {'op': 'state', 'game': 1},
+        )
+
+    _, move, state = with_server(body, max_queue=0)
+    assert move == {'ok': False, 'error': 'busy'}
+    assert state['moves'] == 0
+
+
+def test_bad_requests_and_internal_errors_keep_the_connection_open():
+    async def body(server, host, port):
+        first = await exchange(host, port, {'op': 'new', 'size': 5},
+                               {'op': 'state', 'game': [1]}, {'op': 'state', 'game': 1})
+        server._pool.shutdown()  # every AI turn now fails inside the server
+        second = await exchange(host, port, {'op': 'ai', 'game': 1}, {'op': 'state', 'game': 1})
+        return first + second
+
+    _, malformed, state, broken, after = with_server(body)
+    assert malformed == {'ok': False, 'error': 'game must be an integer'}
+    assert state['ok'] and state['game'] == 1
+    assert not broken['ok'] and broken['error'].startswith('internal error')
+    assert after['ok'] and after['moves'] == 0
+
+
+def test_oversized_lines_are_refused_and_skipped():
+    async def body(server, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        responses = []
+        for length in (MAX_LINE + 10, 3 * MAX_LINE):
+            writer.write(b'{"op": "stats", "pad": "' + b'x' * length + b'"}\n'
+                         + json.dumps({'op': 'stats', 'id': length}).encode() + b'\n')
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+            responses.append(json.loads(await reader.readline()))
+        writer.close()
+        await writer.wait_closed()
+        return responses, server.counters['errors']
+
+    responses, errors = with_server(body)
+    assert responses[0] == responses[2] == {'ok': False, 'error': 'line too long'}
+    assert responses[1]['ok'] and responses[1]['id'] == MAX_LINE + 10
+    assert responses[3]['ok'] and responses[3]['id'] == 3 * MAX_LINE
+    assert errors == 2
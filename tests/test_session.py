@@ -0,0 +1,129 @@
+import os
+import sys
+
+import pytest
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import L4 as l4
+from tictactoe.model.session import EngineSession
+from tictactoe.presenter.game_presenter import GamePresenter
+
+
+def test_apply_move_tracks_turn_win_and_board():
+    session = EngineSession(5)
+    for r, c in [(0, 0), (4, 4), (0, 1), (4, 3), (0, 2), (4, 2)]:
+        assert session.apply_move(r, c) is None
+    assert session.to_move == 'X'
+    assert session.apply_move(0, 3) == 'X'
+    assert session.is_over() and not session.is_draw()
+    assert session.winning_line() == [(0, 0), (0, 1), (0, 2), (0, 3)]
+    board = session.board()
+    assert l4.check_win(board, 'X', 4) and board[4][4] == 'O'
+    with pytest.raises(ValueError):
+        session.apply_move(1, 1)
+
+
+def test_illegal_moves_and_undo():
+    session = EngineSession(4)
+    session.apply_move(1, 1)
+    with pytest.raises(ValueError):
+        session.apply_move(1, 1)
+    with pytest.raises(ValueError):
+        session.apply_move(4, 0)
+    key = session.pos.key
+    session.apply_move(2, 2)
+    session.undo()
+    assert session.pos.key == key and session.to_move == 'O'
+
+
+def test_draw_is_detected_when_the_board_fills():
+    session = EngineSession(3)
+    for r, c in [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (1, 2), (2, 1), (2, 0), (2, 2)]:
+        session.apply_move(r, c)
+    assert session.winner is None and session.is_draw()
+
+
+def test_best_move_uses_the_session_table_and_leaves_the_position():
+    session = EngineSession(4)
+    for r, c in [(0, 0), (1, 0), (3, 3), (1, 1), (3, 0), (1, 2), (2, 2)]:
+        session.apply_move(r, c)
+    key = session.pos.key
+    stats = session.best_move(time_limit=0.5, max_depth=3)
+    assert session.pos.key == key
+    assert stats.move == (1, 3) and stats.source == 'tactics'
+
+
+def test_search_fills_the_session_table():
+    session = EngineSession(5)
+    session.apply_move(2, 2)
+    stats = session.best_move(time_limit=1.0, max_depth=2)
+    assert stats.source == 'search' and session.is_legal(*stats.move)
+    assert session.pos.symmetries == () and session.pos.count == 1
+    assert session.tt.stats()['stores'] > 0
+
+
+def test_play_ai_finishes_a_game_between_two_engines():
+    session = EngineSession(4, ai=None)
+    while not session.is_over():
+        assert session.play_ai(max_depth=2) is not None
+    assert session.play_ai() is None
+
+
+def test_presenter_creates_sessions_with_its_pondering_setting():
+    presenter = GamePresenter()
+    presenter.set_pondering(True)
+    session = presenter.new_session(6)
+    try:
+        assert session.pondering and session.size == 6 and session.win_length == 4
+        session.apply_move(2, 2)
+        stats = session.best_move(time_limit=0.2)
+        session.apply_move(*stats.move)
+    finally:
+        session.close()
+        presenter.set_pondering(False)
+    assert not session.pondering
+
+
+def test_cancel_stops_a_running_search():
+    import threading
+    import time
+
+    session = EngineSession(12, 5)
+    for r, c in [(5, 5), (6, 6), (5, 6), (6, 5)]:
+        session.apply_move(r, c)
+    threading.Timer(0.2, session.cancel).start()
+    start = time.time()
+    stats = session.best_move(time_limit=30)
+    assert time.time() - start < 3
+    assert session.is_legal(*stats.move)
+
+
+def test_a_closed_session_starts_no_more_searches():
+    import time
+
+    session = EngineSession(12, 5)
+    session.apply_move(5, 5)
+    session.close()
+    start = time.time()
+    stats = session.best_move(time_limit=30)
+    assert time.time() - start < 3 and stats.move is not None
+
+
+def test_outcome_reports_a_move_without_playing_it():
+    session = EngineSession(4)
+    for r, c in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+        session.apply_move(r, c)
+    count = session.pos.count
+    assert session.outcome(1, 2) == (None, False)
+    session.apply_move(1, 2)
+    assert session.outcome(0, 3) == ('X', False)
+    assert session.pos.count == count + 1 and session.cell(0, 3) == '.'
+
+    full = EngineSession(3)
+    for r, c in [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (1, 2), (2, 1), (2, 0)]:
+        full.apply_move(r, c)
+    assert full.outcome(2, 2) == (None, True)
@@ -0,0 +1,125 @@
+import os
+import sys
+import random
+import time
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import L4 as l4
+import tictactoe.model.l4 as model
+from tictactoe.model.bitboard import Position, iter_bits
+from tictactoe.model.search import INF, WIN_SCORE, SearchControl, Searcher
+from tictactoe.model.threats import ThreatSolver, defensive_moves
+from tictactoe.model.ttable import TranspositionTable
+
+
+def board_from(rows):
+    return [list(row) for row in rows]
+
+
+def test_vcf_finds_an_open_three():
+    b = l4.create_board(8)
+    b[3][2] = b[3][3] = 'X'
+    b[6][6] = b[7][7] = 'O'
+    pos = Position.from_board(b)
+    line = ThreatSolver(pos).vcf(0)
+    assert line is not None and len(line) == 3
+    assert pos.coords(line[0]) in ((3, 1), (3, 4))
+    assert pos.count == 4
+
+
+def test_no_win_claimed_without_threats():
+    b = l4.create_board(8)
+    b[3][3] = 'X'
+    b[4][4] = 'O'
+    pos = Position.from_board(b)
+    solver = ThreatSolver(pos)
+    assert solver.vcf(0) is None
+    assert solver.vct(0) is None
+
+
+def test_proven_wins_hold_against_full_width_search():
+    rng = random.Random(1)
+    checked = 0
+    while checked < 6:
+        size = 5
+        pos = Position(size, radius=size)
+        for i in range(rng.randint(4, 9)):
+            sq = rng.choice(list(iter_bits(pos.empty())))
+            pos.play(sq, i % 2)
+            if pos.is_win_at(sq, i % 2):
+                pos.undo()
+        side = pos.count % 2
+        if pos.live_squares(side, pos.win_length - 1):
+            continue
+        line = ThreatSolver(pos).vct(side)
+        if line is None or len(line) > 5:
+            continue
+        score = Searcher(pos, TranspositionTable(1 << 14)).negamax(side, len(line), -INF, INF)
+        assert score > WIN_SCORE // 2
+        checked += 1
+
+
+def test_ai_move_defends_against_a_threat_sequence():
+    b = board_from([
+        "........",
+        "..X.....",
+        "..O.....",
+        "...XO...",
+        "....X...",
+        "....O...",
+        "........",
+        "........",
+    ])
+    assert ThreatSolver(Position.from_board(b)).vct(0) is not None
+    l4.ai_move(b, 1.0)
+    assert ThreatSolver(Position.from_board(b)).vct(0) is None
+
+
+def test_ai_move_plays_a_forced_win_found_by_the_solver():
+    b = l4.create_board(8)
+    b[3][2] = b[3][3] = 'O'
+    b[0][0] = b[7][7] = b[0][7] = 'X'
+    pos = Position.from_board(b)
+    result = model._search_position(pos, 1, 1.0)
+    assert result.score == WIN_SCORE
+    assert result.pv[0] == result.move
+    assert pos.coords(result.move) in ((3, 1), (3, 4))
+
+
+def test_defensive_moves_marks_nothing_safe_after_the_deadline():
+    b = board_from([
+        "........",
+        "..X.....",
+        "..O.....",
+        "...XO...",
+        "....X...",
+        "....O...",
+        "........",
+        "........",
+    ])
+    pos = Position.from_board(b)
+    moves = list(iter_bits(pos.empty()))
+    solver = ThreatSolver(pos, SearchControl(time.time() - 1))
+    assert defensive_moves(solver, 1, moves) is moves
+    assert solver.timed_out
+    assert solver.nodes == 0
+
+
+def test_ai_move_keeps_to_its_time_limit_on_a_crowded_large_board():
+    rng = random.Random(7)
+    cells = [(r, c) for r in range(6, 13) for c in range(6, 13)]
+    for _ in range(6):
+        b = l4.create_board(19)
+        for i, (r, c) in enumerate(rng.sample(cells, 24)):
+            b[r][c] = 'XO'[i % 2]
+        if l4.check_win(b, 'X', 5) or l4.check_win(b, 'O', 5):
+            continue
+        for limit in (0.05, 0.2):
+            l4.clear_transposition_table()
+            start = time.time()
+            l4.ai_move([row[:] for row in b], time_limit=limit, win_length=5)
+            assert time.time() - start < limit + 0.15
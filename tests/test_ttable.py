@@ -0,0 +1,53 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import L4 as l4
+from tictactoe.model.ttable import EXACT, LOWER, UPPER, TranspositionTable
+
+
+def test_store_and_probe_round_trip():
+    tt = TranspositionTable(capacity=16)
+    assert tt.probe(12345) is None
+    tt.store(12345, 3, LOWER, -7, 42)
+    assert tt.probe(12345) == (3, LOWER, -7, 42)
+    stats = tt.stats()
+    assert stats['hits'] == 1 and stats['probes'] == 2 and stats['used'] == 1
+
+
+def test_collisions_are_detected_not_returned():
+    tt = TranspositionTable(capacity=16)
+    tt.store(5, 2, EXACT, 1, 0)
+    # Same slot (low bits match), different position
+    assert tt.probe(5 + (1 << 40)) is None
+    assert tt.stats()['collisions'] == 1
+
+
+def test_depth_preferred_replacement_with_aging():
+    tt = TranspositionTable(capacity=16)
+    other = 3 + (1 << 33)
+    tt.store(3, 5, EXACT, 10, 1)
+    # A shallower entry from the same search does not evict a deeper one
+    tt.store(other, 2, UPPER, 0, 2)
+    assert tt.probe(3) == (5, EXACT, 10, 1)
+    # Once the search generation moves on, the old entry can be replaced
+    tt.new_search()
+    tt.store(other, 2, UPPER, 0, 2)
+    assert tt.probe(other) == (2, UPPER, 0, 2)
+    assert tt.probe(3) is None
+
+
+def test_capacity_is_fixed_under_sustained_play():
+    l4.clear_transposition_table()
+    for _ in range(3):
+        b = l4.create_board(6)
+        b[2][2] = 'X'
+        l4.ai_move(b, time_limit=0.2)
+    stats = l4.transposition_table.stats()
+    assert 0 < stats['used'] <= stats['capacity']
+    l4.clear_transposition_table()
+    assert len(l4.transposition_table) == 0
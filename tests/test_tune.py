@@ -0,0 +1,88 @@
+import os
+import sys
+
+# Ensure project root is on sys.path so tests can import project modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from tictactoe import bench, tune
+from tictactoe.model import l4 as model
+from tictactoe.model import records, weights
+from tictactoe.model.bitboard import Position, window_weights
+
+
+@pytest.fixture(scope='module')
+def games(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('records') / 'games.rec')
+    with records.RecordWriter(path) as writer:
+        bench.run(sizes=[5, 6], engines=['ai_move'], games=6, max_depth=1, opening_plies=3,
+                  recorder=writer)
+    return path
+
+
+def test_game_boards_replay_the_moves():
+    game = records.GameRecord(4, 4, 'X', bytes([0, 5, 1]))
+    boards, cells = tune._game_boards(game)
+    assert cells.tolist() == [0, 5, 1]
+    assert boards[0].sum() == 0 and boards[2].tolist()[:6] == [1, 0, 0, 0, 0, 2]
+
+
+def test_order_features_match_the_engine_priority():
+    board = model.create_board(6)
+    for (r, c), player in zip([(2, 2), (0, 0), (2, 3), (0, 1), (2, 4), (0, 2)], 'XOXOXO'):
+        board[r][c] = player
+    features, candidates = tune.order_features(tune.batch.to_array([board]),
+                                               np.array([1], dtype=np.int8), 4)
+    pos = Position.from_board(board, 4)
+    terms = np.array([model.PRIORITY_CENTER, model.PRIORITY_WIN, model.PRIORITY_BLOCK,
+                      model.PRIORITY_NEIGHBOUR])
+    for cell in np.flatnonzero(candidates[0]):
+        r, c = divmod(int(cell), 6)
+        assert features[0, cell] @ terms == model._square_priority(pos, pos.square(r, c), 0)
+
+
+def test_tune_fits_both_weight_sets(games, tmp_path):
+    report = tune.tune([games], min_positions=10)
+    entry = report['window_weights'][4]
+    assert len(entry['after']) == 5 and entry['after'][0] == entry['after'][4] == 0
+    assert entry['loss_after'] <= entry['loss_before'] + 1e-9
+    priority = report['move_priority']
+    assert set(priority['after']) == set(weights.PRIORITY_TERMS)
+    assert priority['after']['center'] == model.PRIORITY_CENTER
+    assert 0 < priority['accuracy_after'] <= 1
+
+    path = str(tmp_path / 'weights.json')
+    tune.write_weights(report, path)
+    loaded = weights.load_weights(path)
+    assert loaded['window_weights'][4] == entry['after']
+    assert loaded['move_priority'] == priority['after']
+
+
+def test_the_engine_uses_loaded_weights(tmp_path):
+    path = str(tmp_path / 'weights.json')
+    weights.save_weights(path, {'center': 1, 'win': 50, 'block': 40, 'neighbour': 3},
+                         {4: [0, 2, 20, 200, 0]})
+    default = window_weights(4)
+    try:
+        model.set_weights(**weights.load_weights(path))
+        assert model.PRIORITY_WIN == 50
+        board = model.create_board(5)
+        board[2][2] = 'O'
+        assert model.evaluate_patterns(board) == 2 * 8  # the 8 windows through the centre
+    finally:
+        model.set_weights({'center': 10, 'win': 1000, 'block': 900, 'neighbour': 5},
+                          {4: None})
+    assert window_weights(4) == default and model.PRIORITY_WIN == 1000
+
+
+def test_bad_weights_files_are_rejected(tmp_path):
+    path = tmp_path / 'weights.json'
+    assert weights.load_weights(str(path)) is None
+    path.write_text('{"version": 1, "window_weights": {"4": [0, 1, 8]}}')
+    with pytest.raises(ValueError):
+        weights.load_weights(str(path))
@@ -0,0 +1,197 @@
+"""Batch position analysis: positions in, JSON lines out.
+
+Each input line holds a board in the ``board_to_string`` format (the cells
+row by row, no separators), then optionally the side to move and the win
+length, separated by spaces::
+
+    ..........X.....O...X.... O
+    ................................................................ X 4
+
+The board size is the square root of the cell count. Without a side, the
+side to move follows from the stone counts (X moves first). Blank lines
+and lines starting with ``#`` are skipped.
+
+Each result is one JSON object per line with the input line number as
+``id``, the position, and the search statistics (move, score, depth, pv,
+nodes, ...), or an ``error``. Positions are spread over ``--workers``
+processes, and results are written as they finish, or in input order with
+``--ordered``::
+
+    python -m tictactoe.analyze positions.txt --workers 8 --time-limit 0.5 > out.jsonl
+
+Only the standard library is imported up front; the engine is loaded by
+the processes that search, so the command starts quickly.
+"""
+
+import argparse
+import json
+import math
+import sys
+
+MIN_SIZE = 3
+MAX_SIZE = 19
+# Positions queued per worker process; bounds memory on huge inputs
+_QUEUE_PER_WORKER = 4
+
+
+class PositionError(ValueError):
+    """An input line that does not describe a position to analyse."""
+
+
+def parse_line(line):
+    """Return ``(cells, size, side, win_length)`` for one input line;
+    ``side`` is 0 for X and 1 for O, and ``win_length`` may be None."""
+    fields = line.split()
+    if not 1 <= len(fields) <= 3:
+        raise PositionError('expected: cells [side] [win_length]')
+    cells = fields[0]
+    size = math.isqrt(len(cells))
+    if size * size != len(cells) or not MIN_SIZE <= size <= MAX_SIZE:
+        raise PositionError(f'{len(cells)} cells is not a square board of {MIN_SIZE} to {MAX_SIZE}')
+    if set(cells) - set('.XO'):
+        raise PositionError("cells must be '.', 'X' or 'O'")
+    x, o = cells.count('X'), cells.count('O')
+    if len(fields) > 1:
+        if fields[1] not in ('X', 'O'):
+            raise PositionError("side must be 'X' or 'O'")
+        side = 'XO'.index(fields[1])
+    else:
+        side = 0 if x == o else 1
+    win_length = None
+    if len(fields) > 2:
+        try:
+            win_length = int(fields[2])
+        except ValueError:
+            raise PositionError('win_length must be an integer')
+        if not MIN_SIZE <= win_length <= size:
+            raise PositionError(f'win_length must be between {MIN_SIZE} and the board size')
+    if x + o == len(cells):
+        raise PositionError('board is full')
+    return cells, size, side, win_length
+
+
+def _analyze(job):
+    """Search one parsed position; runs in a worker process."""
+    from tictactoe.model import l4
+    from tictactoe.model.bitboard import Position
+
+    cells, size, side, win_length, time_limit, max_depth = job
+    board = [list(cells[r * size:(r + 1) * size]) for r in range(size)]
+    pos = Position.from_board(board, win_length)
+    if pos.has_won(0) or pos.has_won(1):
+        return {'error': 'game is over'}
+    result = l4._search_position(pos, side, time_limit, max_depth=max_depth)
+    return result.stats.as_dict()
+
+
+def _jobs(lines, time_limit, max_depth, win_length):
+    """Yield ``(id, position, job or None, error or None)`` per input line."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            cells, size, side, length = parse_line(line)
+        except PositionError as e:
+            yield number, line, None, str(e)
+            continue
+        if length is None:
+            length = win_length if win_length is not None and win_length <= size else None
+        yield number, line, (cells, size, side, length, time_limit, max_depth), None
+
+
+def _record(number, line, result):
+    record = {'id': number, 'position': line}
+    record.update(result)
+    return record
+
+
+def analyze_lines(lines, time_limit=1.0, max_depth=None, workers=1, win_length=None,
+                  ordered=False):
+    """Analyse the positions in ``lines`` and yield one result dict each.
+
+    With ``workers`` > 1 the searches run on a process pool, and results
+    are yielded as they finish unless ``ordered`` is set.
+    """
+    jobs = _jobs(lines, time_limit, max_depth, win_length)
+    if workers <= 1:
+        for number, line, job, error in jobs:
+            yield _record(number, line, {'error': error} if job is None else _analyze(job))
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    limit = workers * _QUEUE_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}   # future -> (id, position)
+        finished = {}  # id -> record, held back for ordered output
+        order = []     # ids not yet written, in input order (ordered only)
+
+        def emit(record):
+            if not ordered:
+                yield record
+                return
+            finished[record['id']] = record
+            while order and order[0] in finished:
+                yield finished.pop(order.pop(0))
+
+        def collect(block):
+            done, _ = wait(pending, return_when=FIRST_COMPLETED) if block else (
+                [f for f in pending if f.done()], None)
+            for future in done:
+                number, line = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:  # a crashed worker fails its position only
+                    result = {'error': f'{type(e).__name__}: {e}'}
+                yield from emit(_record(number, line, result))
+
+        for number, line, job, error in jobs:
+            if ordered:
+                order.append(number)
+            if job is None:
+                yield from emit(_record(number, line, {'error': error}))
+                continue
+            while len(pending) >= limit:
+                yield from collect(True)
+            pending[pool.submit(_analyze, job)] = (number, line)
+            yield from collect(False)
+        while pending:
+            yield from collect(True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyse positions and print JSON lines.')
+    parser.add_argument('input', nargs='?', default='-',
+                        help="file with one position per line ('-' for stdin)")
+    parser.add_argument('--output', '-o', default='-', help="where to write ('-' for stdout)")
+    parser.add_argument('--time-limit', type=float, default=1.0, help='seconds per position')
+    parser.add_argument('--depth', type=int, default=None,
+                        help='fixed search depth per position instead of a time limit')
+    parser.add_argument('--workers', type=int, default=1, help='search processes')
+    parser.add_argument('--win-length', type=int, default=None,
+                        help='default win length for lines without one (default: min(4, size))')
+    parser.add_argument('--ordered', action='store_true',
+                        help='write results in input order instead of as they finish')
+    args = parser.parse_args(argv)
+
+    time_limit = 3600.0 if args.depth is not None else args.time_limit
+    source = sys.stdin if args.input == '-' else open(args.input)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    errors = 0
+    try:
+        for record in analyze_lines(source, time_limit, args.depth, args.workers,
+                                    args.win_length, args.ordered):
+            errors += 'error' in record
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
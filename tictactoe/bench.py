@@ -0,0 +1,362 @@
+"""Self-play tournament and engine benchmark.
+
+Plays engine-vs-engine games on a range of board sizes. Each move gets
+either a time budget or a fixed depth; the fixed depth makes a run
+deterministic, which suits baselines. Results are reported as JSON:
+- nodes per second, depth reached, and per-move latency percentiles for
+  each engine;
+- peak memory of the process;
+- win, draw and loss rates for each pairing.
+
+::
+
+    python -m tictactoe.bench --sizes 4 6 8 --engines ai_move original --out bench.json
+    python -m tictactoe.bench --depth 3 --baseline bench.json
+    python -m tictactoe.bench --engines ai_move --games 100 --record games.rec
+
+With ``--baseline``, a run is compared with an earlier report, and the
+command exits with status 1 if any engine got slower by more than
+``--tolerance``.
+
+``--scaling`` instead measures how move cost grows with the board: the
+engine plays the same number of plies on each size at a fixed depth, and
+the report gives the cost per move at each size::
+
+    python -m tictactoe.bench --scaling --sizes 8 11 15 19 --win-length 5 --depth 2
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+
+from tictactoe.model import l4, records
+from tictactoe.model.bitboard import Position, iter_bits
+from tictactoe.model.ttable import NO_MOVE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PLAYERS = 'XO'
+
+
+def _search_engine(workers=None):
+    def play(pos, side, time_limit, max_depth):
+        result = l4._search_position(pos, side, time_limit, workers, max_depth)
+        stats = result.stats
+        return result.move, stats.nodes + stats.qnodes, result.depth
+    return play
+
+
+def _original_engine(pos, side, time_limit, max_depth):
+    """ai_move_original only plays O, so X's moves are made on a board with
+    the colours swapped. It has no budget: it always searches two plies."""
+    board = pos.to_board()
+    if side == 0:
+        swap = {'X': 'O', 'O': 'X', '.': '.'}
+        board = [[swap[cell] for cell in row] for row in board]
+    before = [row[:] for row in board]
+    l4.ai_move_original(board)
+    for r, row in enumerate(board):
+        for c, cell in enumerate(row):
+            if cell != before[r][c]:
+                return pos.square(r, c), None, 2
+    return NO_MOVE, None, 2
+
+
+# Engine name -> (move function, largest board it is run on)
+ENGINES = {
+    'ai_move': (_search_engine(), 19),
+    'parallel': (_search_engine(workers=2), 19),
+    # Full-width depth 2 without pruning; hopeless beyond small boards
+    'original': (_original_engine, 6),
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _EngineLog:
+    def __init__(self):
+        self.latencies = []
+        self.depths = []
+        self.nodes = 0
+        self.search_time = 0.0
+
+    def record(self, elapsed, nodes, depth):
+        self.latencies.append(elapsed)
+        self.depths.append(depth)
+        if nodes is not None:
+            self.nodes += nodes
+            self.search_time += elapsed
+
+    def report(self):
+        if not self.latencies:
+            return {'moves': 0}
+        ms = [t * 1000 for t in self.latencies]
+        return {
+            'moves': len(ms),
+            'nodes': self.nodes,
+            'nodes_per_sec': round(self.nodes / self.search_time) if self.search_time else None,
+            'mean_depth': round(sum(self.depths) / len(self.depths), 2),
+            'max_depth': max(self.depths),
+            'latency_ms': {
+                'mean': round(sum(ms) / len(ms), 2),
+                'p50': round(percentile(ms, 0.5), 2),
+                'p90': round(percentile(ms, 0.9), 2),
+                'p99': round(percentile(ms, 0.99), 2),
+                'max': round(max(ms), 2),
+            },
+        }
+
+
+def play_game(size, engines, logs, time_limit=None, max_depth=None, opening_plies=0, rng=None,
+              win_length=None, recorder=None):
+    """Play one game; ``engines`` holds the engine names for X and O.
+
+    The first ``opening_plies`` moves are random squares next to the stones
+    already played, so repeated games differ. Returns 'X', 'O' or 'draw',
+    after appending the game to ``recorder`` (a records.RecordWriter) if
+    one is given.
+    """
+    rng = rng or random.Random()
+    pos = Position(size, win_length)
+    l4.clear_transposition_table()
+    side = 0
+    while True:
+        if pos.count < opening_plies:
+            squares = pos.neighbourhood(1) if pos.count else pos.empty()
+            sq = rng.choice(list(iter_bits(squares)))
+        else:
+            name = engines[side]
+            move = ENGINES[name][0]
+            start = time.perf_counter()
+            sq, nodes, depth = move(pos, side, time_limit, max_depth)
+            logs[name].record(time.perf_counter() - start, nodes, depth)
+            if sq == NO_MOVE or not pos.is_empty(sq):
+                raise RuntimeError(f'{name} made an illegal move on {size}x{size}')
+        pos.play(sq, side)
+        if pos.is_win_at(sq, side):
+            result = PLAYERS[side]
+        elif pos.is_full():
+            result = 'draw'
+        else:
+            side = 1 - side
+            continue
+        if recorder is not None:
+            recorder.write_position(pos, result)
+        return result
+
+
+def run(sizes=(4, 5, 6, 7, 8, 9, 10), engines=('ai_move', 'original'), games=2,
+        time_limit=0.2, max_depth=None, opening_plies=2, seed=0, log=None, win_length=None,
+        recorder=None):
+    """Play every pairing of ``engines`` (self-play if only one is given) on
+    each size and return the report as a dict.
+
+    Each pairing plays ``games`` games per size, with colours alternating.
+    With ``max_depth`` set, each move searches to that depth and
+    ``time_limit`` is ignored. ``win_length`` defaults to min(4, size);
+    sizes smaller than it are skipped. Every game is appended to
+    ``recorder`` if one is given.
+    """
+    for name in engines:
+        if name not in ENGINES:
+            raise ValueError(f'unknown engine {name!r}; choose from {sorted(ENGINES)}')
+    if max_depth is not None:
+        time_limit = 3600.0  # the depth is the budget
+    rng = random.Random(seed)
+    logs = {name: _EngineLog() for name in engines}
+    pairings = list(itertools.combinations(engines, 2)) or [(engines[0], engines[0])]
+    matches = []
+    standings = {name: {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0} for name in engines}
+    start = time.time()
+    for size in sizes:
+        for first, second in pairings:
+            if size > min(ENGINES[first][1], ENGINES[second][1]):
+                continue
+            if win_length is not None and size < win_length:
+                continue
+            # wins[i] counts the games won by engines[i]
+            match = {'size': size, 'engines': [first, second], 'games': 0,
+                     'wins': [0, 0], 'draws': 0}
+            for game in range(games):
+                x, o = (first, second) if game % 2 == 0 else (second, first)
+                winner = play_game(size, (x, o), logs, time_limit, max_depth, opening_plies, rng,
+                                   win_length, recorder)
+                match['games'] += 1
+                for name, player in ((x, 'X'), (o, 'O')):
+                    standings[name]['games'] += 1
+                    if winner == 'draw':
+                        standings[name]['draws'] += 1
+                    elif winner == player:
+                        standings[name]['wins'] += 1
+                    else:
+                        standings[name]['losses'] += 1
+                if winner == 'draw':
+                    match['draws'] += 1
+                else:
+                    match['wins'][(winner == 'X') == (game % 2 == 1)] += 1
+                if log:
+                    log(f'{size}x{size} {x} (X) vs {o} (O): {winner}')
+            matches.append(match)
+
+    results = {}
+    for name in engines:
+        report = logs[name].report()
+        played = standings[name]['games']
+        for outcome, key in (('wins', 'win_rate'), ('draws', 'draw_rate'), ('losses', 'loss_rate')):
+            report[key] = round(standings[name][outcome] / played, 3) if played else None
+        results[name] = report
+    return {
+        'config': {'sizes': list(sizes), 'engines': list(engines), 'games': games,
+                   'win_length': win_length,
+                   'time_limit': None if max_depth is not None else time_limit,
+                   'max_depth': max_depth, 'opening_plies': opening_plies, 'seed': seed},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'elapsed_sec': round(time.time() - start, 2),
+        'peak_memory_kb': _peak_memory_kb(),
+        'tt': l4.transposition_table.stats(),
+        'engines': results,
+        'matches': matches,
+    }
+
+
+def scaling(sizes=(8, 11, 15, 19), win_length=5, plies=16, max_depth=2, engine='ai_move',
+            log=None):
+    """Self-play ``plies`` moves from a centre opening on each size and
+    report the cost per move.
+
+    Each move searches to ``max_depth``, so the work per size is comparable:
+    if the engine's cost depends on the stones played rather than the board
+    area, ``ms_per_move`` stays roughly flat as the size grows.
+    """
+    move = ENGINES[engine][0]
+    rows = []
+    for size in sizes:
+        if size < win_length or size > ENGINES[engine][1]:
+            continue
+        l4.clear_transposition_table()
+        pos = Position(size, win_length)
+        pos.play(pos.square(size // 2, size // 2), 0)
+        side = 1
+        latencies = []
+        nodes = 0
+        while pos.count < plies and not pos.is_full():
+            start = time.perf_counter()
+            sq, searched, _ = move(pos, side, 3600.0, max_depth)
+            latencies.append(time.perf_counter() - start)
+            nodes += searched or 0
+            pos.play(sq, side)
+            if pos.is_win_at(sq, side):
+                break
+            side = 1 - side
+        ms = [t * 1000 for t in latencies]
+        row = {'size': size, 'moves': len(ms), 'nodes': nodes,
+               'ms_per_move': round(sum(ms) / len(ms), 2),
+               'p90_ms': round(percentile(ms, 0.9), 2),
+               'us_per_node': round(sum(ms) * 1000 / nodes, 2) if nodes else None}
+        rows.append(row)
+        if log:
+            log(f"{size}x{size} k={win_length}: {row['ms_per_move']} ms/move over {len(ms)} moves")
+    return {
+        'config': {'sizes': list(sizes), 'win_length': win_length, 'plies': plies,
+                   'max_depth': max_depth, 'engine': engine},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'sizes': rows,
+    }
+
+
+def _peak_memory_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS
+
+
+def compare(report, baseline, tolerance=0.2):
+    """Return messages for every engine that regressed against ``baseline``.
+
+    Checked are nodes per second and mean depth (lower is worse) and median
+    latency (higher is worse), each with ``tolerance`` as a fraction.
+    """
+    problems = []
+    for name, current in report['engines'].items():
+        before = baseline.get('engines', {}).get(name)
+        if not before or not current.get('moves') or not before.get('moves'):
+            continue
+        checks = [('nodes_per_sec', current.get('nodes_per_sec'), before.get('nodes_per_sec'), -1),
+                  ('mean_depth', current.get('mean_depth'), before.get('mean_depth'), -1),
+                  ('p50 latency', current['latency_ms']['p50'], before['latency_ms']['p50'], 1)]
+        for label, now, then, direction in checks:
+            if not now or not then:
+                continue
+            change = (now - then) / then
+            if change * direction > tolerance:
+                problems.append(f'{name}: {label} {then} -> {now} ({change:+.0%})')
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the engines by self-play.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 5, 6, 7, 8, 9, 10])
+    parser.add_argument('--engines', nargs='+', default=['ai_move', 'original'],
+                        choices=sorted(ENGINES))
+    parser.add_argument('--games', type=int, default=2, help='games per pairing and size')
+    parser.add_argument('--time-limit', type=float, default=0.2, help='seconds per move')
+    parser.add_argument('--depth', type=int, default=None,
+                        help='fixed search depth per move instead of a time limit')
+    parser.add_argument('--opening-plies', type=int, default=2)
+    parser.add_argument('--win-length', type=int, default=None,
+                        help='stones in a row to win (default: min(4, size))')
+    parser.add_argument('--scaling', action='store_true',
+                        help='measure move cost against board size instead of playing matches')
+    parser.add_argument('--plies', type=int, default=16, help='moves per size with --scaling')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record', default=None,
+                        help='append the games played to this records file')
+    parser.add_argument('--out', default=None, help='write the JSON report here')
+    parser.add_argument('--baseline', default=None, help='earlier report to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    log = None if args.quiet else lambda line: print(line, file=sys.stderr)
+    if args.scaling:
+        report = scaling(args.sizes, args.win_length or 5, args.plies, args.depth or 2,
+                         args.engines[0], log=log)
+        args.baseline = None  # a scaling report has no engine totals to compare
+    else:
+        recorder = records.open_writer(args.record) if args.record else None
+        try:
+            report = run(args.sizes, args.engines, args.games, args.time_limit, args.depth,
+                         args.opening_plies, args.seed, log=log, win_length=args.win_length,
+                         recorder=recorder)
+        finally:
+            if recorder is not None:
+                recorder.close()
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        for problem in problems:
+            print('REGRESSION ' + problem, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Load generator for the game server.
+
+Opens ``clients`` connections at once, and each plays ``games`` games
+against the server's AI, choosing random moves next to the stones already
+on the board. It prints a JSON summary with request latency percentiles
+and AI moves per second. With ``--spawn`` it starts its own server in
+the same process, so a single command measures a whole setup::
+
+    python -m tictactoe.loadgen --spawn --workers 4 --clients 16 --games 2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from tictactoe.bench import percentile
+from tictactoe.server import GameServer
+
+
+class _Client:
+    def __init__(self, reader, writer, report):
+        self.reader = reader
+        self.writer = writer
+        self.report = report
+        self._ids = 0
+
+    async def request(self, **request):
+        self._ids += 1
+        request['id'] = self._ids
+        start = time.perf_counter()
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        self.report['latencies'].append(time.perf_counter() - start)
+        self.report['requests'] += 1
+        if not response['ok']:
+            key = 'busy' if response['error'] == 'busy' else 'errors'
+            self.report[key] += 1
+        return response
+
+
+def _random_move(board, rng):
+    size = len(board)
+    stones = [(r, c) for r in range(size) for c in range(size) if board[r][c] != '.']
+    near = {(r + dr, c + dc) for r, c in stones for dr in (-1, 0, 1) for dc in (-1, 0, 1)}
+    moves = [(r, c) for r, c in near if 0 <= r < size and 0 <= c < size and board[r][c] == '.']
+    if not moves:
+        moves = [(r, c) for r in range(size) for c in range(size) if board[r][c] == '.']
+    return rng.choice(sorted(moves))
+
+
+async def _play(client, games, size, time_limit, rng):
+    for _ in range(games):
+        state = await client.request(op='new', size=size)
+        game = state['game']
+        while state.get('status', 'playing') == 'playing':
+            row, col = _random_move(state['board'], rng)
+            reply = await client.request(op='move', game=game, row=row, col=col,
+                                         time_limit=time_limit)
+            if not reply['ok']:
+                if reply['error'] != 'busy':
+                    break
+                await asyncio.sleep(0.05)  # back off and retry the same move
+                continue
+            if 'ai_move' in reply:
+                client.report['ai_moves'] += 1
+            state = reply
+        client.report['games'] += 1
+        client.report['results'][state.get('status', 'error')] = (
+            client.report['results'].get(state.get('status', 'error'), 0) + 1)
+        await client.request(op='close', game=game)
+
+
+async def run_load(host='127.0.0.1', port=8765, path=None, clients=8, games=2, size=8,
+                   time_limit=0.2, seed=0):
+    """Play the games and return the summary as a dict."""
+    report = {'requests': 0, 'errors': 0, 'busy': 0, 'games': 0, 'ai_moves': 0,
+              'results': {}, 'latencies': []}
+
+    async def one_client(index):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        try:
+            await _play(_Client(reader, writer, report), games, size, time_limit,
+                        random.Random(seed * 1000 + index))
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    ms = [t * 1000 for t in report.pop('latencies')] or [0.0]
+    report.update({
+        'clients': clients,
+        'elapsed_sec': round(elapsed, 3),
+        'ai_moves_per_sec': round(report['ai_moves'] / elapsed, 2),
+        'latency_ms': {'p50': round(percentile(ms, 0.5), 2),
+                       'p90': round(percentile(ms, 0.9), 2),
+                       'p99': round(percentile(ms, 0.99), 2),
+                       'max': round(max(ms), 2)},
+    })
+    return report
+
+
+async def _main(args):
+    server = None
+    host, port, path = args.host, args.port, args.unix
+    if args.spawn:
+        server = GameServer(args.workers)
+        address = await server.start(host, 0, path)
+        if path is None:
+            host, port = address
+    try:
+        return await run_load(host, port, path, args.clients, args.games, args.size,
+                              args.time_limit, args.seed)
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate load against the game server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='connect to this Unix socket instead')
+    parser.add_argument('--spawn', action='store_true', help='start a server in-process')
+    parser.add_argument('--workers', type=int, default=None, help='AI processes with --spawn')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--games', type=int, default=2, help='games per client')
+    parser.add_argument('--size', type=int, default=8)
+    parser.add_argument('--time-limit', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    report = asyncio.run(_main(args))
+    print(json.dumps(report, indent=2))
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
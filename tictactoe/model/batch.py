@@ -0,0 +1,122 @@
+"""Win detection and evaluation over many boards at once, with NumPy.
+
+Boards are an ``(N, size, size)`` int8 array holding 0 for an empty cell,
+1 for X and 2 for O (:func:`to_array` converts list-of-lists boards). Every
+window of ``win_length`` cells in the four directions is summed with one
+sliced add per cell of the window, vectorised over all N boards. The
+results match check_win, evaluate and evaluate_patterns in l4.
+
+NumPy is only needed by this module; the engine itself does not use it.
+"""
+
+import numpy as np
+
+from tictactoe.model.bitboard import geometry
+
+X_CELL = 1
+O_CELL = 2
+_CELLS = {'.': 0, 'X': X_CELL, 'O': O_CELL}
+
+
+def to_array(boards):
+    """Convert a sequence of list-of-lists boards to an int8 array."""
+    return np.array([[[_CELLS[cell] for cell in row] for row in board] for board in boards],
+                    dtype=np.int8)
+
+
+def _window_cells(size, win_length):
+    """Per direction, ``win_length`` index tuples: the i-th selects cell i
+    of every window in that direction from an (N, size, size) array."""
+    span = size - win_length + 1
+    if span <= 0:
+        return []
+    k = win_length
+    every = slice(None)
+    return [
+        [(every, every, slice(i, i + span)) for i in range(k)],                       # rows
+        [(every, slice(i, i + span), every) for i in range(k)],                       # columns
+        [(every, slice(i, i + span), slice(i, i + span)) for i in range(k)],          # diagonals
+        [(every, slice(i, i + span), slice(k - 1 - i, k - 1 - i + span)) for i in range(k)],  # anti
+    ]
+
+
+def _window_counts(stones, win_length):
+    """Stone counts of every window, one (N, ...) array per direction."""
+    return [sum(stones[cell] for cell in cells)
+            for cells in _window_cells(stones.shape[1], win_length)]
+
+
+def check_wins(boards, player, win_length=4):
+    """Return an (N,) bool array: has ``player`` ('X' or 'O') won each board."""
+    stones = (np.asarray(boards) == _CELLS[player]).astype(np.int8)
+    won = np.zeros(len(stones), dtype=bool)
+    for counts in _window_counts(stones, win_length):
+        won |= (counts == win_length).reshape(len(stones), -1).any(axis=1)
+    return won
+
+
+def evaluate_batch(boards, win_length=None):
+    """Return an (N,) array of evaluate's scores: 10 if O has won, -10 if X
+    has won, else 0."""
+    boards = np.asarray(boards)
+    if win_length is None:
+        win_length = min(4, boards.shape[1])
+    scores = np.where(check_wins(boards, 'X', win_length), -10, 0)
+    return np.where(check_wins(boards, 'O', win_length), 10, scores)
+
+
+def pattern_scores(boards, win_length=None):
+    """Return an (N,) int64 array of pattern scores from O's point of view,
+    the same as Position.score for each board."""
+    boards = np.asarray(boards)
+    n = len(boards)
+    size = boards.shape[1]
+    if win_length is None:
+        win_length = min(4, size)
+    values = np.array(geometry(size, win_length).window_values, dtype=np.int64)
+    x_counts = _window_counts((boards == X_CELL).astype(np.int8), win_length)
+    o_counts = _window_counts((boards == O_CELL).astype(np.int8), win_length)
+    scores = np.zeros(n, dtype=np.int64)
+    for x, o in zip(x_counts, o_counts):
+        codes = x.astype(np.int64) + o.astype(np.int64) * (win_length + 1)
+        scores += values[codes].reshape(n, -1).sum(axis=1)
+    return scores
+
+
+def window_features(boards, win_length=None):
+    """Return an (N, win_length + 1) int32 array: column n counts O's live
+    windows holding n stones minus X's. pattern_scores is this times the
+    window weights, so it is the feature matrix for tuning them."""
+    boards = np.asarray(boards)
+    n = len(boards)
+    if win_length is None:
+        win_length = min(4, boards.shape[1])
+    features = np.zeros((n, win_length + 1), dtype=np.int32)
+    x_counts = _window_counts((boards == X_CELL).astype(np.int8), win_length)
+    o_counts = _window_counts((boards == O_CELL).astype(np.int8), win_length)
+    for x, o in zip(x_counts, o_counts):
+        x, o = x.reshape(n, -1), o.reshape(n, -1)
+        for stones in range(1, win_length + 1):
+            features[:, stones] += ((o == stones) & (x == 0)).sum(axis=1)
+            features[:, stones] -= ((x == stones) & (o == 0)).sum(axis=1)
+    return features
+
+
+def completion_squares(boards, cells, win_length=None):
+    """Return an (N, size, size) bool array of the empty squares where the
+    player whose cell value is ``cells[i]`` (X_CELL or O_CELL, one per
+    board) would complete a line of ``win_length`` on board i."""
+    boards = np.asarray(boards)
+    size = boards.shape[1]
+    if win_length is None:
+        win_length = min(4, size)
+    own = (boards == np.asarray(cells, dtype=np.int8).reshape(-1, 1, 1))
+    other = (boards != 0) & ~own
+    empty = boards == 0
+    squares = np.zeros(boards.shape, dtype=bool)
+    for cells_of in _window_cells(size, win_length):
+        ready = ((sum(own[cell].astype(np.int8) for cell in cells_of) == win_length - 1)
+                 & ~np.logical_or.reduce([other[cell] for cell in cells_of]))
+        for cell in cells_of:
+            squares[cell] |= ready & empty[cell]
+    return squares
@@ -0,0 +1,452 @@
+"""Integer bitboard position used internally by the search.
+
+Each player's stones live in a single Python int. Square ``(r, c)`` maps to
+bit ``r * stride + c`` with ``stride = size + 1``: the extra column is always
+empty, so shifting a bitboard along a row or a diagonal never wraps a line
+from one row onto the next. Lines are then tested with a handful of shifts
+and ANDs instead of walking the board cell by cell.
+
+Positions also maintain a pattern score: every win_length-long window that
+only one player occupies is worth a weight that grows with its stone count,
+so an open three (two live windows in connect-4) outscores a closed three
+(one live window), which in turn outscores twos. The score is adjusted per
+move from the handful of windows through the played square.
+
+The position also keeps its candidate-move frontier (empty squares near a
+stone) up to date on every move, and carries a 64-bit Zobrist key that is updated with one
+XOR per move, so the search can hash positions without building strings.
+"""
+
+import math
+import random
+
+EMPTY = '.'
+PLAYERS = ('X', 'O')
+SIDE = {'X': 0, 'O': 1}
+
+# (dr, dc) for horizontal, vertical, diagonal and anti-diagonal lines
+_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+# Largest pattern score any position may reach: half of search.WIN_SCORE,
+# so no heuristic score is ever taken for a proven win or loss
+MAX_PATTERN_SCORE = 500000
+
+
+def popcount(bits):
+    return bin(bits).count('1')
+
+
+def iter_bits(bits):
+    """Yield the square index of every set bit, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _runs(bits, shift, length):
+    """Return the start squares of every run of ``length`` stones along ``shift``."""
+    n = 1
+    while n * 2 <= length:
+        bits &= bits >> (n * shift)
+        n *= 2
+    if n < length:
+        bits &= bits >> ((length - n) * shift)
+    return bits
+
+
+class Geometry:
+    """Per-(size, win_length) lookup tables shared by every position."""
+
+    def __init__(self, size, win_length):
+        self.size = size
+        self.win_length = win_length
+        self.stride = stride = size + 1
+        self.full = sum(1 << (r * stride + c) for r in range(size) for c in range(size))
+        # lines[sq] holds (shift, mask) for the four directions through sq,
+        # the mask covering the win_length - 1 squares on either side.
+        self.lines = [None] * (size * stride)
+        for r in range(size):
+            for c in range(size):
+                entry = []
+                for dr, dc in _DIRECTIONS:
+                    mask = 0
+                    for i in range(-(win_length - 1), win_length):
+                        rr, cc = r + i * dr, c + i * dc
+                        if 0 <= rr < size and 0 <= cc < size:
+                            mask |= 1 << (rr * stride + cc)
+                    entry.append((dr * stride + dc, mask))
+                self.lines[r * stride + c] = tuple(entry)
+        # Zobrist keys. The generator is seeded from the geometry so every
+        # process derives the same keys, and the base key keeps positions of
+        # different geometries apart.
+        rng = random.Random(size << 8 | win_length)
+        self.zobrist_base = rng.getrandbits(64)
+        self.side_key = rng.getrandbits(64)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(size * stride)] for _ in range(2)]
+        self._near = {}
+        self._build_windows()
+
+    def _build_windows(self):
+        size, stride, k = self.size, self.stride, self.win_length
+        windows = []
+        for dr, dc in _DIRECTIONS:
+            for r in range(size):
+                for c in range(size):
+                    end_r, end_c = r + (k - 1) * dr, c + (k - 1) * dc
+                    if 0 <= end_r < size and 0 <= end_c < size:
+                        windows.append(tuple((r + i * dr) * stride + c + i * dc for i in range(k)))
+        self.windows = windows
+        self.window_masks = [sum(1 << sq for sq in squares) for squares in windows]
+        sq_windows = [[] for _ in range(size * stride)]
+        for w, squares in enumerate(windows):
+            for sq in squares:
+                sq_windows[sq].append(w)
+        self.sq_windows = [tuple(ws) for ws in sq_windows]
+        # A window's code is x_count + o_count * (k + 1); code_increment[side]
+        # is what one stone of that side adds.
+        self.code_increment = (1, k + 1)
+        self.set_weights(window_weights(k))
+
+    def set_weights(self, weights):
+        """Rebuild the code -> score table from per-count window weights.
+
+        A score is a sum over the windows, so it stays within
+        len(windows) * max(|weight|). Weights that would let it pass
+        MAX_PATTERN_SCORE are compressed as ``w ** a``, with ``a`` chosen
+        so the largest lands on the cap: their order is kept, and the
+        default 8 ** (n - 1) just gets a smaller base on long lines.
+        """
+        k = self.win_length
+        cap = MAX_PATTERN_SCORE // max(1, len(self.windows))
+        top = max(abs(w) for w in weights)
+        if top > cap:
+            power = math.log(cap) / math.log(top)
+            weights = [round(math.copysign(abs(w) ** power, w)) for w in weights]
+        values = [0] * ((k + 1) * (k + 1))
+        for x in range(k + 1):
+            for o in range(k + 1):
+                if x and not o:
+                    values[x + o * (k + 1)] = -weights[x]
+                elif o and not x:
+                    values[x + o * (k + 1)] = weights[o]
+        self.window_values = values
+
+    def near_masks(self, radius):
+        """Per-square masks of the board squares within ``radius`` (Chebyshev)."""
+        masks = self._near.get(radius)
+        if masks is None:
+            size, stride = self.size, self.stride
+            masks = [0] * (size * stride)
+            for r in range(size):
+                for c in range(size):
+                    mask = 0
+                    for rr in range(max(0, r - radius), min(size, r + radius + 1)):
+                        for cc in range(max(0, c - radius), min(size, c + radius + 1)):
+                            mask |= 1 << (rr * stride + cc)
+                    masks[r * stride + c] = mask
+            self._near[radius] = masks
+        return masks
+
+
+_geometries = {}
+# Window weights replacing the defaults, by win_length (set_window_weights)
+_tuned_weights = {}
+
+
+def window_weights(win_length):
+    """Weight of a live window holding n stones, for n in 0..win_length,
+    before Geometry.set_weights caps it for a board."""
+    tuned = _tuned_weights.get(win_length)
+    if tuned is not None:
+        return list(tuned)
+    return [0] + [8 ** (n - 1) for n in range(1, win_length)] + [0]
+
+
+def set_window_weights(win_length, weights):
+    """Use ``weights`` (n = 0..win_length) for every board of ``win_length``,
+    or the defaults again if ``weights`` is None.
+
+    Scores of positions that already exist are not updated, so call this
+    before positions are created (l4 does it at import).
+    """
+    if weights is None:
+        _tuned_weights.pop(win_length, None)
+    else:
+        if len(weights) != win_length + 1:
+            raise ValueError(f'expected {win_length + 1} window weights, got {len(weights)}')
+        _tuned_weights[win_length] = tuple(weights)
+    for (_, k), geo in _geometries.items():
+        if k == win_length:
+            geo.set_weights(window_weights(k))
+
+
+def geometry(size, win_length):
+    geo = _geometries.get((size, win_length))
+    if geo is None:
+        geo = _geometries[(size, win_length)] = Geometry(size, win_length)
+    return geo
+
+
+class Position:
+    """Board position stored as one bitboard per player.
+
+    ``bits[0]`` holds X's stones and ``bits[1]`` holds O's. Moves are made
+    with :meth:`play` and taken back with :meth:`undo`; the move stack makes
+    it cheap to search in place and rewind afterwards.
+
+    ``frontier`` is the mask of empty squares within ``radius`` of a stone.
+    Each move ORs in that square's precomputed neighbourhood and saves the
+    previous mask, so make/unmake cost O(1) and move generation only walks
+    the squares it returns.
+
+    ``symmetries`` lists the board transforms, as ``(perm, inverse)`` square
+    permutations, that the search treats as equivalent (see
+    :meth:`set_symmetry`); ``sym_keys`` holds the Zobrist key of the
+    position's image under each, updated by play/undo like ``key``.
+    """
+
+    __slots__ = ('size', 'win_length', 'stride', 'full', 'geo', 'bits', 'count', 'moves',
+                 'key', '_zobrist', 'radius', 'frontier', '_frontiers', '_near',
+                 'score', '_codes', 'symmetries', 'sym_keys')
+
+    def __init__(self, size, win_length=None, radius=1):
+        self.size = size
+        self.win_length = min(4, size) if win_length is None else win_length
+        self.geo = geometry(size, self.win_length)
+        self.stride = self.geo.stride
+        self.full = self.geo.full
+        self.bits = [0, 0]
+        self.count = 0
+        self.moves = []
+        self.key = self.geo.zobrist_base
+        self._zobrist = self.geo.zobrist
+        self.radius = radius
+        self.frontier = 0
+        self._frontiers = []
+        self._near = self.geo.near_masks(radius)
+        self.score = 0
+        self._codes = [0] * len(self.geo.windows)
+        self.symmetries = ()
+        self.sym_keys = []
+
+    @classmethod
+    def from_board(cls, board, win_length=None):
+        """Build a position from a list-of-lists board of '.', 'X' and 'O'."""
+        pos = cls(len(board), win_length)
+        stride = pos.stride
+        for r, row in enumerate(board):
+            for c, cell in enumerate(row):
+                if cell != EMPTY:
+                    pos.play(r * stride + c, SIDE[cell])
+        return pos
+
+    def copy(self):
+        """Return an independent position with the same stones, radius and
+        symmetries."""
+        pos = Position(self.size, self.win_length, self.radius)
+        for entry in self.moves:
+            pos.play(entry >> 1, entry & 1)
+        pos.set_symmetry(self.symmetries)
+        return pos
+
+    def to_board(self):
+        """Return the position as a list-of-lists board."""
+        board = [[EMPTY for _ in range(self.size)] for _ in range(self.size)]
+        for side, player in enumerate(PLAYERS):
+            for sq in iter_bits(self.bits[side]):
+                r, c = divmod(sq, self.stride)
+                board[r][c] = player
+        return board
+
+    # --- Coordinates ---
+    def square(self, r, c):
+        return r * self.stride + c
+
+    def coords(self, sq):
+        return divmod(sq, self.stride)
+
+    # --- Make / unmake ---
+    def play(self, sq, side):
+        bits = self.bits
+        bits[side] |= 1 << sq
+        self.key ^= self._zobrist[side][sq]
+        self.count += 1
+        self.moves.append(sq << 1 | side)
+        self._frontiers.append(self.frontier)
+        self.frontier = (self.frontier | self._near[sq]) & ~(bits[0] | bits[1])
+        geo = self.geo
+        codes = self._codes
+        values = geo.window_values
+        inc = geo.code_increment[side]
+        delta = 0
+        for w in geo.sq_windows[sq]:
+            old = codes[w]
+            codes[w] = old + inc
+            delta += values[old + inc] - values[old]
+        self.score += delta
+        if self.symmetries:
+            self._update_sym_keys(sq, side)
+
+    def undo(self):
+        entry = self.moves.pop()
+        sq = entry >> 1
+        side = entry & 1
+        self.bits[side] ^= 1 << sq
+        self.key ^= self._zobrist[side][sq]
+        self.count -= 1
+        geo = self.geo
+        codes = self._codes
+        values = geo.window_values
+        inc = geo.code_increment[side]
+        delta = 0
+        for w in geo.sq_windows[sq]:
+            old = codes[w]
+            codes[w] = old - inc
+            delta += values[old - inc] - values[old]
+        self.score += delta
+        if self.symmetries:
+            self._update_sym_keys(sq, side)
+        frontier = self._frontiers.pop()
+        if frontier is None:
+            # Saved before the radius changed; rebuild from the stones
+            frontier = self.neighbourhood(self.radius)
+        self.frontier = frontier
+
+    def set_radius(self, radius):
+        """Switch the frontier radius, rebuilding the frontier if it changed."""
+        if radius == self.radius:
+            return
+        self.radius = radius
+        self._near = self.geo.near_masks(radius)
+        self.frontier = self.neighbourhood(radius)
+        self._frontiers = [None] * len(self._frontiers)
+
+    def _update_sym_keys(self, sq, side):
+        zobrist = self._zobrist[side]
+        keys = self.sym_keys
+        for i, (perm, _) in enumerate(self.symmetries):
+            keys[i] ^= zobrist[perm[sq]]
+
+    # --- Symmetry ---
+    def set_symmetry(self, transforms):
+        """Track keys for ``transforms``, a list of ``(perm, inverse)`` pairs.
+
+        Positions that are images of each other under these transforms then
+        share :meth:`canonical` keys. Only use transforms that map the
+        current position onto itself (symmetry.stabilizer): every position
+        searched from here then has its images among the positions searched
+        too. An empty list switches tracking off, and play/undo pay nothing.
+        """
+        self.symmetries = list(transforms)
+        self.sym_keys = []
+        for perm, _ in self.symmetries:
+            key = self.geo.zobrist_base
+            for side in (0, 1):
+                zobrist = self._zobrist[side]
+                for sq in iter_bits(self.bits[side]):
+                    key ^= zobrist[perm[sq]]
+            self.sym_keys.append(key)
+
+    def canonical(self):
+        """Return ``(key, i)``: the smallest of ``key`` and ``sym_keys``, and
+        the index in ``symmetries`` of the transform giving it (-1 for the
+        identity)."""
+        key = self.key
+        best = -1
+        for i, sym_key in enumerate(self.sym_keys):
+            if sym_key < key:
+                key = sym_key
+                best = i
+        return key, best
+
+    # --- Queries ---
+    def occupied(self):
+        return self.bits[0] | self.bits[1]
+
+    def empty(self):
+        return self.full & ~(self.bits[0] | self.bits[1])
+
+    def is_empty(self, sq):
+        return not (self.bits[0] | self.bits[1]) >> sq & 1
+
+    def is_full(self):
+        return (self.bits[0] | self.bits[1]) == self.full
+
+    def has_won(self, side):
+        """Return True if ``side`` has ``win_length`` stones in a row anywhere."""
+        bits = self.bits[side]
+        k = self.win_length
+        stride = self.stride
+        for shift in (1, stride, stride + 1, stride - 1):
+            if _runs(bits, shift, k):
+                return True
+        return False
+
+    def is_win_at(self, sq, side):
+        """Return True if the stone on ``sq`` completes a line for ``side``.
+
+        Only a move just played can create a new win, so the search checks
+        the four lines through that square instead of the whole board.
+        """
+        bits = self.bits[side]
+        k = self.win_length
+        for shift, mask in self.geo.lines[sq]:
+            if _runs(bits & mask, shift, k):
+                return True
+        return False
+
+    def is_winning_move(self, sq, side):
+        """Return True if playing ``side`` on the empty ``sq`` would win.
+
+        Like :meth:`is_win_at` but without playing the move, so the position
+        is only read.
+        """
+        bits = self.bits[side] | 1 << sq
+        k = self.win_length
+        for shift, mask in self.geo.lines[sq]:
+            if _runs(bits & mask, shift, k):
+                return True
+        return False
+
+    def live_squares(self, side, count):
+        """Return the empty squares of windows holding exactly ``count`` stones
+        of ``side`` and none of the opponent's.
+
+        With ``count = win_length - 1`` these are the squares where ``side``
+        wins at once.
+        """
+        geo = self.geo
+        target = count * geo.code_increment[side]
+        masks = geo.window_masks
+        codes = self._codes
+        found = 0
+        stones = self.bits[side]
+        if count and popcount(stones) * 4 * self.win_length < len(codes):
+            # Few stones on a big board: only windows through one of them
+            # can hold ``count`` stones, so skip the scan of every window
+            sq_windows = geo.sq_windows
+            for sq in iter_bits(stones):
+                for w in sq_windows[sq]:
+                    if codes[w] == target:
+                        found |= masks[w]
+        else:
+            for w, code in enumerate(codes):
+                if code == target:
+                    found |= masks[w]
+        return found & ~(self.bits[0] | self.bits[1])
+
+    def neighbourhood(self, radius):
+        """Return the empty squares within ``radius`` (Chebyshev) of any stone."""
+        occ = self.bits[0] | self.bits[1]
+        full = self.full
+        stride = self.stride
+        grown = occ
+        for _ in range(radius):
+            grown |= (grown << 1) | (grown >> 1)
+            grown |= (grown << stride) | (grown >> stride)
+            grown &= full
+        return grown & ~occ
+
+    def __str__(self):
+        """Same layout as ``board_to_string``: row-major cells, no separators."""
+        return ''.join(''.join(row) for row in self.to_board())
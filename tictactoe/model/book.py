@@ -0,0 +1,179 @@
+"""Precomputed opening book in a compact, memory-mapped binary file.
+
+File layout (little-endian)::
+
+    header  '<4sHBBBxI'  magic b'TTTB', version, size, win_length, plies, count
+    records '<QHi'       canonical key, move cell, score   (sorted by key)
+
+A record's key is the smallest Zobrist key over the eight board symmetries,
+with the side-to-move key folded in, so every rotation or reflection of a
+position shares one record. The move cell is ``r * size + c`` in the
+orientation that produced that key and is mapped back on lookup.
+
+Books are opened with mmap and binary-searched in place: opening costs
+nothing up front and every process using the same file shares its pages.
+
+Build one offline with::
+
+    python -m tictactoe.model.book --size 5 --plies 5
+"""
+
+import mmap
+import os
+import struct
+import time
+
+from tictactoe.model.bitboard import Position, iter_bits
+from tictactoe.model.symmetry import canonical_key, permutations
+
+MAGIC = b'TTTB'
+VERSION = 1
+_HEADER = struct.Struct('<4sHBBBxI')
+_RECORD = struct.Struct('<QHi')
+
+# Where the engine looks for books; TICTACTOE_BOOK_DIR overrides it
+BOOK_DIR = os.environ.get('TICTACTOE_BOOK_DIR',
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books'))
+
+
+def book_path(size, win_length, directory=None):
+    return os.path.join(directory or BOOK_DIR, f'book_{size}x{size}_k{win_length}.bin')
+
+
+class OpeningBook:
+    """Read-only view of a book file."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'{path}: empty book file')
+        magic, version, size, win_length, plies, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path}: not a version {VERSION} opening book')
+        if len(self._mm) != _HEADER.size + count * _RECORD.size:
+            self.close()
+            raise ValueError(f'{path}: truncated opening book')
+        self.size = size
+        self.win_length = win_length
+        self.plies = plies
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def _find(self, key):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = _RECORD.unpack_from(self._mm, _HEADER.size + mid * _RECORD.size)[0]
+            if mid_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            record = _RECORD.unpack_from(self._mm, _HEADER.size + lo * _RECORD.size)
+            if record[0] == key:
+                return record
+        return None
+
+    def lookup(self, pos, side):
+        """Return ``(square, score)`` for ``side`` to move in ``pos``, or None."""
+        if pos.size != self.size or pos.win_length != self.win_length or pos.count >= self.plies:
+            return None
+        key, t = canonical_key(pos, side)
+        record = self._find(key)
+        if record is None:
+            return None
+        r, c = divmod(record[1], self.size)
+        _, inverse = permutations(self.size)
+        sq = inverse[t][pos.square(r, c)]
+        if not pos.is_empty(sq):
+            return None  # a hash collision; ignore the record
+        return sq, record[2]
+
+
+def build_book(size, win_length=None, plies=4, sides=(1,), time_limit=1.0, log=None):
+    """Search every opening up to ``plies`` stones and return sorted records.
+
+    ``sides`` holds 0 for X and/or 1 for O. For those sides only the book
+    move is followed, while every reply by the other side is expanded.
+    Positions are deduplicated by symmetry before they are searched.
+    """
+    from tictactoe.model import l4
+
+    if win_length is None:
+        win_length = min(4, size)
+    perms, inverse = permutations(size)
+    records = {}
+    frontier = [Position(size, win_length)]
+    for ply in range(plies):
+        side = ply % 2
+        next_frontier = {}
+        for pos in frontier:
+            if side in sides:
+                key, t = canonical_key(pos, side)
+                if key not in records:
+                    result = l4._search_position(pos, side, time_limit, use_book=False)
+                    r, c = pos.coords(perms[t][result.move])
+                    records[key] = (r * size + c, result.score)
+                r, c = divmod(records[key][0], size)
+                moves = [inverse[t][pos.square(r, c)]]
+            else:
+                moves = list(iter_bits(pos.empty()))
+            for sq in moves:
+                child = pos.copy()
+                child.play(sq, side)
+                if child.is_win_at(sq, side) or child.is_full():
+                    continue
+                next_frontier.setdefault(canonical_key(child, 1 - side)[0], child)
+        frontier = list(next_frontier.values())
+        if log:
+            log(f'ply {ply}: {len(records)} book positions, {len(frontier)} to expand')
+    return sorted((key, cell, score) for key, (cell, score) in records.items())
+
+
+def write_book(path, size, win_length, plies, records):
+    """Write sorted ``(key, cell, score)`` records to ``path``."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, size, win_length, plies, len(records)))
+        for record in records:
+            f.write(_RECORD.pack(*record))
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    import argparse  # only the command line needs it; the engine imports this module
+
+    parser = argparse.ArgumentParser(description='Build an opening book.')
+    parser.add_argument('--size', type=int, required=True)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--plies', type=int, default=4)
+    parser.add_argument('--side', choices=['X', 'O', 'both'], default='O')
+    parser.add_argument('--time-limit', type=float, default=1.0,
+                        help='search time per book position, in seconds')
+    parser.add_argument('--out', default=None)
+    args = parser.parse_args(argv)
+
+    win_length = args.win_length or min(4, args.size)
+    sides = (0, 1) if args.side == 'both' else ('XO'.index(args.side),)
+    start = time.time()
+    records = build_book(args.size, win_length, args.plies, sides, args.time_limit, log=print)
+    path = args.out or book_path(args.size, win_length)
+    write_book(path, args.size, win_length, args.plies, records)
+    print(f'{len(records)} positions written to {path} in {time.time() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
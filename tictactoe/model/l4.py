@@ -1,13 +1,83 @@
+import os
 import random
 
-# Transposition table for caching board evaluations
-transposition_table = {}
+from tictactoe.model import records, weights
+from tictactoe.model.bitboard import SIDE, Position, iter_bits, popcount, set_window_weights
+from tictactoe.model.book import OpeningBook, book_path
+from tictactoe.model.search import (INF, MAX_DEPTH, WIN_SCORE, Searcher, SearchControl,
+                                    SearchResult, SearchStats)
+from tictactoe.model.symmetry import stabilizer, unique_moves
+from tictactoe.model.threats import TIME_SHARE, ThreatSolver, defensive_moves
+from tictactoe.model.ttable import NO_MOVE, TranspositionTable
+
+# Transposition table for caching board evaluations. It has a fixed capacity,
+# so memory stays flat however many games are played.
+transposition_table = TranspositionTable()
 
 def clear_transposition_table():
     """Clear the transposition table to free memory"""
-    global transposition_table
     transposition_table.clear()
 
+# Largest board the engine supports, e.g. 15x15 or 19x19 five in a row
+MAX_BOARD_SIZE = 19
+# Boards above this size use a fixed candidate radius (see _radius_for)
+SMALL_BOARD = 10
+LARGE_BOARD_RADIUS = 2
+
+# Move-ordering priority terms (evaluate_move_priority, _square_priority):
+# per step of closeness to the centre, for an immediate win, for blocking
+# the opponent's immediate win, and per stone in the surrounding 3x3 block
+PRIORITY_CENTER = 10
+PRIORITY_WIN = 1000
+PRIORITY_BLOCK = 900
+PRIORITY_NEIGHBOUR = 5
+
+def set_weights(move_priority=None, window_weights=None):
+    """Replace the move-ordering terms (a dict with the keys of
+    weights.PRIORITY_TERMS) and/or the pattern weights of some win lengths
+    (a dict of win_length -> weights, see bitboard.set_window_weights).
+
+    Called at import with the tuned weights file, if there is one. Worker
+    processes load that file themselves, so weights set any other way only
+    reach them when they are forked.
+    """
+    global PRIORITY_CENTER, PRIORITY_WIN, PRIORITY_BLOCK, PRIORITY_NEIGHBOUR
+    if move_priority is not None:
+        PRIORITY_CENTER = move_priority['center']
+        PRIORITY_WIN = move_priority['win']
+        PRIORITY_BLOCK = move_priority['block']
+        PRIORITY_NEIGHBOUR = move_priority['neighbour']
+    for win_length, values in (window_weights or {}).items():
+        set_window_weights(win_length, values)
+    transposition_table.clear()  # its scores came from the old weights
+
+def _load_weights():
+    # Like a broken opening book, a broken weights file leaves the defaults
+    try:
+        tuned = weights.load_weights()
+    except (OSError, ValueError):
+        tuned = None
+    if tuned is not None:
+        set_weights(**tuned)
+
+_load_weights()
+
+# Opening books by (size, win_length), opened on first use; None if absent
+_books = {}
+
+def _opening_book(size, win_length):
+    key = (size, win_length)
+    if key not in _books:
+        path = book_path(size, win_length)
+        book = None
+        if os.path.exists(path):
+            try:
+                book = OpeningBook(path)
+            except (OSError, ValueError):
+                book = None
+        _books[key] = book
+    return _books[key]
+
 # --- Tic Tac Toe Functions ---
 def create_board(size=8):
     return [['.' for _ in range(size)] for _ in range(size)]
@@ -39,6 +109,24 @@ def check_win(board,player,win_length=4):
                 return True
     return False
 
+def check_win_at(board, row, col, player, win_length=4):
+    """Check only the four lines through (row, col) for a win by player.
+
+    Only the move just played can create a new win, so this is O(win_length)
+    instead of the full-board scan done by check_win.
+    """
+    size = len(board)
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = 1
+        for sign in (1, -1):
+            r, c = row + sign * dr, col + sign * dc
+            while 0 <= r < size and 0 <= c < size and board[r][c] == player:
+                count += 1
+                r, c = r + sign * dr, c + sign * dc
+        if count >= win_length:
+            return True
+    return False
+
 def human_move(board):
     size = len(board)
     while True:
@@ -47,25 +135,40 @@ def human_move(board):
             row, col = map(int, move.split(','))
             if 0 <= row < size and 0 <= col < size and board[row][col] == '.':
                 board[row][col] = 'X'
-                break
+                return row, col
             else:
                 print("Invalid or occupied cell.")
         except ValueError:
             print("Enter valid integers in the format row,col (e.g., 0,1).")
 
 # --- Optimized Minimax with Alpha-Beta Pruning ---
-def evaluate(board):
-    if check_win(board,'O'):
+def evaluate(board, win_length=None):
+    # win_length defaults to min(4, size); a Position brings its own
+    pos = board if isinstance(board, Position) else Position.from_board(board, win_length)
+    if pos.has_won(1):
         return 10
-    elif check_win(board,'X'):
+    elif pos.has_won(0):
         return -10
     else:
         return 0
 
+def evaluate_patterns(board, win_length=None):
+    """Heuristic score from O's point of view: open/closed twos and threes
+    for O count positive, X's count negative (see bitboard.Position)"""
+    pos = board if isinstance(board, Position) else Position.from_board(board, win_length)
+    return pos.score
+
 def get_adaptive_radius(board):
     """Calculate adaptive radius based on board size and game phase"""
     size = len(board)
     occupied_count = sum(1 for row in board for cell in row if cell != '.')
+    return _radius_for(size, occupied_count)
+
+def _radius_for(size, occupied_count):
+    if size > SMALL_BOARD:
+        # Big boards are never crowded enough for the phase to matter, and a
+        # radius growing with the board would make every node cost more
+        return LARGE_BOARD_RADIUS
     total_cells = size * size
     
     # Base radius on board size
@@ -121,28 +224,30 @@ def get_candidate_moves(board, radius=None):
     
     return list(candidates)
 
-def evaluate_move_priority(move, board, player='O'):
+def evaluate_move_priority(move, board, player='O', win_length=None):
     """Evaluate move priority for better ordering (higher = better)"""
     r, c = move
     size = len(board)
+    if win_length is None:
+        win_length = min(4, size)
     priority = 0
     
     # Center moves are generally better
     center = size // 2
     distance_from_center = abs(r - center) + abs(c - center)
-    priority += (size - distance_from_center) * 10
+    priority += (size - distance_from_center) * PRIORITY_CENTER
     
     # Check for immediate win
     board[r][c] = player
-    if check_win(board, player, min(4, size)):
-        priority += 1000
+    if check_win_at(board, r, c, player, win_length):
+        priority += PRIORITY_WIN
     board[r][c] = '.'
     
     # Check for immediate block
     opponent = 'X' if player == 'O' else 'O'
     board[r][c] = opponent
-    if check_win(board, opponent, min(4, size)):
-        priority += 900
+    if check_win_at(board, r, c, opponent, win_length):
+        priority += PRIORITY_BLOCK
     board[r][c] = '.'
     
     # Prefer moves near existing pieces
@@ -153,65 +258,104 @@ def evaluate_move_priority(move, board, player='O'):
             if (0 <= nr < size and 0 <= nc < size and 
                 board[nr][nc] != '.'):
                 nearby_pieces += 1
-    priority += nearby_pieces * 5
+    priority += nearby_pieces * PRIORITY_NEIGHBOUR
     
     return priority
 
-def get_ordered_candidates(board, player='O'):
+def get_ordered_candidates(board, player='O', win_length=None):
     """Get candidate moves ordered by priority"""
     candidates = get_candidate_moves(board)
-    return sorted(candidates, key=lambda move: evaluate_move_priority(move, board, player), reverse=True)
+    return sorted(candidates, key=lambda move: evaluate_move_priority(move, board, player, win_length),
+                  reverse=True)
 
 def board_to_string(board):
     """Convert board to string for hashing"""
     return ''.join(''.join(row) for row in board)
 
-def minimax_alpha_beta(board, depth, is_maximizing, alpha=-float('inf'), beta=float('inf')):
-    """Minimax with alpha-beta pruning, move ordering, and transposition table"""
-    # Check transposition table
-    board_key = board_to_string(board)
-    if (board_key, depth, is_maximizing) in transposition_table:
-        return transposition_table[(board_key, depth, is_maximizing)]
+# --- Bitboard search internals ---
+# The list-of-lists helpers above stay as the public API. The search below
+# runs on a Position and only converts at the boundary (see ai_move).
+
+def _candidate_squares(pos):
+    """Bitboard counterpart of get_candidate_moves; returns square indices
+
+    Reads the position's incrementally maintained frontier, whose radius is
+    chosen once per search by _set_search_radius.
+    """
+    if not pos.count:
+        size = pos.size
+        center = size // 2
+        return [pos.square(r, c)
+                for r in range(max(0, center-1), min(size, center+2))
+                for c in range(max(0, center-1), min(size, center+2))]
+    return list(iter_bits(pos.frontier or pos.empty()))
+
+def _set_search_radius(pos):
+    # The game phase barely moves during one search, so the adaptive radius
+    # is fixed from the root instead of being recomputed at every node.
+    pos.set_radius(_radius_for(pos.size, pos.count))
+
+def _set_search_symmetry(pos):
+    # Only the root's own symmetries are tracked: once the game position is
+    # asymmetric the list is empty and canonical hashing costs nothing.
+    pos.set_symmetry(stabilizer(pos))
+
+def _square_priority(pos, sq, side):
+    """Bitboard counterpart of evaluate_move_priority"""
+    r, c = pos.coords(sq)
+    size = pos.size
+    center = size // 2
+    priority = (size - abs(r - center) - abs(c - center)) * PRIORITY_CENTER
     
-    score = evaluate(board)
-    if score == 10 or score == -10 or is_full(board) or depth == 0:
-        transposition_table[(board_key, depth, is_maximizing)] = score
-        return score
+    pos.play(sq, side)
+    if pos.is_win_at(sq, side):
+        priority += PRIORITY_WIN
+    pos.undo()
+    
+    opponent = 1 - side
+    pos.play(sq, opponent)
+    if pos.is_win_at(sq, opponent):
+        priority += PRIORITY_BLOCK
+    pos.undo()
+    
+    # Stones in the surrounding 3x3 block
+    stride = pos.stride
+    block = 1 << sq
+    block |= (block << 1) | (block >> 1)
+    block |= (block << stride) | (block >> stride)
+    priority += popcount(pos.occupied() & block & pos.full) * PRIORITY_NEIGHBOUR
+    
+    return priority
 
-    if is_maximizing:
-        best = -float('inf')
-        player = 'O'
-        candidates = get_ordered_candidates(board, player)
-        
-        for r, c in candidates:
-            board[r][c] = player
-            best = max(best, minimax_alpha_beta(board, depth-1, False, alpha, beta))
-            board[r][c] = '.'
-            
-            # Alpha-beta pruning
-            alpha = max(alpha, best)
-            if beta <= alpha:
-                break  # Beta cutoff
-                
-        transposition_table[(board_key, depth, is_maximizing)] = best
-        return best
+def _ordered_squares(pos, side):
+    candidates = _candidate_squares(pos)
+    return sorted(candidates, key=lambda sq: _square_priority(pos, sq, side), reverse=True)
+
+def minimax_alpha_beta(board, depth, is_maximizing, alpha=-float('inf'), beta=float('inf'),
+                       win_length=None):
+    """Minimax with alpha-beta pruning, move ordering, and transposition table
+
+    Accepts a list-of-lists board or a Position and returns the score from
+    O's point of view. Runs the negamax/PVS core in search.py; wins score
+    +/-WIN_SCORE, adjusted so that quicker wins and slower losses are
+    preferred, and other leaves get the pattern score.
+    """
+    if isinstance(board, Position):
+        pos = board
     else:
-        best = float('inf')
-        player = 'X'
-        candidates = get_ordered_candidates(board, player)
-        
-        for r, c in candidates:
-            board[r][c] = player
-            best = min(best, minimax_alpha_beta(board, depth-1, True, alpha, beta))
-            board[r][c] = '.'
-            
-            # Alpha-beta pruning
-            beta = min(beta, best)
-            if beta <= alpha:
-                break  # Alpha cutoff
-                
-        transposition_table[(board_key, depth, is_maximizing)] = best
-        return best
+        pos = Position.from_board(board, win_length)
+    _set_search_radius(pos)
+    _set_search_symmetry(pos)
+    
+    score = evaluate(pos)
+    if score == 10 or score == -10:
+        return WIN_SCORE if score > 0 else -WIN_SCORE
+    alpha = max(alpha, -INF)
+    beta = min(beta, INF)
+    searcher = Searcher(pos, transposition_table)
+    if is_maximizing:
+        return searcher.negamax(1, depth, alpha, beta)
+    return -searcher.negamax(0, depth, -beta, -alpha)
 
 # Keep original minimax for backward compatibility
 
@@ -240,87 +384,158 @@ def minimax(board, depth, is_maximizing):
                     board[r][c]='.'
         return best
 
-def check_immediate_tactics(board, player='O'):
+def check_immediate_tactics(board, player='O', win_length=None):
     """Check for immediate win or block moves"""
-    size = len(board)
-    win_length = min(4, size)
-    
-    # Get all empty cells
-    empty_cells = [(r, c) for r in range(size) for c in range(size) if board[r][c] == '.']
+    pos = Position.from_board(board, win_length)
+    sq, tactic_type = _square_tactics(pos, SIDE[player])
+    if sq is None:
+        return None, None
+    return pos.coords(sq), tactic_type
+
+def _square_tactics(pos, side):
+    # A move that completes a line touches a stone of that line, so only
+    # squares next to a stone are tried; the cost follows the stones played
+    empty_squares = list(iter_bits(pos.neighbourhood(1) if pos.count else pos.empty()))
     
     # Check for immediate win
-    for r, c in empty_cells:
-        board[r][c] = player
-        if check_win(board, player, win_length):
-            board[r][c] = '.'
-            return (r, c), 'win'
-        board[r][c] = '.'
+    for sq in empty_squares:
+        pos.play(sq, side)
+        won = pos.is_win_at(sq, side)
+        pos.undo()
+        if won:
+            return sq, 'win'
     
     # Check for immediate block
-    opponent = 'X' if player == 'O' else 'O'
-    for r, c in empty_cells:
-        board[r][c] = opponent
-        if check_win(board, opponent, win_length):
-            board[r][c] = '.'
-            return (r, c), 'block'
-        board[r][c] = '.'
+    opponent = 1 - side
+    for sq in empty_squares:
+        pos.play(sq, opponent)
+        won = pos.is_win_at(sq, opponent)
+        pos.undo()
+        if won:
+            return sq, 'block'
     
     return None, None
 
-def ai_move(board, time_limit=1.0):
-    """Enhanced AI move with tactical checks and time management"""
+def ai_move(board, time_limit=1.0, workers=None, max_depth=None, on_iteration=None,
+            win_length=None):
+    """Enhanced AI move with tactical checks and time management
+
+    Deepens until time_limit runs out (or max_depth, if given); the deadline
+    is checked inside the search, so the budget is respected. With
+    workers > 1 the root moves are searched on that many processes (see
+    parallel.py); the default stays single-threaded. on_iteration, if
+    given, is called with a SearchResult after each completed depth.
+    win_length defaults to min(4, size).
+
+    Returns a SearchStats describing the search.
+    """
+    pos = Position.from_board(board, win_length)
+    result = _search_position(pos, 1, time_limit, workers, max_depth,
+                              on_iteration=on_iteration)
+    if result.move != NO_MOVE:
+        r, c = pos.coords(result.move)
+        board[r][c] = 'O'
+    return result.stats
+
+def _threat_control(control, time_limit):
+    # Each threat-solver phase gets a slice of the move's budget, and stops
+    # when the move's own search is stopped
+    import time
+    
+    return control.child(time.time() + TIME_SHARE * (time_limit or 1.0))
+
+def _search_position(pos, side, time_limit, workers=None, max_depth=None, control=None,
+                     use_book=True, on_iteration=None, tt=None):
+    """Search pos for side; a given SearchControl replaces time_limit
+
+    tt defaults to the module's transposition_table. The returned
+    SearchResult carries a SearchStats in its stats slot.
+    """
     import time
     
+    started = time.time()
+    if control is None:
+        control = SearchControl(started + time_limit)
+    if tt is None:
+        tt = transposition_table
+    tt_before = tt.stats()
+    stats = SearchStats()
+    result = _choose_move(pos, side, time_limit, workers, max_depth, control, use_book,
+                          on_iteration, stats, tt)
+    
+    tt_after = tt.stats()
+    stats.tt_probes = tt_after['probes'] - tt_before['probes']
+    stats.tt_hits = tt_after['hits'] - tt_before['hits']
+    stats.tt_stores = tt_after['stores'] - tt_before['stores']
+    stats.elapsed = time.time() - started
+    stats.score = result.score
+    stats.depth = result.depth
+    if result.move != NO_MOVE:
+        stats.move = pos.coords(result.move)
+        stats.pv = [pos.coords(sq) for sq in result.pv]
+    result.stats = stats
+    return result
+
+def _choose_move(pos, side, time_limit, workers, max_depth, control, use_book, on_iteration,
+                 stats, tt):
     # First, check for immediate tactical moves
-    tactical_move, tactic_type = check_immediate_tactics(board, 'O')
-    if tactical_move:
-        board[tactical_move[0]][tactical_move[1]] = 'O'
-        return
+    tactical_move, tactic_type = _square_tactics(pos, side)
+    if tactical_move is not None:
+        stats.source = 'tactics'
+        return SearchResult(tactical_move)
+    
+    # Then the opening book, if one was built for this board
+    book = _opening_book(pos.size, pos.win_length) if use_book else None
+    if book is not None:
+        entry = book.lookup(pos, side)
+        if entry is not None:
+            stats.source = 'book'
+            return SearchResult(entry[0], entry[1])
+    
+    # Then forced wins by threats: ours first, theirs to defend against below
+    solver = ThreatSolver(pos, _threat_control(control, time_limit))
+    line = solver.vct(side)
+    stats.qnodes = solver.nodes
+    if line is not None:
+        stats.source = 'threats'
+        return SearchResult(line[0], WIN_SCORE, len(line), line)
     
     # Get ordered candidate moves
-    candidates = get_ordered_candidates(board, 'O')
+    _set_search_radius(pos)
+    _set_search_symmetry(pos)
+    candidates = unique_moves(pos, _ordered_squares(pos, side))
     
     # If no candidates, fallback to all empty cells
     if not candidates:
-        size = len(board)
-        candidates = [(r, c) for r in range(size) for c in range(size) if board[r][c] == '.']
+        candidates = list(iter_bits(pos.empty()))
+    if not candidates:
+        return SearchResult(NO_MOVE)
+    solver.control = _threat_control(control, time_limit)
+    candidates = defensive_moves(solver, side, candidates)
+    stats.qnodes = solver.nodes
     
-    best_val = -float('inf')
-    best_move = None
-    start_time = time.time()
-    
-    # Iterative deepening with time limit
-    depth = 1
-    while time.time() - start_time < time_limit and depth <= 4:
-        current_best = None
-        current_val = -float('inf')
-        
-        for r, c in candidates:
-            if time.time() - start_time >= time_limit:
-                break
-                
-            board[r][c] = 'O'
-            move_val = minimax_alpha_beta(board, depth=depth, is_maximizing=False)
-            board[r][c] = '.'
-            
-            if move_val > current_val:
-                current_val = move_val
-                current_best = (r, c)
-        
-        if current_best:
-            best_move = current_best
-            best_val = current_val
-        
-        depth += 1
-    
-    # Make the best move found
-    if best_move:
-        board[best_move[0]][best_move[1]] = 'O'
-    else:
-        # Fallback: random move from candidates
-        if candidates:
-            r, c = random.choice(candidates)
-            board[r][c] = 'O'
+    if max_depth is None:
+        max_depth = min(pos.size * pos.size - pos.count, MAX_DEPTH)
+    
+    if workers is not None and workers > 1:
+        from tictactoe.model.parallel import search_root_parallel
+        stats.source = 'parallel'
+        move, score, depth = search_root_parallel(pos, side, candidates, control.deadline,
+                                                  workers, max_depth, control, stats)
+        if move == NO_MOVE:
+            # Fallback: random move from candidates
+            return SearchResult(random.choice(candidates))
+        return SearchResult(move, score, depth)
+    
+    stats.source = 'search'
+    tt.new_search()
+    searcher = Searcher(pos, tt, control=control)
+    result = searcher.iterate(side, candidates, max_depth, on_iteration)
+    stats.nodes = searcher.nodes
+    stats.cutoffs = searcher.cutoffs
+    stats.first_move_cutoffs = searcher.first_move_cutoffs
+    stats.iterations = [dict(info, move=pos.coords(info['move'])) for info in searcher.iterations]
+    return result
 
 def ai_move_original(board):
     """Original AI move function (kept for comparison)"""
@@ -350,30 +565,48 @@ def ai_move_original(board):
 
 def tic_tac_toe_game():
     try:
-        size = int(input("Enter board size (min 4, default 8): "))
-        if size<4:
+        size = int(input(f"Enter board size (4-{MAX_BOARD_SIZE}, default 8): "))
+        if size<4 or size>MAX_BOARD_SIZE:
             size=8
     except:
         size=8
-    win_length = min(4,size)  # always 4 in a row to win
+    try:
+        win_length = int(input(f"Enter win length (3-{size}, default {min(4,size)}): "))
+        if win_length<3 or win_length>size:
+            win_length = min(4,size)
+    except:
+        win_length = min(4,size)
     board=create_board(size)
     print_board(board)
+    moves=[]
+    result=None
     
     while True:
-        human_move(board)
+        moves.append(human_move(board))
         print_board(board)
         if check_win(board,'X',win_length):
             print("Human wins!")
+            result='X'
             break
         if is_full(board):
             print("Draw!")
+            result='draw'
             break
 
-        ai_move(board)
+        stats=ai_move(board, win_length=win_length)
+        moves.append(stats.move)
         print_board(board)
         if check_win(board,'O',win_length):
             print("AI wins!")
+            result='O'
             break
         if is_full(board):
             print("Draw!")
+            result='draw'
             break
+
+    # Append the game to TICTACTOE_RECORDS, if set
+    writer=records.open_writer()
+    if writer is not None:
+        with writer:
+            writer.write(size, win_length, moves, result)
@@ -0,0 +1,161 @@
+"""Root-parallel search across a process pool.
+
+Root moves are dealt round-robin to the workers (the best-ordered moves end
+up at the front of every worker's share). Each worker searches its moves
+with its own transposition table, which survives between calls. The best
+score found so far is published through a shared value, so a worker that
+starts a move after a sibling raised it can probe with a null window
+instead of a full one. The parent merges the scores into one choice and
+reorders the root moves for the next iteration.
+"""
+
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from tictactoe.model.bitboard import Position
+from tictactoe.model.search import INF, WIN_SCORE, Searcher, SearchControl, SearchTimeout
+from tictactoe.model.symmetry import stabilizer
+from tictactoe.model.ttable import NO_MOVE, TranspositionTable
+
+_pool = None
+_pool_workers = 0
+_shared_alpha = None
+# Set to 1 by the parent to stop every worker's search at its next poll
+_shared_stop = None
+# Seconds between checks of the parent's SearchControl while workers run
+_STOP_POLL = 0.05
+# One parallel search at a time: the shared alpha belongs to the pool
+_search_lock = threading.Lock()
+
+# Worker-process state, set by _init_worker
+_worker_alpha = None
+_worker_stop = None
+_worker_tt = None
+
+
+def _init_worker(shared_alpha, shared_stop):
+    global _worker_alpha, _worker_stop, _worker_tt
+    _worker_alpha = shared_alpha
+    _worker_stop = shared_stop
+    _worker_tt = TranspositionTable()
+
+
+class _WorkerControl(SearchControl):
+    """A worker's deadline, which also expires when the parent stops."""
+
+    def expired(self):
+        return bool(_worker_stop.value) or super().expired()
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers, _shared_alpha, _shared_stop
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _shared_alpha = multiprocessing.Value('q', -INF)
+        _shared_stop = multiprocessing.Value('b', 0)
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(_shared_alpha, _shared_stop))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the worker processes, if any were started."""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+        _pool_workers = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def _search_moves(board, win_length, radius, side, depth, moves, deadline):
+    """Worker entry point: search ``moves`` and return ``({square: (score,
+    exact)}, nodes, cutoffs, first_move_cutoffs)``.
+
+    A move probed against an already-published alpha that fails low only
+    gets an upper bound; ``exact`` is False for those.
+    """
+    pos = Position.from_board(board, win_length)
+    pos.set_radius(radius)
+    pos.set_symmetry(stabilizer(pos))
+    _worker_tt.new_search()
+    searcher = Searcher(pos, _worker_tt, control=_WorkerControl(deadline))
+    opponent = 1 - side
+    scores = {}
+    for sq in moves:
+        alpha = _worker_alpha.value
+        pos.play(sq, side)
+        exact = True
+        try:
+            if pos.is_win_at(sq, side):
+                score = WIN_SCORE + depth
+            elif alpha == -INF:
+                score = -searcher.negamax(opponent, depth - 1, -INF, INF, 1)
+            else:
+                score = -searcher.negamax(opponent, depth - 1, -alpha - 1, -alpha, 1)
+                if score > alpha:
+                    score = -searcher.negamax(opponent, depth - 1, -INF, -alpha, 1)
+                exact = score > alpha
+        except SearchTimeout:
+            break
+        pos.undo()
+        scores[sq] = (score, exact)
+        with _worker_alpha.get_lock():
+            if score > _worker_alpha.value:
+                _worker_alpha.value = score
+    return scores, searcher.nodes, searcher.cutoffs, searcher.first_move_cutoffs
+
+
+def search_root_parallel(pos, side, moves, deadline, workers, max_depth, control=None,
+                         stats=None):
+    """Iteratively deepen the root ``moves`` of ``pos`` on ``workers`` processes.
+
+    Depths run from 1 to ``max_depth`` plies in total while time remains;
+    workers stop at ``deadline``, or soon after ``control`` is stopped, and
+    a move that was cut short is dropped. Returns ``(best_move, best_score, depth)`` for the deepest iteration that
+    searched at least one move, or ``(NO_MOVE, -INF, 0)``. The workers'
+    node and cutoff counts are added to ``stats`` (a SearchStats), if given.
+    """
+    board = pos.to_board()
+    best_move, best_score, best_depth = NO_MOVE, -INF, 0
+    with _search_lock:
+        pool = _get_pool(workers)
+        _shared_stop.value = 0
+        for depth in range(1, max_depth + 1):
+            if time.time() >= deadline or (control is not None and control.stopped):
+                break
+            _shared_alpha.value = -INF
+            futures = [pool.submit(_search_moves, board, pos.win_length, pos.radius, side, depth,
+                                   moves[i::workers], deadline)
+                       for i in range(min(workers, len(moves)))]
+            pending = futures
+            while pending:
+                pending = wait(pending, timeout=_STOP_POLL).not_done
+                if control is not None and control.stopped:
+                    _shared_stop.value = 1
+            scores = {}
+            for future in futures:
+                found, nodes, cutoffs, first_move_cutoffs = future.result()
+                scores.update(found)
+                if stats is not None:
+                    stats.nodes += nodes
+                    stats.cutoffs += cutoffs
+                    stats.first_move_cutoffs += first_move_cutoffs
+            if moves[0] not in scores:
+                break  # cut short before the previous best was re-searched
+            rank = {sq: i for i, sq in enumerate(moves)}
+            # On equal scores an exact result beats an upper bound
+            best_move = max(scores, key=lambda sq: (scores[sq], -rank[sq]))
+            best_score = scores[best_move][0]
+            best_depth = depth
+            # Best-scoring moves first next time; unsearched ones keep their order
+            moves = sorted(moves, key=lambda sq: (-scores[sq][0] if sq in scores else INF, rank[sq]))
+            if abs(best_score) >= WIN_SCORE:
+                break
+    return best_move, best_score, best_depth
@@ -0,0 +1,152 @@
+"""Pondering: keep searching while the opponent is thinking.
+
+After the engine picks a move, the second move of its principal variation
+is taken as the predicted reply, and that position is searched in a
+background thread. The search fills the shared transposition table. When
+the real reply arrives, a correct prediction (a "ponder hit") turns the
+background search into the real one: its deadline becomes the normal budget
+counted from when pondering started, so a long think by the opponent means
+an instant answer. A wrong prediction stops the background search and its
+result is thrown away (its table entries stay valid, being keyed by
+position).
+"""
+
+import threading
+import time
+
+from tictactoe.model import l4
+from tictactoe.model.bitboard import Position
+from tictactoe.model.search import SearchControl
+from tictactoe.model.ttable import NO_MOVE
+
+# Never ponder longer than this many seconds without a reply
+PONDER_LIMIT = 60.0
+# Seconds between checks of the caller's SearchControl during a ponder hit
+_STOP_POLL = 0.05
+
+
+class Ponderer:
+    """Chooses moves for ``player`` and ponders in between.
+
+    move and choose take one caller at a time, as with a single game
+    session; stop and close may be called from another thread.
+    """
+
+    def __init__(self, player='O', ponder_limit=PONDER_LIMIT, tt=None):
+        self.side = 'XO'.index(player)
+        self.ponder_limit = ponder_limit
+        # Transposition table for every search; None means l4's shared one
+        self.tt = tt
+        self._thread = None
+        self._control = None
+        self._expected_key = None
+        self._started = 0.0
+        self._result = None
+        # Guards starting a background search against close() from another thread
+        self._lock = threading.Lock()
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def active(self):
+        return self._thread is not None
+
+    def move(self, board, time_limit=1.0, workers=None, on_iteration=None, win_length=None):
+        """Play a move for the engine on ``board`` and start pondering.
+
+        Mutates ``board`` like l4.ai_move and returns the SearchResult.
+        ``on_iteration`` only sees a search started by this call, not the
+        iterations of a ponder hit, which already ran.
+        """
+        pos = Position.from_board(board, win_length)
+        result = self.choose(pos, time_limit, workers, on_iteration)
+        if result.move != NO_MOVE:
+            r, c = pos.coords(result.move)
+            board[r][c] = 'XO'[self.side]
+        return result
+
+    def choose(self, pos, time_limit=1.0, workers=None, on_iteration=None, control=None):
+        """Return the SearchResult for the engine to move in ``pos`` and start
+        pondering on the move after it. ``pos`` is left as it was.
+
+        Stopping ``control`` ends the search early (a ponder hit included)
+        and skips the pondering.
+        """
+        if control is None:
+            control = SearchControl(time.time() + time_limit)
+        result = self._resolve(pos, time_limit, control)
+        if result is None:
+            result = l4._search_position(pos, self.side, time_limit, workers, control=control,
+                                         on_iteration=on_iteration, tt=self.tt)
+        if result.move != NO_MOVE and not control.stopped:
+            self._start(pos.copy(), result)
+        return result
+
+    def stop(self):
+        """Abandon any background search."""
+        with self._lock:
+            thread = self._thread
+            if thread is not None:
+                self._control.stop()
+            self._thread = None
+            self._expected_key = None
+        if thread is not None:
+            thread.join()
+
+    def close(self):
+        """Stop pondering for good; no background search starts after this,
+        even from a choose() already running on another thread."""
+        with self._lock:
+            self._closed = True
+        self.stop()
+
+    def _start(self, pos, result):
+        if len(result.pv) < 2:
+            return
+        pos.play(result.move, self.side)
+        if pos.is_win_at(result.move, self.side) or pos.is_full():
+            return
+        reply = result.pv[1]
+        if not pos.is_empty(reply):
+            return
+        pos.play(reply, 1 - self.side)
+        if pos.is_win_at(reply, 1 - self.side) or pos.is_full():
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._expected_key = pos.key
+            self._started = time.time()
+            self._result = None
+            self._control = SearchControl(self._started + self.ponder_limit)
+            self._thread = threading.Thread(target=self._run, args=(pos, self._control),
+                                            daemon=True)
+            self._thread.start()
+
+    def _run(self, pos, control):
+        self._result = l4._search_position(pos, self.side, None, control=control, tt=self.tt)
+
+    def _resolve(self, pos, time_limit, control):
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return None
+            hit = pos.key == self._expected_key
+            if hit:
+                # Ponder hit: the time already spent counts towards this move
+                self.hits += 1
+                ponder_control = self._control
+                ponder_control.deadline = min(ponder_control.deadline,
+                                              self._started + time_limit)
+                self._thread = None
+                self._expected_key = None
+        if not hit:
+            self.misses += 1
+            self.stop()
+            return None
+        while thread.is_alive():
+            thread.join(_STOP_POLL)
+            if control.stopped:
+                ponder_control.stop()
+        return self._result
@@ -0,0 +1,264 @@
+"""Recorded games in a compact, memory-mapped binary file.
+
+File layout (little-endian)::
+
+    header   '<4sHxx'   magic b'TTTG', version
+    games    '<BBB'     size, win_length, result       (one per game, then)
+             varint     number of moves
+             varint     cell of each move, r * size + c
+    index    '<Q'       file offset of each game        (written on close)
+    trailer  '<QI4s'    offset of the index, game count, magic b'TTTI'
+
+A cell below 128 is a single byte, so every move on a board up to 11x11
+takes one byte and is read back as a slice of the file. Result codes are
+0 (X won), 1 (O won), 2 (draw) and 3 (not finished).
+
+Files are opened with mmap: iterating decodes one game at a time, and the
+index gives random access to game ``i`` without reading the games before
+it. A file whose writer did not close it has no index; its games are then
+found by scanning, and a game cut off by a crash is dropped.
+
+The engine writes here when ``TICTACTOE_RECORDS`` names a file: the
+console game, the GUI (through its EngineSession) and self-play with
+``python -m tictactoe.bench --record PATH`` all append to it. One writer
+per file at a time.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from collections import namedtuple
+
+from tictactoe.model.bitboard import Position
+
+MAGIC = b'TTTG'
+INDEX_MAGIC = b'TTTI'
+VERSION = 1
+_HEADER = struct.Struct('<4sHxx')
+_GAME = struct.Struct('<BBB')
+_OFFSET = struct.Struct('<Q')
+_TRAILER = struct.Struct('<QI4s')
+
+# What each result code means; None is a game that was not finished
+RESULTS = ('X', 'O', 'draw', None)
+
+# Where the engine records games, if anywhere
+RECORDS_PATH = os.environ.get('TICTACTOE_RECORDS') or None
+
+
+def _varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    return out
+
+
+def _read_varint(buf, offset):
+    """Return ``(value, next offset)``; IndexError past the end of ``buf``."""
+    value = shift = 0
+    while True:
+        byte = buf[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class GameRecord(namedtuple('GameRecord', 'size win_length result moves')):
+    """One recorded game; ``moves`` holds cells ``r * size + c`` in the
+    order played (X first) and ``result`` is 'X', 'O', 'draw' or None."""
+
+    __slots__ = ()
+
+    def coords(self):
+        """The moves as (row, col) pairs."""
+        return [divmod(cell, self.size) for cell in self.moves]
+
+    def replay(self):
+        """Yield ``(pos, side, sq)`` before each move: the Position, the
+        side to move (0 for X) and the square it played.
+
+        One Position is played through in place, so copy it to keep one.
+        """
+        pos = Position(self.size, self.win_length)
+        stride = pos.stride
+        side = 0
+        for cell in self.moves:
+            r, c = divmod(cell, self.size)
+            sq = r * stride + c
+            yield pos, side, sq
+            pos.play(sq, side)
+            side = 1 - side
+
+
+def _decode(buf, offset):
+    """Return ``(GameRecord, end offset)`` for the game at ``offset``."""
+    size, win_length, result = _GAME.unpack_from(buf, offset)
+    if not 1 <= win_length <= size or result >= len(RESULTS):
+        raise ValueError(f'bad game header at offset {offset}')
+    count, offset = _read_varint(buf, offset + _GAME.size)
+    if count > size * size:
+        raise ValueError(f'too many moves at offset {offset}')
+    if size * size <= 0x80:
+        end = offset + count
+        if end > len(buf):
+            raise IndexError('game runs past the end of the file')
+        moves = bytes(buf[offset:end])
+    else:
+        moves = []
+        for _ in range(count):
+            cell, offset = _read_varint(buf, offset)
+            moves.append(cell)
+        end = offset
+    return GameRecord(size, win_length, RESULTS[result], moves), end
+
+
+def _locate(buf):
+    """Return ``(offsets, end of the games)`` for a records file in ``buf``,
+    from its index or, without one, by scanning the games."""
+    if len(buf) >= _HEADER.size + _TRAILER.size:
+        index, count, magic = _TRAILER.unpack_from(buf, len(buf) - _TRAILER.size)
+        if magic == INDEX_MAGIC and index + count * _OFFSET.size + _TRAILER.size == len(buf):
+            offsets = list(struct.unpack_from(f'<{count}Q', buf, index))
+            return offsets, index
+    offsets = []
+    offset = _HEADER.size
+    while offset < len(buf):
+        try:
+            _, end = _decode(buf, offset)
+        except (IndexError, ValueError, struct.error):
+            break  # the rest was cut off mid-game, or is a partly written index
+        offsets.append(offset)
+        offset = end
+    return offsets, offset
+
+
+def _check_header(buf, path):
+    if len(buf) < _HEADER.size:
+        raise ValueError(f'{path}: empty records file')
+    magic, version = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path}: not a version {VERSION} records file')
+
+
+class GameRecords:
+    """Read-only view of a records file; a sequence of GameRecord."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'{path}: empty records file')
+        try:
+            _check_header(self._mm, path)
+        except ValueError:
+            self.close()
+            raise
+        self._offsets, self._end = _locate(self._mm)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, i):
+        return _decode(self._mm, self._offsets[i])[0]
+
+    def __iter__(self):
+        # Games are stored back to back, so a scan needs no index lookups
+        buf, offset, end = self._mm, _HEADER.size, self._end
+        while offset < end:
+            game, offset = _decode(buf, offset)
+            yield game
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordWriter:
+    """Appends games to a records file, creating it if needed.
+
+    Each game is flushed as it is written; the index is rewritten by
+    close(). Thread-safe, so sessions on different threads may share one
+    writer.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size:
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                try:
+                    _check_header(data, path)
+                except ValueError:
+                    self._file.close()
+                    raise
+                self._offsets, end = _locate(data)
+            self._file.truncate(end)  # drop the old index; close() writes a new one
+        else:
+            self._file.write(_HEADER.pack(MAGIC, VERSION))
+            self._offsets = []
+        self._file.flush()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def write(self, size, win_length, moves, result=None):
+        """Append a game: ``moves`` are (row, col) pairs in the order played
+        and ``result`` is 'X', 'O', 'draw' or None."""
+        data = bytearray(_GAME.pack(size, win_length, RESULTS.index(result)))
+        data += _varint(len(moves))
+        if size * size <= 0x80:
+            data += bytes(r * size + c for r, c in moves)
+        else:
+            for r, c in moves:
+                data += _varint(r * size + c)
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            self._offsets.append(self._file.tell())
+            self._file.write(data)
+            self._file.flush()
+
+    def write_position(self, pos, result=None):
+        """Append the game played so far in Position ``pos``."""
+        moves = [pos.coords(entry >> 1) for entry in pos.moves]
+        self.write(pos.size, pos.win_length, moves, result)
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.seek(0, os.SEEK_END)
+            index = self._file.tell()
+            for offset in self._offsets:
+                self._file.write(_OFFSET.pack(offset))
+            self._file.write(_TRAILER.pack(index, len(self._offsets), INDEX_MAGIC))
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(path=None):
+    """RecordWriter for ``path`` (default ``RECORDS_PATH``), or None when
+    games are not being recorded."""
+    path = path or RECORDS_PATH
+    return RecordWriter(path) if path else None
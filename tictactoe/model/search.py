@@ -0,0 +1,405 @@
+"""Negamax search with principal variation search (PVS).
+
+Scores are always from the point of view of the side to move. Moves are
+ordered by the transposition-table move, then the killer moves recorded at
+the same ply, then the history table; no static win tests are run to order
+moves, so interior nodes stay cheap and the extra cutoffs buy depth.
+
+When the position tracks symmetries (Position.set_symmetry), table entries
+are keyed by the canonical key, so rotated and mirrored transpositions share
+one entry.
+
+:meth:`Searcher.iterate` drives iterative deepening against a deadline that
+is polled inside the tree, so a search stops within a few hundred nodes of
+its budget instead of finishing whatever root move it was on.
+"""
+
+import threading
+import time
+
+from tictactoe.model.bitboard import iter_bits
+from tictactoe.model.ttable import EXACT, LOWER, UPPER, NO_MOVE
+
+# Score for a win. Depth-limited leaves are scored by the pattern evaluator
+# instead, which stays far below this.
+WIN_SCORE = 1000000
+INF = 2 * WIN_SCORE
+# Deepest iteration ever attempted (the TT stores depth in a signed byte)
+MAX_DEPTH = 64
+# Bound on heuristic leaf scores, below every mate score WIN_SCORE + depth
+LEAF_LIMIT = WIN_SCORE - MAX_DEPTH - 1
+# Half-width of the first aspiration window around the previous score
+ASPIRATION = 50
+# The deadline is polled whenever nodes & _POLL_MASK == 0
+_POLL_MASK = 255
+
+
+class SearchTimeout(Exception):
+    """Raised inside the tree when the deadline passes or the search is stopped."""
+
+
+class SearchControl:
+    """Deadline and stop flag shared between a search and its owner.
+
+    The owner may move ``deadline`` or call :meth:`stop` from another thread;
+    the search notices at its next poll.
+    """
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self._stopped = threading.Event()
+
+    def child(self, deadline=None):
+        """Return a control with its own deadline, capped at this one's,
+        that is stopped whenever this one is."""
+        if self.deadline is not None:
+            deadline = self.deadline if deadline is None else min(deadline, self.deadline)
+        control = SearchControl(deadline)
+        control._stopped = self._stopped
+        return control
+
+    def stop(self):
+        self._stopped.set()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def expired(self):
+        if self._stopped.is_set():
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+
+
+class SearchResult:
+    """Outcome of a search: best move, its score and how deep it was seen.
+
+    ``stats`` is filled in with a SearchStats by the l4 entry points.
+    """
+
+    __slots__ = ('move', 'score', 'depth', 'pv', 'nodes', 'stats')
+
+    def __init__(self, move, score=0, depth=0, pv=None, nodes=0):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.pv = pv if pv is not None else [move]
+        self.nodes = nodes
+        self.stats = None
+
+
+class SearchStats:
+    """What one move's search did, for tuning budgets and spotting bad positions.
+
+    ``move`` and ``pv`` are (row, col) pairs. ``source`` says what chose the
+    move: 'tactics', 'book', 'threats', 'search' or 'parallel'. ``qnodes``
+    counts the threat solver's nodes, the engine's only search beyond the
+    main tree. ``iterations`` holds one dict per completed depth.
+    """
+
+    __slots__ = ('move', 'score', 'depth', 'pv', 'source', 'nodes', 'qnodes',
+                 'tt_probes', 'tt_hits', 'tt_stores', 'cutoffs', 'first_move_cutoffs',
+                 'iterations', 'elapsed')
+
+    def __init__(self):
+        self.move = None
+        self.score = 0
+        self.depth = 0
+        self.pv = []
+        self.source = None
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_stores = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.iterations = []
+        self.elapsed = 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Share of beta cutoffs made by the first move tried (move ordering quality)."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def nodes_per_second(self):
+        return (self.nodes + self.qnodes) / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        """JSON-friendly copy, including the derived rates."""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['move'] = list(self.move) if self.move is not None else None
+        data['pv'] = [list(move) for move in self.pv]
+        data['first_move_cutoff_rate'] = round(self.first_move_cutoff_rate, 4)
+        data['tt_hit_rate'] = round(self.tt_hit_rate, 4)
+        data['nodes_per_second'] = round(self.nodes_per_second)
+        return data
+
+
+class Searcher:
+    """Searches one Position in place, keeping ordering state between calls.
+
+    Killer moves and history scores survive from one iteration of iterative
+    deepening to the next, which is where most of their value comes from.
+    """
+
+    def __init__(self, pos, tt, deadline=None, control=None):
+        self.pos = pos
+        self.tt = tt
+        self.control = control if control is not None else SearchControl(deadline)
+        self.pv = []
+        self.killers = []
+        squares = pos.size * pos.stride
+        self.history = [[0] * squares, [0] * squares]
+        center = pos.size // 2
+        self._center = [0] * squares
+        for sq in iter_bits(pos.full):
+            r, c = pos.coords(sq)
+            self._center[sq] = pos.size - abs(r - center) - abs(c - center)
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # One dict per completed iteration of iterate()
+        self.iterations = []
+
+    def _killers_at(self, ply):
+        while len(self.killers) <= ply:
+            self.killers.append([NO_MOVE, NO_MOVE])
+        return self.killers[ply]
+
+    def ordered_moves(self, side, tt_move, ply):
+        """Candidate squares: TT move, previous PV move, killers, then history."""
+        pos = self.pos
+        if not pos.count:
+            center = pos.size // 2
+            return [pos.square(center, center)]
+        candidates = pos.frontier or pos.empty()
+        history = self.history[side]
+        center = self._center
+        moves = sorted(iter_bits(candidates), key=lambda sq: history[sq] + center[sq], reverse=True)
+        front = []
+        if tt_move != NO_MOVE and candidates >> tt_move & 1:
+            front.append(tt_move)
+        if ply < len(self.pv):
+            pv_move = self.pv[ply]
+            if pv_move != tt_move and candidates >> pv_move & 1:
+                front.append(pv_move)
+        for killer in self._killers_at(ply):
+            if killer != NO_MOVE and killer not in front and candidates >> killer & 1:
+                front.append(killer)
+        if front:
+            moves = front + [sq for sq in moves if sq not in front]
+        return moves
+
+    def negamax(self, side, depth, alpha, beta, ply=0):
+        """Return the score of the position for ``side`` to move.
+
+        Callers guarantee nobody has won yet: a win is scored as soon as the
+        move that makes it is played.
+        """
+        pos = self.pos
+        self.nodes += 1
+        if not self.nodes & _POLL_MASK and self.control.expired():
+            raise SearchTimeout
+        if pos.is_full():
+            return 0
+        if depth <= 0:
+            score = pos.score if side else -pos.score
+            return max(-LEAF_LIMIT, min(LEAF_LIMIT, score))
+
+        key = pos.key
+        sym = -1
+        if pos.sym_keys:
+            # Symmetric images share one entry; its move is stored in the
+            # orientation of the smallest key
+            key, sym = pos.canonical()
+        if side:
+            key ^= pos.geo.side_key
+        tt_move = NO_MOVE
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, flag, value, tt_move = entry
+            if sym >= 0 and tt_move != NO_MOVE:
+                tt_move = pos.symmetries[sym][1][tt_move]
+            if tt_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    if value > alpha:
+                        alpha = value
+                elif value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+        alpha_orig = alpha
+
+        opponent = 1 - side
+        best = -INF
+        best_move = NO_MOVE
+        first = True
+        for sq in self.ordered_moves(side, tt_move, ply):
+            pos.play(sq, side)
+            if pos.is_win_at(sq, side):
+                score = WIN_SCORE + depth
+            elif first:
+                score = -self.negamax(opponent, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                # Null-window probe; re-search only if it lands inside the window
+                score = -self.negamax(opponent, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.negamax(opponent, depth - 1, -beta, -alpha, ply + 1)
+            pos.undo()
+
+            if score > best:
+                best = score
+                best_move = sq
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self._record_cutoff(side, sq, depth, ply, first)
+                        break
+            first = False
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if sym >= 0 and best_move != NO_MOVE:
+            best_move = pos.symmetries[sym][0][best_move]
+        self.tt.store(key, depth, flag, best, best_move)
+        return best
+
+    def _record_cutoff(self, side, sq, depth, ply, first):
+        self.cutoffs += 1
+        if first:
+            self.first_move_cutoffs += 1
+        killers = self._killers_at(ply)
+        if killers[0] != sq:
+            killers[1] = killers[0]
+            killers[0] = sq
+        self.history[side][sq] += depth * depth
+
+    def search_root(self, side, depth, moves, alpha=-INF, beta=INF):
+        """Search each root move to ``depth`` plies in total.
+
+        Returns ``(best_move, best_score, scores)`` where ``scores`` maps each
+        searched move to its score. Moves after the first are searched with
+        a null window, so their scores are upper bounds unless they improved
+        on the best so far; the search stops early if a move reaches ``beta``.
+        """
+        pos = self.pos
+        opponent = 1 - side
+        best = -INF
+        best_move = NO_MOVE
+        scores = {}
+        for sq in moves:
+            pos.play(sq, side)
+            if pos.is_win_at(sq, side):
+                score = WIN_SCORE + depth
+            elif best_move == NO_MOVE:
+                score = -self.negamax(opponent, depth - 1, -beta, -alpha, 1)
+            else:
+                score = -self.negamax(opponent, depth - 1, -alpha - 1, -alpha, 1)
+                if alpha < score < beta:
+                    score = -self.negamax(opponent, depth - 1, -beta, -alpha, 1)
+            pos.undo()
+            scores[sq] = score
+            if score > best:
+                best = score
+                best_move = sq
+                if score > alpha:
+                    alpha = score
+                    # Proven at least as good as the previous best; usable
+                    # even if this iteration runs out of time.
+                    self._iteration_best = (sq, score)
+                    if alpha >= beta:
+                        break
+        return best_move, best, scores
+
+    def iterate(self, side, moves, max_depth, on_iteration=None):
+        """Iterative deepening over the root ``moves`` up to ``max_depth``.
+
+        Each iteration searches the previous best move first, follows the
+        previous principal variation, and starts from an aspiration window
+        around the previous score, widening it on a fail. When the deadline
+        passes mid-iteration the position is rewound and the last completed
+        iteration's result is returned, upgraded to a move from the
+        unfinished iteration if one already beat the previous best.
+        """
+        pos = self.pos
+        root_ply = len(pos.moves)
+        moves = list(moves)
+        result = SearchResult(moves[0] if moves else NO_MOVE)
+        for depth in range(1, max_depth + 1):
+            self._iteration_best = None
+            started = time.time()
+            nodes = self.nodes
+            try:
+                move, score, scores = self._aspiration(side, depth, moves, result)
+            except SearchTimeout:
+                while len(pos.moves) > root_ply:
+                    pos.undo()
+                if self._iteration_best is not None:
+                    move, score = self._iteration_best
+                    pv = self.principal_variation(side, move, depth)
+                    result = SearchResult(move, score, result.depth, pv)
+                break
+            # Best move first, the rest by this iteration's scores
+            moves.sort(key=lambda sq: scores.get(sq, -INF), reverse=True)
+            moves.remove(move)
+            moves.insert(0, move)
+            self.pv = self.principal_variation(side, move, depth)
+            result = SearchResult(move, score, depth, self.pv, self.nodes)
+            self.iterations.append({'depth': depth, 'score': score, 'move': move,
+                                    'nodes': self.nodes - nodes,
+                                    'seconds': round(time.time() - started, 6)})
+            if on_iteration is not None:
+                on_iteration(result)
+            if abs(score) >= WIN_SCORE:
+                break  # a forced win or loss does not change with depth
+        result.nodes = self.nodes
+        return result
+
+    def _aspiration(self, side, depth, moves, previous):
+        if depth < 3 or abs(previous.score) >= WIN_SCORE:
+            return self.search_root(side, depth, moves)
+        delta = ASPIRATION
+        alpha, beta = previous.score - delta, previous.score + delta
+        while True:
+            move, score, scores = self.search_root(side, depth, moves, alpha, beta)
+            if score <= alpha:
+                alpha = max(-INF, alpha - delta)
+            elif score >= beta:
+                beta = min(INF, beta + delta)
+            else:
+                return move, score, scores
+            delta *= 4
+
+    def principal_variation(self, side, move, depth):
+        """Follow transposition-table best moves from ``move`` onwards."""
+        pos = self.pos
+        pv = [move]
+        pos.play(move, side)
+        while len(pv) < depth and not pos.is_win_at(pv[-1], side) and not pos.is_full():
+            side = 1 - side
+            key, sym = pos.canonical()
+            if side:
+                key ^= pos.geo.side_key
+            entry = self.tt.probe(key)
+            if entry is None or entry[3] == NO_MOVE:
+                break
+            move = entry[3] if sym < 0 else pos.symmetries[sym][1][entry[3]]
+            if not pos.is_empty(move):
+                break
+            pv.append(move)
+            pos.play(move, side)
+        for _ in pv:
+            pos.undo()
+        return pv
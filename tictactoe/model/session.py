@@ -0,0 +1,224 @@
+"""A game in progress, held as engine state between turns.
+
+The board-based API (l4.ai_move, check_win, is_full) rebuilds a Position
+from a list-of-lists board on every call and rescans it for wins. An
+EngineSession keeps one Position for the whole game instead: moves are
+applied as deltas, so the Zobrist key, frontier and pattern score are
+updated incrementally, wins are checked through the last move only, and
+the session's own transposition table carries search work from one turn
+to the next.
+"""
+
+import time
+
+from tictactoe.model import l4
+from tictactoe.model.bitboard import PLAYERS, Position
+from tictactoe.model.ponder import Ponderer
+from tictactoe.model.search import SearchControl
+from tictactoe.model.ttable import TranspositionTable
+
+# Smaller than l4's shared table: a session searches one game only
+SESSION_TT_CAPACITY = 1 << 16
+
+
+class EngineSession:
+    """One game's position, result and transposition table.
+
+    ``ai`` is the player the engine plays ('X' or 'O'), or None when both
+    sides are human; it only matters for pondering. Not thread-safe: the
+    GUI runs best_move on a worker thread and applies its result on the
+    main thread, never both at once. cancel() and close() are the
+    exception: they may be called from any thread to stop a search.
+
+    With a ``recorder`` (a records.RecordWriter), the game is appended to
+    it when it ends.
+    """
+
+    def __init__(self, size=8, win_length=None, ai='O', tt_capacity=SESSION_TT_CAPACITY,
+                 recorder=None):
+        self.pos = Position(size, win_length)
+        self.recorder = recorder
+        self.tt = TranspositionTable(tt_capacity)
+        self.ai = ai
+        self.winner = None
+        self.last_stats = None
+        self._ponderer = None
+        # SearchControl of the running best_move, if any
+        self._search = None
+        self._closed = False
+
+    @property
+    def size(self):
+        return self.pos.size
+
+    @property
+    def win_length(self):
+        return self.pos.win_length
+
+    @property
+    def to_move(self):
+        return PLAYERS[self.pos.count & 1]
+
+    @property
+    def last_move(self):
+        """(row, col) of the latest move, or None before the first."""
+        if not self.pos.moves:
+            return None
+        return self.pos.coords(self.pos.moves[-1] >> 1)
+
+    # --- State queries ---
+    def cell(self, r, c):
+        sq = self.pos.square(r, c)
+        for side, player in enumerate(PLAYERS):
+            if self.pos.bits[side] >> sq & 1:
+                return player
+        return '.'
+
+    def board(self):
+        """Return the position as a list-of-lists board (a fresh copy)."""
+        return self.pos.to_board()
+
+    def is_legal(self, r, c):
+        return (self.winner is None and 0 <= r < self.size and 0 <= c < self.size
+                and self.pos.is_empty(self.pos.square(r, c)))
+
+    def is_draw(self):
+        return self.winner is None and self.pos.is_full()
+
+    def is_over(self):
+        return self.winner is not None or self.pos.is_full()
+
+    def winning_line(self):
+        """Return the (row, col) cells of the winner's line through the last
+        move, or None if nobody has won."""
+        if self.winner is None:
+            return None
+        r, c = self.last_move
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            line = [(r, c)]
+            for sign in (1, -1):
+                i, j = r + sign * dr, c + sign * dc
+                while 0 <= i < self.size and 0 <= j < self.size and self.cell(i, j) == self.winner:
+                    line.append((i, j))
+                    i, j = i + sign * dr, j + sign * dc
+            if len(line) >= self.win_length:
+                return sorted(line)
+        return None
+
+    def outcome(self, r, c):
+        """Return ``(winner, draw)`` as they would be after the side to move
+        plays (r, c), without playing it.
+
+        Only reads the position, so a worker thread can report a move's
+        result along with the move itself.
+        """
+        pos = self.pos
+        side = pos.count & 1
+        if pos.is_winning_move(pos.square(r, c), side):
+            return PLAYERS[side], False
+        return None, pos.count + 1 == self.size * self.size
+
+    # --- Moves ---
+    def apply_move(self, r, c):
+        """Play the side to move on (r, c); return the winner or None.
+
+        Raises ValueError for an occupied or off-board square or when the
+        game is already over.
+        """
+        if self.is_over():
+            raise ValueError('game is over')
+        if not self.is_legal(r, c):
+            raise ValueError(f'illegal move {r},{c}')
+        side = self.pos.count & 1
+        sq = self.pos.square(r, c)
+        self.pos.play(sq, side)
+        if self.pos.is_win_at(sq, side):
+            self.winner = PLAYERS[side]
+        if self.recorder is not None and self.is_over():
+            self.recorder.write_position(self.pos, self.winner or 'draw')
+        return self.winner
+
+    def undo(self):
+        """Take back the latest move."""
+        if not self.pos.moves:
+            raise ValueError('no move to undo')
+        self.stop_pondering()
+        self.pos.undo()
+        self.winner = None
+
+    # --- Engine ---
+    def best_move(self, time_limit=1.0, workers=None, max_depth=None, on_iteration=None,
+                  control=None):
+        """Search the side to move and return its SearchStats; the move is in
+        ``stats.move`` as (row, col), or None when the game is over.
+
+        The session's position is not changed; play the move with
+        apply_move. With pondering on, the search after this one starts in
+        the background. The search stops early when ``control`` (a
+        SearchControl) is stopped or cancel() is called; it then returns
+        the best move found so far.
+        """
+        if self.is_over():
+            return None
+        side = self.pos.count & 1
+        deadline = time.time() + time_limit
+        control = control.child(deadline) if control is not None else SearchControl(deadline)
+        self._search = control
+        if self._closed:
+            control.stop()  # close() ran on another thread before the search was published
+        # The search sets up symmetries on the position it gets, so it gets a copy
+        pos = self.pos.copy()
+        ponderer = self._ponderer
+        try:
+            if ponderer is not None and ponderer.side == side and max_depth is None:
+                result = ponderer.choose(pos, time_limit, workers, on_iteration, control)
+            else:
+                result = l4._search_position(pos, side, time_limit, workers, max_depth, control,
+                                             on_iteration=on_iteration, tt=self.tt)
+        finally:
+            self._search = None
+        self.last_stats = result.stats
+        return self.last_stats
+
+    def cancel(self):
+        """Stop the running best_move, if any, and any pondering."""
+        search = self._search
+        if search is not None:
+            search.stop()
+        self.stop_pondering()
+
+    def play_ai(self, time_limit=1.0, workers=None, max_depth=None, on_iteration=None):
+        """Search and play the side to move; return (row, col) or None."""
+        stats = self.best_move(time_limit, workers, max_depth, on_iteration)
+        if stats is None or stats.move is None:
+            return None
+        self.apply_move(*stats.move)
+        return stats.move
+
+    # --- Pondering ---
+    @property
+    def pondering(self):
+        return self._ponderer is not None
+
+    def set_pondering(self, enabled):
+        if enabled and self._ponderer is None and self.ai is not None:
+            self._ponderer = Ponderer(self.ai, tt=self.tt)
+        elif not enabled and self._ponderer is not None:
+            self._ponderer.stop()
+            self._ponderer = None
+
+    def stop_pondering(self):
+        if self._ponderer is not None:
+            self._ponderer.stop()
+
+    def close(self):
+        """Stop any search for good; the session can still be queried."""
+        self._closed = True
+        search = self._search
+        if search is not None:
+            search.stop()
+        ponderer = self._ponderer
+        self._ponderer = None
+        if ponderer is not None:
+            ponderer.close()
+
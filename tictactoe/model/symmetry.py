@@ -0,0 +1,102 @@
+"""The eight symmetries of a square board (rotations and reflections).
+
+Transforms are square permutations in bitboard numbering (``r * stride +
+c``): ``perms[t][sq]`` is where square ``sq`` lands under transform ``t`` and
+``inverse[t]`` undoes it. Transform 0 is the identity.
+
+The opening book keys positions by all eight; the search only tracks the
+ones that fix its root position (:func:`stabilizer`).
+"""
+
+from tictactoe.model.bitboard import iter_bits
+
+_TRANSFORMS = (
+    lambda r, c, n: (r, c),                  # identity
+    lambda r, c, n: (c, n - 1 - r),          # rotate 90
+    lambda r, c, n: (n - 1 - r, n - 1 - c),  # rotate 180
+    lambda r, c, n: (n - 1 - c, r),          # rotate 270
+    lambda r, c, n: (r, n - 1 - c),          # mirror left-right
+    lambda r, c, n: (n - 1 - r, c),          # mirror top-bottom
+    lambda r, c, n: (c, r),                  # transpose
+    lambda r, c, n: (n - 1 - c, n - 1 - r),  # anti-transpose
+)
+
+_cache = {}
+
+
+def permutations(size):
+    """Return ``(perms, inverse)`` for a ``size`` x ``size`` board."""
+    tables = _cache.get(size)
+    if tables is None:
+        stride = size + 1
+        perms = []
+        inverse = []
+        for transform in _TRANSFORMS:
+            perm = [0] * (size * stride)
+            inv = [0] * (size * stride)
+            for r in range(size):
+                for c in range(size):
+                    tr, tc = transform(r, c, size)
+                    perm[r * stride + c] = tr * stride + tc
+                    inv[tr * stride + tc] = r * stride + c
+            perms.append(perm)
+            inverse.append(inv)
+        tables = _cache[size] = (perms, inverse)
+    return tables
+
+
+def transformed_keys(pos, transforms=range(8)):
+    """Zobrist keys of the images of ``pos`` under each of ``transforms``."""
+    perms, _ = permutations(pos.size)
+    zobrist = pos.geo.zobrist
+    keys = []
+    for t in transforms:
+        perm = perms[t]
+        key = pos.geo.zobrist_base
+        for side in (0, 1):
+            for sq in iter_bits(pos.bits[side]):
+                key ^= zobrist[side][perm[sq]]
+        keys.append(key)
+    return keys
+
+
+def canonical_key(pos, side):
+    """Return ``(key, t)``: the smallest image key with ``side`` to move, and
+    the transform that produced it."""
+    side_key = pos.geo.side_key if side else 0
+    keys = transformed_keys(pos)
+    best = min(range(8), key=lambda t: keys[t] ^ side_key)
+    return keys[best] ^ side_key, best
+
+
+def stabilizer(pos):
+    """``(perm, inverse)`` pairs of the non-identity transforms that map
+    ``pos`` onto itself; empty for an asymmetric position."""
+    perms, inverse = permutations(pos.size)
+    found = []
+    for t in range(1, 8):
+        perm = perms[t]
+        if all(_image(bits, perm) == bits for bits in pos.bits):
+            found.append((perm, inverse[t]))
+    return found
+
+
+def _image(bits, perm):
+    image = 0
+    for sq in iter_bits(bits):
+        image |= 1 << perm[sq]
+    return image
+
+
+def unique_moves(pos, moves):
+    """Drop moves equivalent to an earlier one under ``pos.symmetries``."""
+    seen = 0
+    unique = []
+    for sq in moves:
+        if seen >> sq & 1:
+            continue
+        unique.append(sq)
+        seen |= 1 << sq
+        for perm, _ in pos.symmetries:
+            seen |= 1 << perm[sq]
+    return unique
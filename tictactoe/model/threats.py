@@ -0,0 +1,225 @@
+"""Threat-space search for forced wins.
+
+Full-width search only finds a combination if its horizon reaches the end
+of it. This solver looks at forcing moves only, so it can prove wins many
+plies deep in a few thousand nodes.
+
+Threats are read off the pattern windows (Position.live_squares). With
+``k = win_length``:
+
+* a *four* is a live window with k - 1 stones of one side. Its empty square
+  wins next move, so the opponent must block it.
+* a *three* is a live window with k - 2 stones. Here a move counts as a
+  threat only if the attacker would have a winning sequence of fours
+  (a VCF) if given another move.
+
+:meth:`ThreatSolver.vcf` searches continuous fours, where every defence is
+forced. A single defence reply is searched. :meth:`ThreatSolver.vct` also
+allows threes. After a three the defender may answer anywhere, and every
+empty square is tried, so a proven win holds against every defence. Both
+return the winning line as alternating attacker and defender squares
+(attacker first), or None when no win is found within the limits.
+"""
+
+from tictactoe.model.bitboard import iter_bits, popcount
+from tictactoe.model.search import SearchControl, SearchTimeout
+
+# Deepest sequence of fours tried, counted in attacker moves
+VCF_DEPTH = 16
+# Number of threes allowed in a VCT line (each may be followed by fours)
+VCT_DEPTH = 2
+# Node budget per solve
+MAX_NODES = 20000
+# Share of a move's time budget that ai_move gives each solver phase (its
+# own wins, then defences)
+TIME_SHARE = 0.15
+# The deadline is polled whenever nodes & _POLL_MASK == 0
+_POLL_MASK = 255
+
+
+def _first(bits):
+    return (bits & -bits).bit_length() - 1
+
+
+class ThreatSolver:
+    """Proves forced wins in one Position, searched in place.
+
+    Failures are remembered per position, so they carry over between calls
+    on the same solver. A search that runs out of nodes or time returns
+    None, sets ``timed_out`` and leaves the position as it found it.
+    ``control`` may be replaced between calls to give each one its own
+    deadline.
+    """
+
+    def __init__(self, pos, control=None, max_nodes=MAX_NODES):
+        self.pos = pos
+        self.control = control if control is not None else SearchControl()
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        # True when the last vcf/vct call gave up rather than finding no win
+        self.timed_out = False
+        self._vcf_failed = {}
+        self._vct_failed = {}
+
+    def vcf(self, side, depth=VCF_DEPTH, max_nodes=None):
+        """Winning line for ``side`` to move using fours only, or None."""
+        return self._guarded(self._vcf, side, depth, max_nodes)
+
+    def vct(self, side, depth=VCT_DEPTH, max_nodes=None):
+        """Winning line for ``side`` to move using threes and fours, or None."""
+        return self._guarded(self._vct, side, depth, max_nodes)
+
+    def _guarded(self, solve, side, depth, max_nodes):
+        pos = self.pos
+        self.timed_out = self.control.expired()
+        if self.timed_out:
+            return None
+        root_ply = len(pos.moves)
+        self._budget = self.nodes + (max_nodes or self.max_nodes)
+        try:
+            return solve(side, depth)
+        except SearchTimeout:
+            while len(pos.moves) > root_ply:
+                pos.undo()
+            self.timed_out = True
+            return None
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes >= self._budget:
+            raise SearchTimeout
+        if not self.nodes & _POLL_MASK and self.control.expired():
+            raise SearchTimeout
+
+    def _key(self, side):
+        pos = self.pos
+        return pos.key ^ pos.geo.side_key if side else pos.key
+
+    def _vcf(self, side, depth):
+        pos = self.pos
+        self._tick()
+        k = pos.win_length
+        wins = pos.live_squares(side, k - 1)
+        if wins:
+            return [_first(wins)]
+        if depth <= 0:
+            return None
+        key = self._key(side)
+        if self._vcf_failed.get(key, -1) >= depth:
+            return None
+        opponent = 1 - side
+        blocks = pos.live_squares(opponent, k - 1)
+        moves = pos.live_squares(side, k - 2) if k > 1 else 0
+        if blocks:
+            # Every four must also block the opponent's, or it loses at once
+            moves = moves & blocks if popcount(blocks) == 1 else 0
+        for sq in iter_bits(moves):
+            line = self._after_four(sq, side, self._vcf, depth - 1)
+            if line is not None:
+                return line
+        self._vcf_failed[key] = depth
+        return None
+
+    def _after_four(self, sq, side, follow, depth):
+        """Play the four on ``sq`` and its forced block, then ``follow`` to
+        ``depth``."""
+        pos = self.pos
+        opponent = 1 - side
+        pos.play(sq, side)
+        wins = pos.live_squares(side, pos.win_length - 1)
+        if popcount(wins) >= 2:
+            first = _first(wins)
+            pos.undo()
+            return [sq, first, _first(wins ^ 1 << first)]
+        reply = _first(wins)
+        pos.play(reply, opponent)
+        line = None
+        if not pos.is_win_at(reply, opponent):
+            line = follow(side, depth)
+        pos.undo()
+        pos.undo()
+        if line is None:
+            return None
+        return [sq, reply] + line
+
+    def _vct(self, side, depth):
+        pos = self.pos
+        line = self._vcf(side, VCF_DEPTH)
+        if line is not None or depth <= 0:
+            return line
+        key = self._key(side)
+        if self._vct_failed.get(key, -1) >= depth:
+            return None
+        k = pos.win_length
+        opponent = 1 - side
+        if pos.live_squares(opponent, k - 1):
+            return None  # the VCF above already tried every block that fours
+        fours = pos.live_squares(side, k - 2) if k > 1 else 0
+        threes = pos.live_squares(side, k - 3) & ~fours if k > 2 else 0
+        # A four followed by a VCT continuation; fours cost no VCT depth
+        for sq in iter_bits(fours):
+            line = self._after_four(sq, side, self._vct, depth)
+            if line is not None:
+                return line
+        for sq in iter_bits(threes):
+            pos.play(sq, side)
+            line = self._defences(side, depth)
+            pos.undo()
+            if line is not None:
+                return [sq] + line
+        self._vct_failed[key] = depth
+        return None
+
+    def _defences(self, side, depth):
+        """The defender is to move after a three: the attacker's line against
+        the stiffest defence, or None if some defence holds."""
+        pos = self.pos
+        self._tick()
+        opponent = 1 - side
+        if not self._vcf(side, VCF_DEPTH):
+            return None  # no threat: the defender has a free move
+        # Squares on the attacker's lines are the likeliest defences, and
+        # one that holds ends the search. A square sharing no window with
+        # any stone can neither block nor threaten, so on a big board the
+        # far-away empty squares are not tried at all.
+        k = pos.win_length
+        near = pos.live_squares(side, k - 2) | pos.live_squares(side, k - 3)
+        empty = pos.neighbourhood(k - 1)
+        longest = None
+        for sq in list(iter_bits(near)) + list(iter_bits(empty & ~near)):
+            pos.play(sq, opponent)
+            if pos.is_win_at(sq, opponent):
+                line = None
+            else:
+                line = self._vct(side, depth - 1)
+            pos.undo()
+            if line is None:
+                return None
+            if longest is None or len(line) + 1 > len(longest):
+                longest = [sq] + line
+        return longest
+
+
+def defensive_moves(solver, side, moves, max_nodes=MAX_NODES // 10):
+    """Filter ``moves`` for ``side`` to those after which the opponent has no
+    forced win that ``solver`` can find in ``max_nodes`` nodes per move.
+
+    Returns ``moves`` unchanged if the opponent has no forced win to begin
+    with, or if every move loses anyway. When the solver's time runs out,
+    filtering stops: the moves not yet checked are kept after the safe
+    ones, and a check that was cut short never counts as safe.
+    """
+    pos = solver.pos
+    opponent = 1 - side
+    if solver.vct(opponent, max_nodes=max_nodes) is None:
+        return moves
+    safe = []
+    for i, sq in enumerate(moves):
+        pos.play(sq, side)
+        refuted = pos.is_win_at(sq, side) or solver.vct(opponent, max_nodes=max_nodes) is None
+        pos.undo()
+        if solver.timed_out:
+            return safe + moves[i:] if safe else moves
+        if refuted:
+            safe.append(sq)
+    return safe or moves
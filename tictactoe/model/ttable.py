@@ -0,0 +1,101 @@
+"""Fixed-capacity transposition table backed by flat arrays.
+
+Slots are addressed by the low bits of a 64-bit Zobrist key; the full key is
+kept alongside as verification so a slot holding a different position is
+reported as a collision rather than returned. Each entry records the search
+depth, a bound flag, the score and the best move found.
+"""
+
+from array import array
+
+# Bound flags: how the stored value relates to the true minimax value
+EXACT = 0
+LOWER = 1  # value is a lower bound (search failed high)
+UPPER = 2  # value is an upper bound (search failed low)
+
+NO_MOVE = -1
+_EMPTY = -1
+
+
+class TranspositionTable:
+    """Depth-preferred transposition table with aging.
+
+    A new entry replaces the resident one when the slot is empty, holds the
+    same position, was written during an earlier search, or was searched no
+    deeper than the new entry. Memory use is fixed at construction.
+    """
+
+    def __init__(self, capacity=1 << 18):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self._mask = size - 1
+        self.age = 0
+        self._allocate()
+
+    def _allocate(self):
+        size = self.capacity
+        self._keys = array('Q', bytes(8 * size))
+        self._depths = array('b', [_EMPTY]) * size
+        self._flags = array('B', bytes(size))
+        self._values = array('q', bytes(8 * size))
+        self._moves = array('h', [NO_MOVE]) * size
+        self._ages = array('B', bytes(size))
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        self.age = 0
+        self._allocate()
+
+    def new_search(self):
+        """Start a new search generation so older entries become replaceable."""
+        self.age = (self.age + 1) & 0xFF
+
+    def probe(self, key):
+        """Return ``(depth, flag, value, move)`` for ``key`` or None."""
+        self.probes += 1
+        slot = key & self._mask
+        if self._depths[slot] == _EMPTY:
+            return None
+        if self._keys[slot] != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return self._depths[slot], self._flags[slot], self._values[slot], self._moves[slot]
+
+    def store(self, key, depth, flag, value, move=NO_MOVE):
+        slot = key & self._mask
+        resident = self._depths[slot]
+        if resident == _EMPTY:
+            self.used += 1
+        elif (self._keys[slot] != key and self._ages[slot] == self.age
+              and resident > depth):
+            return
+        self.stores += 1
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._flags[slot] = flag
+        self._values[slot] = value
+        self._moves[slot] = move
+        self._ages[slot] = self.age
+
+    def __len__(self):
+        return self.used
+
+    def stats(self):
+        """Return hit, collision and occupancy counters as a dict."""
+        return {
+            'capacity': self.capacity,
+            'used': self.used,
+            'occupancy': self.used / self.capacity,
+            'probes': self.probes,
+            'hits': self.hits,
+            'collisions': self.collisions,
+            'stores': self.stores,
+        }
@@ -0,0 +1,81 @@
+"""Tuned evaluation and move-ordering weights, kept in a JSON file.
+
+``python -m tictactoe.tune`` fits them to recorded games and writes::
+
+    {
+      "version": 1,
+      "move_priority": {"center": 10, "win": 1000, "block": 900, "neighbour": 5},
+      "window_weights": {"4": [0, 1, 8, 64, 0], "5": [0, 1, 8, 64, 512, 0]}
+    }
+
+``move_priority`` holds the terms of l4's move-ordering priority: per
+step of closeness to the centre, for a winning square, for a square that
+blocks the opponent's win, and per neighbouring stone. ``window_weights``
+maps a win length to the pattern weight of a live window holding n
+stones, for n = 0..win_length (see bitboard.window_weights). Either may
+be left out, and so may any win length.
+
+l4 loads the file at import. It looks for ``weights.json`` next to this
+module; ``TICTACTOE_WEIGHTS`` names another file.
+"""
+
+import json
+import os
+
+VERSION = 1
+PRIORITY_TERMS = ('center', 'win', 'block', 'neighbour')
+
+WEIGHTS_PATH = os.environ.get('TICTACTOE_WEIGHTS',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           'weights.json'))
+
+
+def load_weights(path=None):
+    """Return ``{'move_priority': dict or None, 'window_weights': {k: list}}``
+    from ``path`` (default WEIGHTS_PATH), or None if the file does not exist.
+
+    Raises ValueError for a file that is not a valid weights file.
+    """
+    path = path or WEIGHTS_PATH
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        raise ValueError(f'{path}: {e}')
+    if not isinstance(data, dict) or data.get('version') != VERSION:
+        raise ValueError(f'{path}: not a version {VERSION} weights file')
+    priority = data.get('move_priority')
+    if priority is not None:
+        if (not isinstance(priority, dict) or set(priority) != set(PRIORITY_TERMS)
+                or not all(isinstance(v, (int, float)) for v in priority.values())):
+            raise ValueError(f'{path}: move_priority needs numbers for {", ".join(PRIORITY_TERMS)}')
+    windows = {}
+    for key, values in (data.get('window_weights') or {}).items():
+        try:
+            k = int(key)
+        except ValueError:
+            raise ValueError(f'{path}: bad win length {key!r}')
+        if (not isinstance(values, list) or len(values) != k + 1
+                or not all(isinstance(v, int) for v in values)):
+            raise ValueError(f'{path}: window_weights[{key}] needs {k + 1} integers')
+        windows[k] = values
+    return {'move_priority': priority, 'window_weights': windows}
+
+
+def save_weights(path, move_priority=None, window_weights=None):
+    """Write a weights file; ``window_weights`` maps win length to weights."""
+    data = {'version': VERSION}
+    if move_priority is not None:
+        data['move_priority'] = {term: move_priority[term] for term in PRIORITY_TERMS}
+    if window_weights:
+        data['window_weights'] = {str(k): list(w) for k, w in sorted(window_weights.items())}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+    os.replace(tmp, path)
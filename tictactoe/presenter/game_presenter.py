@@ -5,30 +5,82 @@ from __future__ import annotations
 # from implementation details.
 
 from tictactoe.model import l4 as model
+from tictactoe.model import records
+from tictactoe.model.session import EngineSession
 
 
 class GamePresenter:
     def __init__(self):
-        # Any session-specific state for coordinating view and model can be added here
-        pass
+        # Whether new sessions ponder; each session runs its own ponderer
+        self._pondering = False
+        # SearchStats of the most recent AI move
+        self.last_stats = None
+        # Finished games are appended here when TICTACTOE_RECORDS is set
+        self.recorder = records.open_writer()
 
     # Game setup and state
+    def new_session(self, size: int = 8, win_length: int | None = None,
+                    ai: str | None = 'O') -> EngineSession:
+        # A session keeps the engine's position and table between turns;
+        # moves go in as apply_move(r, c) deltas instead of whole boards
+        session = EngineSession(size, win_length, ai, recorder=self.recorder)
+        session.set_pondering(self.pondering)
+        return session
+
     def create_board(self, size: int = 8):
         return model.create_board(size)
 
     def is_full(self, board) -> bool:
         return model.is_full(board)
 
-    def check_win(self, board, player: str, win_length: int):
+    def check_win(self, board, player: str, win_length: int = 4):
         return model.check_win(board, player, win_length)
 
     # AI actions
-    def ai_move(self, board, time_limit: float = 1.0):
-        return model.ai_move(board, time_limit=time_limit)
+    def ai_move(self, board, time_limit: float = 1.0, workers: int | None = None,
+                on_iteration=None, win_length: int | None = None):
+        # workers > 1 selects the multi-process root search; on_iteration is
+        # called with a SearchResult after each completed depth
+        self.last_stats = model.ai_move(board, time_limit=time_limit, workers=workers,
+                                        on_iteration=on_iteration, win_length=win_length)
+        return self.last_stats
+
+    # Pondering: sessions search the predicted reply while the human thinks
+    @property
+    def pondering(self) -> bool:
+        return self._pondering
+
+    def set_pondering(self, enabled: bool) -> None:
+        # Applies to sessions created from now on; the view toggles the
+        # running session itself
+        self._pondering = bool(enabled)
+
+    # Game records
+    def set_recording(self, path: str | None) -> None:
+        # Record games of sessions created from now on to path (None stops)
+        if self.recorder is not None:
+            self.recorder.close()
+        self.recorder = records.open_writer(path) if path else None
+
+    def close(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     # Utilities exposed if needed by view
     def clear_cache(self):
         model.clear_transposition_table()
 
+    def cache_stats(self) -> dict:
+        return model.transposition_table.stats()
+
+    def search_stats(self) -> dict | None:
+        # Last AI move's search statistics as a plain dict
+        return self.last_stats.as_dict() if self.last_stats is not None else None
+
+    @property
+    def max_board_size(self) -> int:
+        return model.MAX_BOARD_SIZE
+
     def print_board(self, board) -> None:
         model.print_board(board)
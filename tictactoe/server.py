@@ -0,0 +1,324 @@
+"""Headless game server: many concurrent games over a JSON-lines socket.
+
+An asyncio listener, on TCP or a Unix socket, reads one JSON request per
+line and writes one JSON response per line. Each game is a session that
+holds its own board. AI turns run on a bounded process pool, so the event
+loop never waits for a search and throughput scales with cores.
+
+Requests carry an ``op`` and an optional ``id``, which is echoed back:
+
+    {"op": "new", "size": 8, "win_length": 4, "ai": "O"}
+    {"op": "move", "game": 1, "row": 3, "col": 4, "time_limit": 0.5}
+    {"op": "ai", "game": 1}                 # AI plays the side to move
+    {"op": "state", "game": 1}
+    {"op": "close", "game": 1}
+    {"op": "stats"}
+
+``move`` plays the human's move and, unless the game ended, the AI's
+reply; with ``"ai": null`` both sides are human. Responses have
+``"ok": true`` with the game state, or ``"ok": false`` and an ``error``;
+a line longer than ``MAX_LINE`` gets error ``"line too long"``. When more AI requests are waiting for a worker than
+``max_queue``, new ones are refused with error ``"busy"`` instead of
+queueing without limit. Time budgets are capped at ``max_time``.
+
+::
+
+    python -m tictactoe.server --port 8765 --workers 4
+    python -m tictactoe.loadgen --port 8765 --clients 16 --games 4
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from tictactoe.model import l4
+from tictactoe.model.bitboard import Position
+from tictactoe.model.ttable import NO_MOVE
+
+MAX_SIZE = l4.MAX_BOARD_SIZE
+# Longest request line accepted, in bytes
+MAX_LINE = 1 << 16
+
+
+def _think(board, side, win_length, time_limit):
+    """Pool worker: return the AI's (row, col) for ``side`` and its stats."""
+    pos = Position.from_board(board, win_length)
+    result = l4._search_position(pos, side, time_limit)
+    if result.move == NO_MOVE:
+        return None, result.stats.as_dict()
+    return pos.coords(result.move), result.stats.as_dict()
+
+
+class ProtocolError(Exception):
+    """A request the server refuses; the message goes back to the client."""
+
+
+class GameSession:
+    """One game: the board, whose turn it is and how it ended."""
+
+    def __init__(self, game_id, size, win_length, ai):
+        self.id = game_id
+        self.board = l4.create_board(size)
+        self.win_length = win_length
+        self.ai = ai
+        self.to_move = 'X'
+        self.status = 'playing'  # or 'X', 'O' when won, or 'draw'
+        self.moves = []
+        # Requests on one game are handled one at a time
+        self.lock = asyncio.Lock()
+
+    def play(self, row, col, player):
+        if self.status != 'playing':
+            raise ProtocolError('game is over')
+        if player != self.to_move:
+            raise ProtocolError(f'not {player} to move')
+        size = len(self.board)
+        if not (0 <= row < size and 0 <= col < size) or self.board[row][col] != '.':
+            raise ProtocolError(f'illegal move {row},{col}')
+        self.board[row][col] = player
+        self.moves.append((row, col))
+        if l4.check_win_at(self.board, row, col, player, self.win_length):
+            self.status = player
+        elif l4.is_full(self.board):
+            self.status = 'draw'
+        self.to_move = 'O' if player == 'X' else 'X'
+
+    def state(self):
+        return {'game': self.id, 'board': [''.join(row) for row in self.board],
+                'to_move': self.to_move, 'status': self.status, 'ai': self.ai,
+                'moves': len(self.moves)}
+
+
+class GameServer:
+    """Serves games to many clients; see the module docstring for the protocol."""
+
+    def __init__(self, workers=None, max_queue=64, max_time=10.0, default_time=1.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.max_time = max_time
+        self.default_time = default_time
+        self.games = {}
+        self._ids = itertools.count(1)
+        self._pool = None
+        self._server = None
+        self._slots = None
+        self._waiting = 0
+        # Open connections: handler task -> its writer
+        self._connections = {}
+        self.counters = {'requests': 0, 'errors': 0, 'ai_moves': 0, 'busy': 0}
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """Start listening on ``path`` (a Unix socket) or ``host:port``.
+
+        Returns the bound address: the path, or ``(host, port)``.
+        """
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = asyncio.Semaphore(self.workers)
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE)
+            return path
+        self._server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Closing the transports ends each handler at its next read
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def handle(self, reader, writer):
+        """One connection: answer each request line in order."""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:  # end of input
+                    if not e.partial:
+                        break
+                    line = e.partial
+                except asyncio.LimitOverrunError:  # line longer than MAX_LINE
+                    await _skip_line(reader)
+                    line = None
+                response = await self.respond(line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def respond(self, line):
+        """Answer one request line; None stands for a line that was too long."""
+        self.counters['requests'] += 1
+        request_id = None
+        try:
+            if line is None:
+                raise ProtocolError('line too long')
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise ProtocolError('invalid JSON')
+            if not isinstance(request, dict):
+                raise ProtocolError('request must be an object')
+            request_id = request.get('id')
+            response = await self.dispatch(request)
+            response['ok'] = True
+        except ProtocolError as e:
+            self.counters['errors'] += 1
+            response = {'ok': False, 'error': str(e)}
+        except Exception as e:  # e.g. a broken worker pool: fail the request, keep the connection
+            self.counters['errors'] += 1
+            response = {'ok': False, 'error': f'internal error: {type(e).__name__}: {e}'}
+        if request_id is not None:
+            response['id'] = request_id
+        return response
+
+    async def dispatch(self, request):
+        op = request.get('op')
+        if op == 'new':
+            return self._new(request)
+        if op == 'stats':
+            return self.stats()
+        if op not in ('move', 'ai', 'state', 'close'):
+            raise ProtocolError(f'unknown op {op!r}')
+        game = self.games.get(_int(request, 'game'))
+        if game is None:
+            raise ProtocolError('unknown game')
+        if op == 'state':
+            return game.state()
+        if op == 'close':
+            del self.games[game.id]
+            return {'game': game.id, 'closed': True}
+        time_limit = self._time_limit(request)
+        async with game.lock:
+            response = {}
+            if op == 'move':
+                if game.to_move == game.ai:
+                    raise ProtocolError('it is the AI to move')
+                if game.ai is not None:
+                    self._check_queue()  # refuse before the move is applied
+                game.play(_int(request, 'row'), _int(request, 'col'), game.to_move)
+            if game.status == 'playing' and (op == 'ai' or game.to_move == game.ai):
+                response['ai_move'], response['stats'] = await self._ai_turn(game, time_limit)
+            response.update(game.state())
+            return response
+
+    def _new(self, request):
+        size = _int(request, 'size', 8)
+        if not 3 <= size <= MAX_SIZE:
+            raise ProtocolError(f'size must be between 3 and {MAX_SIZE}')
+        win_length = _int(request, 'win_length', min(4, size))
+        if not 3 <= win_length <= size:
+            raise ProtocolError('win_length must be between 3 and size')
+        ai = request.get('ai', 'O')
+        if ai not in ('X', 'O', None):
+            raise ProtocolError("ai must be 'X', 'O' or null")
+        game = GameSession(next(self._ids), size, win_length, ai)
+        self.games[game.id] = game
+        return game.state()
+
+    def _time_limit(self, request):
+        try:
+            time_limit = float(request.get('time_limit', self.default_time))
+        except (TypeError, ValueError):
+            raise ProtocolError('time_limit must be a number')
+        if not time_limit > 0:
+            raise ProtocolError('time_limit must be positive')
+        return min(time_limit, self.max_time)
+
+    def _check_queue(self):
+        if self._waiting >= self.max_queue:
+            self.counters['busy'] += 1
+            raise ProtocolError('busy')
+
+    async def _ai_turn(self, game, time_limit):
+        self._check_queue()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            side = 0 if game.to_move == 'X' else 1
+            loop = asyncio.get_running_loop()
+            move, stats = await loop.run_in_executor(
+                self._pool, _think, game.board, side, game.win_length, time_limit)
+        finally:
+            self._slots.release()
+        if move is None:
+            raise ProtocolError('no move available')
+        game.play(move[0], move[1], game.to_move)
+        self.counters['ai_moves'] += 1
+        return list(move), {key: stats[key] for key in
+                            ('source', 'depth', 'score', 'nodes', 'qnodes', 'elapsed')}
+
+    def stats(self):
+        return dict(self.counters, games=len(self.games), workers=self.workers,
+                    waiting=self._waiting)
+
+
+def _int(request, key, default=None):
+    value = request.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ProtocolError(f'{key} must be an integer')
+    return value
+
+
+async def _skip_line(reader):
+    """Drop input up to and including the next newline, or to the end."""
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+async def _serve(args):
+    server = GameServer(args.workers, args.max_queue, args.max_time)
+    address = await server.start(args.host, args.port, args.unix)
+    print(f'listening on {address}', flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve tic-tac-toe games over JSON lines.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='listen on this Unix socket instead')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='AI processes (default: one per core)')
+    parser.add_argument('--max-queue', type=int, default=64,
+                        help='AI requests allowed to wait for a worker')
+    parser.add_argument('--max-time', type=float, default=10.0,
+                        help='cap on the per-request time budget, in seconds')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+"""Fit the engine's evaluation and move-ordering weights to recorded games.
+
+Reads records files (tictactoe.model.records) and writes a weights file
+(tictactoe.model.weights) that l4 loads at import::
+
+    python -m tictactoe.bench --engines ai_move --games 200 --record games.rec
+    python -m tictactoe.tune games.rec --out tictactoe/model/weights.json
+
+Games are replayed into NumPy board arrays and turned into features a
+batch of positions at a time (see batch.py), so only the feature matrices
+are kept in memory. Two fits follow, each a few Newton steps over all
+positions at once:
+
+* Window weights, Texel style. A position's pattern score is its window
+  features times the weights, and ``sigmoid(K * score)`` is read as the
+  expected result for O (1 win, 0.5 draw, 0 loss). K is first chosen so
+  the current weights predict the results best, then the weights are
+  fitted with K fixed, which keeps them in the engine's score units. A
+  penalty on relative change holds them near the current weights where
+  the games say little. Fitted per win length.
+* Move-priority terms, as a conditional logit over the candidate squares
+  of each position: the move actually played should get the highest
+  priority. Only ratios matter for ordering, so the terms are scaled to
+  keep the centre term at its default of 10.
+
+NumPy is required here; the engine itself does not use it.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from tictactoe.model import batch, l4, weights
+from tictactoe.model.bitboard import window_weights
+from tictactoe.model.records import GameRecords
+
+# Positions turned into features at once
+BATCH_POSITIONS = 4096
+# Opening plies skipped; self-play openings are random
+MIN_PLY = 2
+# Fewest positions a win length needs before its weights are fitted
+MIN_POSITIONS = 200
+# Positions used for the move-ordering fit; each holds a row per candidate
+MAX_ORDER_POSITIONS = 200000
+# Candidate squares are the empty ones within this distance of a stone
+ORDER_RADIUS = 2
+# Strength of the penalties that keep the fits near their starting weights
+L2 = 1e-3
+ITERATIONS = 30
+
+_TARGET = {'X': 0.0, 'draw': 0.5, 'O': 1.0}
+
+
+def _game_boards(game):
+    """Return an (n, size * size) int8 array of the board before each of
+    the game's n moves, and the cells played."""
+    moves = np.frombuffer(game.moves, dtype=np.uint8) if isinstance(game.moves, bytes) \
+        else np.asarray(game.moves, dtype=np.int64)
+    n = len(moves)
+    stones = np.where(np.arange(n) % 2 == 0, batch.X_CELL, batch.O_CELL).astype(np.int8)
+    boards = np.zeros((n, game.size * game.size), dtype=np.int8)
+    before, played = np.nonzero(np.tri(n, k=-1, dtype=bool))  # move j is on board t if j < t
+    boards[before, moves[played]] = stones[played]
+    return boards, moves.astype(np.int64)
+
+
+def _box_sum(a, radius):
+    """Sum of each cell's (2 * radius + 1)^2 block, over (N, size, size)."""
+    size = a.shape[1]
+    padded = np.pad(a, ((0, 0), (radius, radius), (radius, radius)))
+    total = np.zeros(a.shape, dtype=np.int16)
+    for dr in range(2 * radius + 1):
+        for dc in range(2 * radius + 1):
+            total += padded[:, dr:dr + size, dc:dc + size]
+    return total
+
+
+def order_features(boards, sides, win_length):
+    """Return ``(features, candidates)`` for (N, size, size) boards with
+    ``sides[i]`` (X_CELL or O_CELL) to move: an (N, size * size, 4) array
+    of the priority terms' inputs (closeness to the centre, win, block,
+    neighbours) and an (N, size * size) mask of the candidate squares."""
+    n, size = boards.shape[0], boards.shape[1]
+    center = size // 2
+    rows, cols = np.indices((size, size))
+    closeness = size - np.abs(rows - center) - np.abs(cols - center)
+    occupied = (boards != 0).astype(np.int16)
+    empty = boards == 0
+    other = np.where(sides == batch.X_CELL, batch.O_CELL, batch.X_CELL)
+    features = np.stack([
+        np.broadcast_to(closeness, boards.shape),
+        batch.completion_squares(boards, sides, win_length),
+        batch.completion_squares(boards, other, win_length),
+        _box_sum(occupied, 1),
+    ], axis=-1).reshape(n, size * size, 4)
+    candidates = (empty & (_box_sum(occupied, ORDER_RADIUS) > 0)).reshape(n, -1)
+    return features.astype(np.int16), candidates
+
+
+class _Data:
+    """Feature matrices of one win length, filled a batch at a time."""
+
+    def __init__(self, win_length):
+        self.win_length = win_length
+        self.eval_features = []
+        self.targets = []
+        self.order_features = []
+        self.order_counts = []
+        self.order_chosen = []
+        self.order_positions = 0
+        self._pending = {}  # size -> [boards, cells, sides, targets], lists of arrays
+
+    def add(self, game, max_order_positions):
+        boards, cells = _game_boards(game)
+        plies = np.arange(len(cells))
+        sides = np.where(plies % 2 == 0, batch.X_CELL, batch.O_CELL).astype(np.int8)
+        keep = plies >= MIN_PLY
+        if not keep.any():
+            return
+        target = np.full(int(keep.sum()), _TARGET[game.result])
+        pending = self._pending.setdefault(game.size, [[], [], [], []])
+        for part, values in zip(pending, (boards[keep], cells[keep], sides[keep], target)):
+            part.append(values)
+        if sum(len(b) for b in pending[0]) >= BATCH_POSITIONS:
+            self._flush(game.size, max_order_positions)
+
+    def finish(self, max_order_positions):
+        for size in list(self._pending):
+            self._flush(size, max_order_positions)
+
+    def _flush(self, size, max_order_positions):
+        parts = self._pending.pop(size, None)
+        if not parts or not parts[0]:
+            return
+        boards, cells, sides, targets = (np.concatenate(part) for part in parts)
+        boards = boards.reshape(-1, size, size)
+        k = self.win_length
+        self.eval_features.append(batch.window_features(boards, k)[:, 1:k].astype(np.int16))
+        self.targets.append(targets)
+        room = max_order_positions - self.order_positions
+        if room <= 0:
+            return
+        boards, cells, sides = boards[:room], cells[:room], sides[:room]
+        features, candidates = order_features(boards, sides, k)
+        valid = candidates[np.arange(len(cells)), cells]  # the move played was a candidate
+        features, candidates, cells = features[valid], candidates[valid], cells[valid]
+        chosen = np.zeros(candidates.shape, dtype=bool)
+        chosen[np.arange(len(cells)), cells] = True
+        self.order_features.append(features[candidates])
+        self.order_counts.append(candidates.sum(axis=1))
+        self.order_chosen.append(chosen[candidates])
+        self.order_positions += len(cells)
+
+
+def _newton(objective, w, iterations=ITERATIONS):
+    """Minimise a convex ``objective(w) -> (loss, gradient, hessian)``
+    from ``w`` with damped Newton steps; return ``(w, loss)``."""
+    loss, grad, hess = objective(w)
+    for _ in range(iterations):
+        step = np.linalg.solve(hess, grad)
+        scale = 1.0
+        while True:
+            trial = w - scale * step
+            result = objective(trial)
+            if result[0] <= loss or scale < 1e-4:
+                break
+            scale /= 2
+        improved = loss - result[0]
+        if result[0] <= loss:
+            w, (loss, grad, hess) = trial, result
+        if improved <= 1e-10 * max(1.0, abs(loss)):
+            break
+    return w, loss
+
+
+def _log_loss(z, y):
+    """Mean cross-entropy of sigmoid(z) against targets y."""
+    return float(np.mean(np.logaddexp(0.0, z) - y * z))
+
+
+def fit_window_weights(features, targets, start, l2=L2):
+    """Texel fit of window weights n = 1..k-1 for an (N, k-1) feature
+    matrix; returns ``(weights, K, loss before, loss after)``."""
+    x = features.astype(np.float64)
+    y = np.asarray(targets, dtype=np.float64)
+    w0 = np.asarray(start, dtype=np.float64)
+    scores = x @ w0
+    spread = float(np.std(scores)) or 1.0
+    scales = np.logspace(-2, 2, 81) / spread
+    losses = [_log_loss(K * scores, y) for K in scales]
+    K = float(scales[int(np.argmin(losses))])
+    loss_before = min(losses)
+    # Relative change is penalised, so large and small weights give way alike
+    inv = 1.0 / np.maximum(np.abs(w0), 1.0) ** 2
+    n = len(y)
+
+    def objective(w):
+        z = K * (x @ w)
+        p = 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+        loss = _log_loss(z, y) + l2 * float(np.sum(inv * (w - w0) ** 2))
+        grad = K * (x.T @ (p - y)) / n + 2 * l2 * inv * (w - w0)
+        hess = K * K * (x.T * (p * (1 - p))) @ x / n + np.diag(2 * l2 * inv)
+        return loss, grad, hess
+
+    w, _ = _newton(objective, w0.copy())
+    return w, K, loss_before, _log_loss(K * (x @ w), y)
+
+
+def _choice_model(features, counts, chosen):
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return features.astype(np.float64), starts, np.asarray(counts), np.flatnonzero(chosen)
+
+
+def order_accuracy(features, counts, chosen, terms):
+    """Share of positions where ``terms`` rank the move played first, ties
+    counted as the chance of picking it among the tied squares."""
+    x, starts, counts, picked = _choice_model(features, counts, chosen)
+    z = x @ np.asarray(terms, dtype=np.float64)
+    best = np.maximum.reduceat(z, starts)
+    ties = np.add.reduceat((z == np.repeat(best, counts)).astype(np.float64), starts)
+    return float(np.mean((z[picked] == best) / ties))
+
+
+def fit_move_priority(features, counts, chosen, l2=L2):
+    """Conditional-logit fit of the four priority terms; ``features`` holds
+    one row per candidate, ``counts`` the candidates of each position and
+    ``chosen`` marks the moves played. Returns the raw weights."""
+    x, starts, counts, picked = _choice_model(features, counts, chosen)
+    groups = len(counts)
+
+    def objective(w):
+        z = x @ w
+        top = np.maximum.reduceat(z, starts)
+        e = np.exp(z - np.repeat(top, counts))
+        total = np.add.reduceat(e, starts)
+        p = e / np.repeat(total, counts)
+        mean = np.add.reduceat(p[:, None] * x, starts)
+        centered = x - np.repeat(mean, counts, axis=0)
+        loss = float(np.mean(top + np.log(total) - z[picked])) + l2 / 2 * float(w @ w)
+        grad = (mean.sum(axis=0) - x[picked].sum(axis=0)) / groups + l2 * w
+        hess = (centered.T * p) @ centered / groups + l2 * np.eye(len(w))
+        return loss, grad, hess
+
+    w, _ = _newton(objective, np.zeros(x.shape[1]))
+    return w
+
+
+def _priority_terms(raw):
+    """Scale raw logit weights to priority terms with the centre term at
+    its default, or the largest term at the default win term if the
+    centre weight is not positive."""
+    if raw[0] > 0:
+        unit = l4.PRIORITY_CENTER / raw[0]
+    else:
+        unit = l4.PRIORITY_WIN / max(float(np.max(np.abs(raw))), 1e-9)
+    return dict(zip(weights.PRIORITY_TERMS, (int(round(v * unit)) for v in raw)))
+
+
+def tune(paths, min_positions=MIN_POSITIONS, max_order_positions=MAX_ORDER_POSITIONS, l2=L2,
+         log=None):
+    """Fit weights to the finished games in the records files ``paths``.
+
+    Returns a report dict; its ``move_priority`` and ``window_weights``
+    entries (``after`` values) are what a weights file takes. Win lengths
+    with fewer than ``min_positions`` positions are not fitted.
+    """
+    start = time.time()
+    data = {}
+    games = 0
+    for path in paths:
+        with GameRecords(path) as records:
+            for game in records:
+                if game.result is None:
+                    continue
+                games += 1
+                group = data.get(game.win_length)
+                if group is None:
+                    group = data[game.win_length] = _Data(game.win_length)
+                group.add(game, max_order_positions)
+    for group in data.values():
+        group.finish(max_order_positions)
+    if log:
+        log(f'{games} games read in {time.time() - start:.1f}s')
+
+    report = {'games': games, 'window_weights': {}, 'move_priority': None}
+    for k, group in sorted(data.items()):
+        if not group.eval_features:
+            continue
+        features = np.concatenate(group.eval_features)
+        entry = {'positions': len(features)}
+        report['window_weights'][k] = entry
+        if len(features) < min_positions or k < 3:
+            entry['skipped'] = 'too few positions' if k >= 3 else 'win length below 3'
+            continue
+        before = window_weights(k)
+        fitted, K, loss_before, loss_after = fit_window_weights(
+            features, np.concatenate(group.targets), before[1:k], l2)
+        # A live window never counts against its owner
+        after = [0] + [max(0, int(round(v))) for v in fitted] + [0]
+        entry.update(before=before, after=after, K=K, loss_before=round(loss_before, 5),
+                     loss_after=round(loss_after, 5))
+        if log:
+            log(f'k={k}: {len(features)} positions, loss {loss_before:.4f} -> {loss_after:.4f}, '
+                f'weights {before} -> {after}')
+
+    order = [g for g in data.values() if g.order_features]
+    if order:
+        features = np.concatenate([f for g in order for f in g.order_features])
+        counts = np.concatenate([c for g in order for c in g.order_counts])
+        chosen = np.concatenate([c for g in order for c in g.order_chosen])
+        before = {'center': l4.PRIORITY_CENTER, 'win': l4.PRIORITY_WIN,
+                  'block': l4.PRIORITY_BLOCK, 'neighbour': l4.PRIORITY_NEIGHBOUR}
+        after = _priority_terms(fit_move_priority(features, counts, chosen, l2))
+        report['move_priority'] = {
+            'positions': len(counts),
+            'before': before,
+            'after': after,
+            'accuracy_before': round(order_accuracy(features, counts, chosen,
+                                                    [before[t] for t in weights.PRIORITY_TERMS]), 4),
+            'accuracy_after': round(order_accuracy(features, counts, chosen,
+                                                   [after[t] for t in weights.PRIORITY_TERMS]), 4),
+        }
+        if log:
+            entry = report['move_priority']
+            log(f'move priority: {len(counts)} positions, top-1 {entry["accuracy_before"]:.3f} '
+                f'-> {entry["accuracy_after"]:.3f}, terms {before} -> {after}')
+    report['elapsed_sec'] = round(time.time() - start, 2)
+    return report
+
+
+def write_weights(report, path):
+    """Write a report's fitted weights to ``path``, keeping the entries of
+    an existing weights file that this report did not fit."""
+    try:
+        existing = weights.load_weights(path) or {}
+    except ValueError:
+        existing = {}
+    windows = dict(existing.get('window_weights') or {})
+    for k, entry in report['window_weights'].items():
+        if 'after' in entry:
+            windows[k] = entry['after']
+    priority = existing.get('move_priority')
+    if report['move_priority'] is not None:
+        priority = report['move_priority']['after']
+    weights.save_weights(path, priority, windows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tune evaluation weights from recorded games.')
+    parser.add_argument('records', nargs='+', help='records files to learn from')
+    parser.add_argument('--out', default=weights.WEIGHTS_PATH,
+                        help='weights file to write (default: the one the engine loads)')
+    parser.add_argument('--min-positions', type=int, default=MIN_POSITIONS)
+    parser.add_argument('--order-positions', type=int, default=MAX_ORDER_POSITIONS,
+                        help='positions used for the move-ordering fit')
+    parser.add_argument('--l2', type=float, default=L2,
+                        help='how strongly the fits are held near the current weights')
+    parser.add_argument('--dry-run', action='store_true', help='report only; write nothing')
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    log = None if args.quiet else lambda line: print(line, file=sys.stderr)
+    report = tune(args.records, args.min_positions, args.order_positions, args.l2, log=log)
+    print(json.dumps(report, indent=2))
+    if not args.dry_run:
+        write_weights(report, args.out)
+        if log:
+            log(f'weights written to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
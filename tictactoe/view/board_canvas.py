@@ -0,0 +1,88 @@
+"""Board renderer on a single tk.Canvas.
+
+The grid is one background rectangle plus 2 * (size + 1) lines, drawn once
+per game. A stone is one text item, created when the move is played, and
+cell highlights are rectangles created on demand, so starting a game costs
+O(size) canvas items instead of size * size widgets, and a move touches
+only its own cell. Clicks are mapped to cells by coordinates; the pixel
+arithmetic lives in board_geometry.
+"""
+
+import tkinter as tk
+
+from tictactoe.view.board_geometry import MAX_CELL, cell_at, cell_box, cell_center, cell_size
+
+BOARD_BG = '#ecf0f1'
+GRID_COLOR = '#95a5a6'
+PLAYER_COLORS = {'X': '#e74c3c', 'O': '#3498db'}
+
+
+class BoardCanvas(tk.Canvas):
+    """Draws a size x size board; ``on_click(row, col)`` is called for clicks
+    on a cell while the board is enabled."""
+
+    def __init__(self, master, size, on_click, **kwargs):
+        kwargs.setdefault('bg', master.cget('bg'))
+        kwargs.setdefault('highlightthickness', 0)
+        super().__init__(master, **kwargs)
+        self.on_click = on_click
+        self.size = 0
+        self.cell = MAX_CELL
+        self.enabled = True
+        self._stones = {}
+        self._highlights = {}
+        self.bind('<Button-1>', self._clicked)
+        self.reset(size)
+
+    def reset(self, size):
+        """Clear the board and draw an empty size x size grid."""
+        self.delete('all')
+        self.size = size
+        self.cell = cell = cell_size(size)
+        extent = cell * size
+        self.config(width=extent + 1, height=extent + 1)
+        self.create_rectangle(0, 0, extent, extent, fill=BOARD_BG, outline=GRID_COLOR)
+        for i in range(1, size):
+            self.create_line(0, i * cell, extent, i * cell, fill=GRID_COLOR)
+            self.create_line(i * cell, 0, i * cell, extent, fill=GRID_COLOR)
+        self._stones = {}
+        self._highlights = {}
+        self.enabled = True
+
+    def set_cell(self, row, col, player):
+        """Draw ``player``'s mark on (row, col), replacing any earlier one."""
+        old = self._stones.pop((row, col), None)
+        if old is not None:
+            self.delete(old)
+        self._stones[(row, col)] = self.create_text(
+            *cell_center(row, col, self.cell), text=player,
+            fill=PLAYER_COLORS.get(player, 'black'),
+            font=('Arial', max(8, self.cell * 2 // 5), 'bold'))
+
+    def highlight(self, row, col, color=None):
+        """Fill (row, col) with ``color`` behind its mark; None removes it."""
+        item = self._highlights.pop((row, col), None)
+        if item is not None:
+            self.delete(item)
+        if color is None:
+            return
+        item = self.create_rectangle(*cell_box(row, col, self.cell), fill=color, outline='')
+        stone = self._stones.get((row, col))
+        if stone is not None:
+            self.tag_lower(item, stone)
+        self._highlights[(row, col)] = item
+
+    def disable(self):
+        """Ignore clicks until the next reset."""
+        self.enabled = False
+
+    def cell_at(self, x, y):
+        """Return the (row, col) under canvas point (x, y), or None."""
+        return cell_at(x, y, self.size, self.cell)
+
+    def _clicked(self, event):
+        if not self.enabled:
+            return
+        cell = self.cell_at(self.canvasx(event.x), self.canvasy(event.y))
+        if cell is not None:
+            self.on_click(*cell)
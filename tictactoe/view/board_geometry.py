@@ -0,0 +1,35 @@
+"""Pixel geometry of the board canvas, kept free of tkinter.
+
+A size x size board is drawn as square cells of ``cell_size(size)``
+pixels, with cell (row, col) at column ``col`` and row ``row`` from the
+top left corner of the canvas.
+"""
+
+# Largest board area the canvas may use, in pixels
+MAX_PIXELS = 560
+# Cell size bounds, in pixels
+MIN_CELL = 24
+MAX_CELL = 56
+
+
+def cell_size(size):
+    """Side of one cell, in pixels, for a size x size board."""
+    return max(MIN_CELL, min(MAX_CELL, MAX_PIXELS // size))
+
+
+def cell_at(x, y, size, cell):
+    """Return the (row, col) under canvas point (x, y), or None."""
+    row, col = int(y) // cell, int(x) // cell
+    if 0 <= row < size and 0 <= col < size:
+        return row, col
+    return None
+
+
+def cell_center(row, col, cell):
+    """Canvas point at the middle of (row, col)."""
+    return col * cell + cell // 2, row * cell + cell // 2
+
+
+def cell_box(row, col, cell):
+    """``(x0, y0, x1, y1)`` of the inside of (row, col), within its grid lines."""
+    return col * cell + 1, row * cell + 1, (col + 1) * cell - 1, (row + 1) * cell - 1